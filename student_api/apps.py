@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class StudentApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'student_api'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .metrics import install_query_wrapper
+        install_query_wrapper()
@@ -0,0 +1,327 @@
+# student_api/async_views.py
+"""
+Async versions of the read and auth endpoints, mounted under api/async/.
+
+DRF 3.14's @api_view cannot wrap coroutines, so these are plain Django
+async views returning the same envelopes as their views.py counterparts.
+Under ASGI they never hold a thread while waiting: the ORM calls use the
+async query API and password hashing runs on the bounded hash pool.
+"""
+import functools
+import json
+import math
+
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import status
+from rest_framework.throttling import BaseThrottle
+from rest_framework.utils.encoders import JSONEncoder
+
+from .conf import get_setting
+from .models import Student
+from .renderers import NDJSONRenderer, json_line
+from .serializers import (
+    StudentSerializer, StudentLoginSerializer, OTPRequestSerializer, OTPVerifySerializer,
+    InvalidFields, resolve_fields, student_rows,
+)
+from .services.bulk_service import VALID_STATUSES
+from .services.cache_service import student_cache
+from .services.counter_service import StudentCounterService
+from .services.freshness_service import StudentFreshnessService
+from .services.otp_service import OTPService
+from .services.token_service import StudentTokenService
+from .throttling import check_rate_limits
+from .utils.pagination import KeysetPaginator, InvalidCursor, DEFAULT_ORDERING, aiterate_keyset
+from .views import (
+    TRUE_VALUES, _list_variant, _page_body, _page_limit, _wants_total, pick_fields,
+)
+
+_ident = BaseThrottle()
+
+
+def _response(body, status_code=status.HTTP_200_OK):
+    # DRF's encoder, so dates and decimals render exactly as in the sync views
+    return JsonResponse(body, status=status_code, encoder=JSONEncoder)
+
+
+def _error(message, status_code, key="error"):
+    return _response({"success": False, key: message}, status_code)
+
+
+def async_api_view(methods):
+    """
+    The parts of @api_view these views need: method check, CSRF exemption
+    and ``request.data`` parsed from a JSON or form body.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return _response(
+                    {"detail": f'Method "{request.method}" not allowed.'},
+                    status.HTTP_405_METHOD_NOT_ALLOWED
+                )
+            request.data = {}
+            if request.method == 'POST':
+                if request.content_type == 'application/json':
+                    try:
+                        request.data = json.loads(request.body or b'{}')
+                    except ValueError as e:
+                        return _response({"detail": f"JSON parse error - {e}"},
+                                         status.HTTP_400_BAD_REQUEST)
+                else:
+                    request.data = request.POST
+            return await view(request, *args, **kwargs)
+
+        # django.views.decorators.csrf.csrf_exempt hides coroutines on Django 4.2
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
+
+
+async def _throttled(request, scope):
+    """
+    Apply the rate limits of the sync endpoint named ``scope`` (the two
+    share one budget). Returns a 429 response when a limit is exceeded.
+    """
+    def identity(kind):
+        if kind == 'ip':
+            return _ident.get_ident(request)
+        value = request.data.get(kind) if hasattr(request.data, 'get') else None
+        if value is None or value == '':
+            return None
+        return str(value)[:64]
+
+    check = functools.partial(check_rate_limits, scope, identity)
+    if get_setting('RATE_LIMIT_BACKEND') == 'cache':
+        wait = await sync_to_async(check, thread_sensitive=False)()
+    else:
+        wait = check()  # in-process buckets, no I/O
+    if wait is None:
+        return None
+    retry_after = math.ceil(wait)
+    response = _response({
+        "success": False,
+        "error": "Too many requests. Please try again later.",
+        "retry_after": retry_after,
+    }, status.HTTP_429_TOO_MANY_REQUESTS)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def _wants_stream(request):
+    if request.GET.get('stream', '').lower() in TRUE_VALUES:
+        return True
+    return NDJSONRenderer.media_type in request.headers.get('Accept', '')
+
+
+def _student_fields(request):
+    """Async counterpart of views._student_fields: (fields, error_response)"""
+    try:
+        return resolve_fields(request.GET.get('fields'), request.GET.get('preset')), None
+    except InvalidFields as e:
+        return None, _error(str(e), status.HTTP_400_BAD_REQUEST)
+
+
+def _streamed_students(students, fields=None):
+    """NDJSON stream fed by an async generator; needs ASGI to avoid buffering"""
+    async def rows():
+        chunk_size = get_setting('STREAM_CHUNK_SIZE')
+        values = student_rows.values(students, fields, extra=('STUDENT_ID',))
+        async for row in aiterate_keyset(values, 'id', chunk_size):
+            yield json_line(student_rows.to_representation(row, fields))
+
+    return StreamingHttpResponse(rows(), content_type=NDJSONRenderer.media_type)
+
+
+async def _paginated_students(request, students, fields, counter_filter, **extra):
+    """Async counterpart of views._paginated_students"""
+    limit = _page_limit(request)
+    if limit is None:
+        return _error("limit must be a positive integer", status.HTTP_400_BAD_REQUEST)
+
+    try:
+        paginator = KeysetPaginator(request.GET.get('order', DEFAULT_ORDERING), limit)
+        rows = student_rows.values(students, fields, extra=paginator.keys)
+        page = await paginator.apaginate(rows, request.GET.get('cursor'))
+    except InvalidCursor as e:
+        return _error(str(e), status.HTTP_400_BAD_REQUEST)
+
+    total = None
+    if _wants_total(request):
+        total = await StudentCounterService.atotal(**counter_filter)
+    return _response(_page_body(page, limit, total, fields, **extra))
+
+
+async def _student_list(request, students, counter_filter, **extra):
+    """Async counterpart of views._student_list"""
+    fields, error = _student_fields(request)
+    if error:
+        return error
+    stream = _wants_stream(request)
+    validators = await StudentFreshnessService.alist_validators(
+        counter_filter, _list_variant(request, fields, stream)
+    )
+    not_modified = validators.not_modified(request)
+    if not_modified is not None:
+        return not_modified
+    if stream:
+        return validators.apply(_streamed_students(students, fields))
+    return validators.apply(
+        await _paginated_students(request, students, fields, counter_filter, **extra)
+    )
+
+
+@async_api_view(['GET'])
+async def get_all_students(request):
+    """Get ALL students regardless of status or deletion flag"""
+    students = Student.objects.all()
+    return await _student_list(
+        request, students, counter_filter={},
+        message="Showing ALL students from database"
+    )
+
+
+@async_api_view(['GET'])
+async def get_active_students(request):
+    """Get only active students (PROFILE_STATUS = 'active')"""
+    students = Student.objects.filter(PROFILE_STATUS='active')
+    return await _student_list(
+        request, students, counter_filter={'PROFILE_STATUS': 'active'},
+        message="Showing active students only"
+    )
+
+
+@async_api_view(['GET'])
+async def get_students_by_status(request, profile_status):
+    """Get students by specific PROFILE_STATUS"""
+    if profile_status not in VALID_STATUSES:
+        return _error(f"Status must be one of: {list(VALID_STATUSES)}",
+                      status.HTTP_400_BAD_REQUEST)
+
+    students = Student.objects.filter(PROFILE_STATUS=profile_status)
+    return await _student_list(
+        request, students, counter_filter={'PROFILE_STATUS': profile_status},
+        status=profile_status
+    )
+
+
+@async_api_view(['GET'])
+async def get_student(request, student_id):
+    """Get student by ID (will show even if PROFILE_STATUS is inactive)"""
+    fields, error = _student_fields(request)
+    if error:
+        return error
+
+    async def load():
+        # Fills the cache, so read the primary like views.get_student
+        student = await Student.objects.using(DEFAULT_DB_ALIAS).aget(STUDENT_ID=student_id)
+        return dict(StudentSerializer(student).data)
+
+    try:
+        if student_cache.enabled:
+            record = await student_cache.aget_or_load(student_id, load)
+            updated_at = record['UPDATED_AT']
+        else:
+            students = Student.objects.only(*fields, 'UPDATED_AT') if fields else Student.objects
+            student = await students.aget(STUDENT_ID=student_id)
+            updated_at = student.UPDATED_AT
+    except Student.DoesNotExist:
+        return _response({"detail": "Not found."}, status.HTTP_404_NOT_FOUND)
+
+    validators = StudentFreshnessService.record_validators(updated_at, fields)
+    not_modified = validators.not_modified(request)
+    if not_modified is not None:
+        return not_modified
+    if student_cache.enabled:
+        data = pick_fields(record, fields)
+    else:
+        data = StudentSerializer(student, fields=fields).data
+    return validators.apply(_response({"success": True, "student": data}))
+
+
+@async_api_view(['POST'])
+async def student_login(request):
+    """Student login with mobile and password"""
+    throttled = await _throttled(request, 'student_login')
+    if throttled:
+        return throttled
+
+    serializer = StudentLoginSerializer(data=request.data)
+    if not serializer.is_valid():
+        return _error(serializer.errors, status.HTTP_400_BAD_REQUEST, key="errors")
+
+    mobile_no = serializer.validated_data['mobile_no']
+    password = serializer.validated_data['password']
+
+    try:
+        student = await Student.objects.aget(MOBILE_NO=mobile_no, DELETED=False)
+    except Student.DoesNotExist:
+        student = None
+    if student is None or not await student.acheck_password(password):
+        return _error("Invalid mobile number or password", status.HTTP_401_UNAUTHORIZED)
+    if not student.UNIQUE_TOKEN:
+        await sync_to_async(student.rotate_token)()
+
+    return _response({
+        "success": True,
+        "message": "Login successful",
+        "student": StudentSerializer(student).data,
+        **StudentTokenService.token_response(student),
+    })
+
+
+@async_api_view(['POST'])
+async def send_otp(request):
+    """Send OTP to student's mobile"""
+    throttled = await _throttled(request, 'send_otp')
+    if throttled:
+        return throttled
+
+    serializer = OTPRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return _error(serializer.errors, status.HTTP_400_BAD_REQUEST, key="errors")
+
+    mobile_no = serializer.validated_data['mobile_no']
+    try:
+        student = await Student.objects.aget(MOBILE_NO=mobile_no, DELETED=False)
+    except Student.DoesNotExist:
+        return _error("Student not found", status.HTTP_404_NOT_FOUND)
+
+    otp = await OTPService.asend_otp(student)
+    # In real implementation, integrate with SMS service here
+    return _response({
+        "success": True,
+        "message": "OTP sent successfully",
+        "mobile_no": mobile_no,
+        "otp": otp  # Remove this in production - only for testing
+    })
+
+
+@async_api_view(['POST'])
+async def verify_otp(request):
+    """Verify OTP"""
+    throttled = await _throttled(request, 'verify_otp')
+    if throttled:
+        return throttled
+
+    serializer = OTPVerifySerializer(data=request.data)
+    if not serializer.is_valid():
+        return _error(serializer.errors, status.HTTP_400_BAD_REQUEST, key="errors")
+
+    mobile_no = serializer.validated_data['mobile_no']
+    otp = serializer.validated_data['otp']
+    try:
+        student = await Student.objects.aget(MOBILE_NO=mobile_no, DELETED=False)
+    except Student.DoesNotExist:
+        return _error("Student not found", status.HTTP_404_NOT_FOUND)
+
+    is_valid, message = await OTPService.averify_otp(student, otp)
+    if not is_valid:
+        return _error(message, status.HTTP_400_BAD_REQUEST)
+    return _response({
+        "success": True,
+        "message": message,
+        "student": StudentSerializer(student).data
+    })
@@ -0,0 +1,38 @@
+# student_api/authentication.py
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from .services.token_service import InvalidToken, StudentTokenService
+
+
+class TokenStudent:
+    """``request.user`` for a verified access token; no database row is loaded"""
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, student_id):
+        self.STUDENT_ID = student_id
+
+
+class StudentTokenAuthentication(BaseAuthentication):
+    """
+    ``Authorization: Bearer <access_token>`` from student_login. Verified
+    from the signature and the revocation cache only; ``request.auth``
+    holds the token claims. Requests without the header stay anonymous.
+    """
+    keyword = b'bearer'
+
+    def authenticate(self, request):
+        header = get_authorization_header(request).split()
+        if not header or header[0].lower() != self.keyword:
+            return None
+        if len(header) != 2:
+            raise AuthenticationFailed("Invalid Authorization header")
+        try:
+            claims = StudentTokenService.verify(header[1].decode('latin-1'))
+        except InvalidToken as e:
+            raise AuthenticationFailed(str(e))
+        return TokenStudent(claims['student_id']), claims
+
+    def authenticate_header(self, request):
+        return 'Bearer'
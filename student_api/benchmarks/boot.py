@@ -0,0 +1,75 @@
+# student_api/benchmarks/boot.py
+"""
+Cold start and per-request cost of one settings profile, measured in a
+fresh interpreter (settings are process-wide). Run by `manage.py bench_boot`:
+
+    python -m student_api.benchmarks.boot <settings module> <sqlite path> <requests>
+
+The profile's DATABASES are swapped for the given SQLite file, so the
+comparison needs no MySQL server; everything else is loaded as deployed.
+Prints one JSON object.
+"""
+import time
+
+_START = time.perf_counter()
+
+import importlib  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import statistics  # noqa: E402
+import sys  # noqa: E402
+
+
+def _boot(settings_module, sqlite_path):
+    settings = importlib.import_module(settings_module)
+    settings.DATABASES = {
+        'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': sqlite_path},
+    }
+    settings.ALLOWED_HOSTS = ['localhost']
+    settings.DEBUG = False
+    os.environ['DJANGO_SETTINGS_MODULE'] = settings_module
+
+    from django.core.wsgi import get_wsgi_application
+    return get_wsgi_application()
+
+
+def main(settings_module, sqlite_path, requests):
+    handler = _boot(settings_module, sqlite_path)
+    boot_ms = (time.perf_counter() - _START) * 1000
+    modules = len(sys.modules)
+
+    from django.test import RequestFactory
+
+    from .data import ensure_student_table, seed_students
+    from ..models import Student
+
+    ensure_student_table()
+    if not Student.objects.exists():
+        seed_students(1)
+    factory = RequestFactory(SERVER_NAME='localhost')
+    path = f'/api/students/{Student.objects.values_list("STUDENT_ID", flat=True).first()}/'
+
+    def request():
+        start = time.perf_counter()
+        response = handler.get_response(factory.get(path))
+        elapsed = (time.perf_counter() - start) * 1e6
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}")
+        return elapsed
+
+    # The first request loads the URLconf and views; later ones hit the
+    # read-through cache, leaving mostly middleware and view overhead
+    first_request_ms = request() / 1000
+    timings = sorted(request() for _ in range(requests))
+    return {
+        'settings': settings_module,
+        'boot_ms': round(boot_ms, 1),
+        'first_request_ms': round(first_request_ms, 1),
+        'modules': modules,
+        'request_p50_us': round(statistics.median(timings), 1),
+        'request_mean_us': round(statistics.fmean(timings), 1),
+    }
+
+
+if __name__ == '__main__':
+    print(json.dumps(main(sys.argv[1], sys.argv[2], int(sys.argv[3]))))
@@ -0,0 +1,143 @@
+# student_api/benchmarks/concurrency.py
+"""
+Drive the sync (WSGI) and async (ASGI) endpoints with the same worker budget.
+
+WSGI gets ``workers`` threads that each serve one request at a time, like a
+threaded WSGI server. ASGI gets one event loop with at most ``workers``
+requests in flight. Both go through Django's in-process test handlers, so
+the numbers compare request handling rather than server socket I/O.
+"""
+import asyncio
+import math
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import AsyncClient, Client
+
+SYNC_PREFIX = '/api/'
+ASYNC_PREFIX = '/api/async/'
+LOGIN_PASSWORD = 'benchmark-password'
+
+
+def build_requests(scenario, count, student_ids, login_mobile=None, seed=42):
+    """``count`` (method, path, data) tuples; paths are relative to the API prefix"""
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(count):
+        if scenario == 'get_student':
+            requests.append(('get', f'students/{rng.choice(student_ids)}/', None))
+        elif scenario == 'list_students':
+            requests.append(('get', 'students/?limit=50', None))
+        elif scenario == 'login':
+            requests.append(('post', 'auth/login/',
+                             {'mobile_no': login_mobile, 'password': LOGIN_PASSWORD}))
+        else:
+            raise ValueError(f"Unknown scenario: {scenario}")
+    return requests
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile ``q`` (0-100) of an ascending list"""
+    return ordered[max(0, math.ceil(len(ordered) * q / 100) - 1)]
+
+
+def _summary(latencies, elapsed, errors):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(statistics.median(latencies) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'max_ms': round(latencies[-1] * 1000, 3),
+    }
+
+
+def _send(client, method, path, data):
+    if data is None:
+        return getattr(client, method)(path)
+    return getattr(client, method)(path, data, content_type='application/json')
+
+
+def _errors(results, ok_statuses):
+    if ok_statuses is None:
+        return sum(1 for _, status_code in results if status_code >= 400)
+    return sum(1 for _, status_code in results if status_code not in ok_statuses)
+
+
+def run_client(requests, prefix=SYNC_PREFIX, ok_statuses=None, use_async=False):
+    """
+    Send ``requests`` one at a time through the test client (AsyncClient
+    for async views): per-request latency without any contention.
+    """
+    if use_async:
+        async def main():
+            client = AsyncClient()
+            results = []
+            for method, path, data in requests:
+                start = time.perf_counter()
+                response = await _send(client, method, prefix + path, data)
+                results.append((time.perf_counter() - start, response.status_code))
+            return results
+    else:
+        def main():
+            client = Client()
+            results = []
+            for method, path, data in requests:
+                start = time.perf_counter()
+                response = _send(client, method, prefix + path, data)
+                results.append((time.perf_counter() - start, response.status_code))
+            return results
+
+    start = time.perf_counter()
+    results = asyncio.run(main()) if use_async else main()
+    elapsed = time.perf_counter() - start
+    return _summary([latency for latency, _ in results], elapsed, _errors(results, ok_statuses))
+
+
+def run_wsgi(requests, workers, prefix=SYNC_PREFIX, ok_statuses=None):
+    """
+    Serve ``requests`` through the WSGI handler on ``workers`` threads.
+    Responses outside ``ok_statuses`` (default: any 4xx/5xx) count as errors.
+    """
+    local = threading.local()
+
+    def call(request):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = Client()
+        method, path, data = request
+        start = time.perf_counter()
+        response = _send(client, method, prefix + path, data)
+        return time.perf_counter() - start, response.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(call, requests))
+    elapsed = time.perf_counter() - start
+    return _summary([latency for latency, _ in results], elapsed, _errors(results, ok_statuses))
+
+
+def run_asgi(requests, workers, prefix=ASYNC_PREFIX, ok_statuses=None):
+    """Serve ``requests`` through the ASGI handler with ``workers`` in flight"""
+    async def main():
+        client = AsyncClient()
+        slots = asyncio.Semaphore(workers)
+
+        async def call(request):
+            method, path, data = request
+            async with slots:
+                start = time.perf_counter()
+                response = await _send(client, method, prefix + path, data)
+                return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(call(request) for request in requests))
+        return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(main())
+    return _summary([latency for latency, _ in results], elapsed, _errors(results, ok_statuses))
@@ -0,0 +1,91 @@
+# student_api/benchmarks/data.py
+import random
+
+from django.core.management.color import no_style
+from django.db import connection
+
+from ..models import Student, StudentCounter, StudentRollup, StudentSearchToken, StudentTombstone
+
+FIRST_NAMES = [
+    'Aarav', 'Vivaan', 'Aditya', 'Ananya', 'Diya', 'Isha', 'Kabir', 'Meera',
+    'Rohan', 'Saanvi', 'Arjun', 'Priya', 'Nikhil', 'Kavya', 'Rahul', 'Sneha',
+]
+LAST_NAMES = [
+    'Sharma', 'Verma', 'Reddy', 'Iyer', 'Nair', 'Patel', 'Gupta', 'Rao',
+    'Singh', 'Das', 'Menon', 'Joshi', 'Kulkarni', 'Bose', 'Mehta', 'Pillai',
+]
+COLLEGES = [
+    'IIT Madras', 'IIT Bombay', 'NIT Trichy', 'Anna University', 'BITS Pilani',
+    'Osmania University', 'Delhi University', 'VIT Vellore', 'Manipal Institute',
+    'Jadavpur University', None,
+]
+STATES = [
+    'Tamil Nadu', 'Karnataka', 'Kerala', 'Telangana', 'Maharashtra', 'Delhi',
+    'West Bengal', 'Gujarat', 'Andhra Pradesh', None,
+]
+EDUCATION = ['BSc', 'BTech', 'BCom', 'BA', 'MSc', 'MTech', 'MBA', 'PhD', '']
+STATUSES = ['active'] * 8 + ['inactive', 'suspended']
+
+
+def ensure_student_table():
+    """
+    Create STUDENT, with the recommended indexes, on a scratch database
+    (the model is unmanaged, so migrate never creates it)
+    """
+    from ..services.index_advisor import create_missing_indexes
+    if Student._meta.db_table not in connection.introspection.table_names():
+        with connection.schema_editor() as editor:
+            editor.create_model(Student)
+    create_missing_indexes()
+
+
+def flush_students():
+    """
+    Empty STUDENT and the tables derived from it (counters, rollups, search
+    index, change-feed tombstones) with TRUNCATE-style SQL, so a benchmark
+    can reseed the same rows
+    """
+    tables = [model._meta.db_table for model in (
+        Student, StudentCounter, StudentRollup, StudentSearchToken, StudentTombstone,
+    )]
+    statements = connection.ops.sql_flush(no_style(), tables, reset_sequences=True)
+    connection.ops.execute_sql_flush(statements)
+
+
+def generate_students(count, seed=42, start=0):
+    """Yield ``count`` unsaved, reproducible Student rows"""
+    rng = random.Random(seed)
+    for i in range(start, start + count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        deleted = rng.random() < 0.03
+        yield Student(
+            NAME=f'{first} {last}',
+            COUNTRY_CODE=91,
+            MOBILE_NO=f'9{i:09d}',
+            EMAIL=f'{first}.{last}.{i}@example.com'.lower(),
+            EMAIL_VERIFIED=rng.random() < 0.6,
+            EDUCATION=rng.choice(EDUCATION),
+            COLLEGE=rng.choice(COLLEGES),
+            ADDRESS_STATE=rng.choice(STATES),
+            ADDRESS=f'{rng.randint(1, 999)} Main Road, Sector {rng.randint(1, 60)}',
+            PROFILE_STATUS='inactive' if deleted else rng.choice(STATUSES),
+            PASSWORD='benchmark',
+            DELETED=deleted,
+        )
+
+
+def seed_students(count, seed=42, batch_size=5000):
+    """
+    Bulk insert ``count`` generated students after any existing rows.
+    Bulk inserts skip save(), so signal-driven side tables are not touched.
+    """
+    ensure_student_table()
+    start = Student.objects.count()
+    batch = []
+    for student in generate_students(count, seed, start):
+        batch.append(student)
+        if len(batch) >= batch_size:
+            Student.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Student.objects.bulk_create(batch)
@@ -0,0 +1,357 @@
+# student_api/benchmarks/suite.py
+"""
+Route-by-route benchmark of the whole API on a seeded STUDENT table.
+
+Every URL pattern in student_api/urls.py has a Route below. Each route is
+driven in up to three modes: ``client`` sends requests one at a time
+through the test client (latency and queries per request), ``wsgi`` and
+``asgi`` run them through the in-process load generators in concurrency.py
+(throughput and tail latency under concurrency). Results are plain JSON,
+so runs can be stored and compared with compare_runs().
+"""
+import contextlib
+import os
+import platform
+import random
+import sys
+import threading
+from urllib.parse import urlencode
+
+import django
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+from ..models import Student
+from .concurrency import LOGIN_PASSWORD, run_asgi, run_client, run_wsgi
+from .data import COLLEGES, FIRST_NAMES, LAST_NAMES
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+API_PREFIX = '/api/'
+MODES = ['client', 'wsgi', 'asgi']
+STATUSES = ['active', 'inactive', 'suspended']
+BULK_SIZE = 100
+# Students created by the suite get mobiles with this prefix (seeded ones start with 9)
+CREATED_PREFIX = '7'
+
+
+class QueryCounter:
+    """Counts the SQL statements run on every database connection of the process"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def _attach(self, sender=None, connection=None, **kwargs):
+        # Connections of worker threads are attached as they connect
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def __enter__(self):
+        connection_created.connect(self._attach)
+        for conn in connections.all():
+            self._attach(connection=conn)
+        return self
+
+    def __exit__(self, *exc_info):
+        connection_created.disconnect(self._attach)
+        for conn in connections.all():
+            if self in conn.execute_wrappers:
+                conn.execute_wrappers.remove(self)
+
+
+def peak_rss_mb():
+    """High-water mark of this process's resident memory, None where unsupported"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+class BenchContext:
+    """
+    Targets for the route builders. Ids are sampled again for every pass,
+    so state-changing routes (verify, restore, delete...) find valid rows.
+    """
+
+    def __init__(self, login_student, seed=42):
+        self.rng = random.Random(seed)
+        self.login_id = login_student.STUDENT_ID
+        self.login_mobile = login_student.MOBILE_NO
+        # The login student is never modified by the other routes
+        self.student_ids = list(
+            Student.objects.exclude(STUDENT_ID=self.login_id)
+            .values_list('STUDENT_ID', flat=True)
+        )
+        last = (Student.objects.filter(MOBILE_NO__startswith=CREATED_PREFIX)
+                .order_by('-MOBILE_NO').values_list('MOBILE_NO', flat=True).first())
+        self._next_mobile = int(last[1:]) + 1 if last else 0
+
+    def sample(self, n, field='STUDENT_ID', **filters):
+        """Up to ``n`` distinct values of ``field`` from students matching ``filters``"""
+        students = (Student.objects.filter(**filters).exclude(STUDENT_ID=self.login_id)
+                    .order_by('STUDENT_ID').values_list(field, flat=True))
+        pivot = self.rng.choice(self.student_ids) if self.student_ids else 0
+        values = list(students.filter(STUDENT_ID__gte=pivot)[:n])
+        if len(values) < n:
+            values += students.filter(STUDENT_ID__lt=pivot)[:n - len(values)]
+        return values
+
+    def ids(self, n):
+        """``n`` random student ids, repeats allowed (read routes)"""
+        return [self.rng.choice(self.student_ids) for _ in range(n)]
+
+    def new_student(self):
+        mobile = f'{CREATED_PREFIX}{self._next_mobile:09d}'
+        self._next_mobile += 1
+        first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+        return {
+            'NAME': f'{first} {last}',
+            'COUNTRY_CODE': 91,
+            'MOBILE_NO': mobile,
+            'EMAIL': f'bench.{mobile}@example.com',
+            'EDUCATION': 'BTech',
+            'COLLEGE': self.rng.choice(COLLEGES[:-1]),
+            'PASSWORD': LOGIN_PASSWORD,
+        }
+
+    def search_query(self):
+        """?q= for a name or college prefix of 2, 3 or 6 characters"""
+        term = self.rng.choice(FIRST_NAMES + LAST_NAMES + COLLEGES[:-1])
+        return urlencode({'q': term[:self.rng.choice([2, 3, 6])].lower()})
+
+
+class Route:
+    """
+    One URL pattern: ``build(ctx, n)`` returns up to ``n`` (method, path, data)
+    requests, paths relative to /api/. ``scale`` shrinks the request count
+    for routes bound by password hashing or bulk work.
+    """
+
+    def __init__(self, name, build, ok=(200,), scale=1.0, is_async=False):
+        self.name = name
+        self.build = build
+        self.ok = ok
+        self.scale = scale
+        self.is_async = is_async
+
+
+def _get(path_for):
+    return lambda ctx, n: [('get', path_for(ctx, i), None) for i in range(n)]
+
+
+def _students_by_id(method, suffix, data=None, **filters):
+    def build(ctx, n):
+        return [
+            (method, f'students/{student_id}/{suffix}', data(ctx) if data else None)
+            for student_id in ctx.sample(n, **filters)
+        ]
+    return build
+
+
+def _bulk_ids(ctx, data=None):
+    student_ids = ctx.rng.sample(ctx.student_ids, min(BULK_SIZE, len(ctx.student_ids)))
+    return {'student_ids': student_ids, **(data or {})}
+
+
+def _auth(path, data):
+    def build(ctx, n):
+        return [('post', path, data(ctx, mobile))
+                for mobile in ctx.sample(n, 'MOBILE_NO', DELETED=False)]
+    return build
+
+
+def _login(path):
+    return lambda ctx, n: [
+        ('post', path, {'mobile_no': ctx.login_mobile, 'password': LOGIN_PASSWORD})
+    ] * n
+
+
+def _otp(ctx, mobile):
+    return {'mobile_no': mobile}
+
+
+def _wrong_otp(ctx, mobile):
+    return {'mobile_no': mobile, 'otp': '000000'}
+
+
+# Ordered so that creates run before the delete route that removes their rows
+ROUTES = [
+    Route('get_all_students', _get(lambda ctx, i: 'students/?limit=50')),
+    Route('get_active_students', _get(lambda ctx, i: 'students/active/?limit=50')),
+    Route('get_students_by_status', _get(
+        lambda ctx, i: f'students/status/{ctx.rng.choice(STATUSES)}/?limit=50')),
+    Route('get_student', lambda ctx, n: [('get', f'students/{student_id}/', None)
+                                         for student_id in ctx.ids(n)]),
+    Route('search_students', _get(lambda ctx, i: f'students/search/?{ctx.search_query()}')),
+    Route('student_changes', _get(lambda ctx, i: 'students/changes/?limit=100')),
+    Route('student_analytics', _get(lambda ctx, i: 'analytics/students/')),
+    Route('async_get_all_students', _get(lambda ctx, i: 'async/students/?limit=50'),
+          is_async=True),
+    Route('async_get_active_students', _get(lambda ctx, i: 'async/students/active/?limit=50'),
+          is_async=True),
+    Route('async_get_students_by_status', _get(
+        lambda ctx, i: f'async/students/status/{ctx.rng.choice(STATUSES)}/?limit=50'),
+        is_async=True),
+    Route('async_get_student', lambda ctx, n: [('get', f'async/students/{student_id}/', None)
+                                               for student_id in ctx.ids(n)], is_async=True),
+    Route('create_student', lambda ctx, n: [('post', 'students/create/', ctx.new_student())
+                                            for _ in range(n)], ok=(201,), scale=0.1),
+    Route('bulk_create_students', lambda ctx, n: [
+        ('post', 'students/bulk/create/',
+         {'students': [ctx.new_student() for _ in range(BULK_SIZE)]})
+        for _ in range(n)
+    ], scale=0.02),
+    Route('update_student', _students_by_id(
+        'put', 'update/', lambda ctx: {'ADDRESS': f'{ctx.rng.randint(1, 999)} Bench Road'})),
+    Route('change_student_status', _students_by_id(
+        'post', 'change-status/', lambda ctx: {'status': ctx.rng.choice(STATUSES)})),
+    Route('verify_email', _students_by_id('post', 'verify-email/', EMAIL_VERIFIED=False)),
+    Route('soft_delete_student', _students_by_id('post', 'soft-delete/', DELETED=False)),
+    Route('restore_student', _students_by_id('post', 'restore/', DELETED=True)),
+    Route('bulk_change_student_status', lambda ctx, n: [
+        ('post', 'students/bulk/change-status/',
+         _bulk_ids(ctx, {'status': ctx.rng.choice(STATUSES)}))
+        for _ in range(n)
+    ], scale=0.1),
+    Route('bulk_soft_delete_students', lambda ctx, n: [
+        ('post', 'students/bulk/soft-delete/', _bulk_ids(ctx)) for _ in range(n)
+    ], scale=0.1),
+    Route('bulk_restore_students', lambda ctx, n: [
+        ('post', 'students/bulk/restore/', _bulk_ids(ctx)) for _ in range(n)
+    ], scale=0.1),
+    Route('student_login', _login('auth/login/'), scale=0.1),
+    Route('send_otp', _auth('auth/send-otp/', _otp)),
+    # A wrong OTP: measures the lookup and check without consuming anything
+    Route('verify_otp', _auth('auth/verify-otp/', _wrong_otp), ok=(400,)),
+    Route('forgot_password', _auth('auth/forgot-password/', _otp)),
+    Route('reset_password', _auth(
+        'auth/reset-password/', lambda ctx, mobile: {**_wrong_otp(ctx, mobile), 'new_password': 'x'}
+    ), ok=(400,)),
+    Route('change_password', lambda ctx, n: [
+        ('post', 'auth/change-password/', {
+            'student_id': ctx.login_id,
+            'current_password': LOGIN_PASSWORD,
+            'new_password': LOGIN_PASSWORD,
+        })
+    ] * n, scale=0.05),
+    Route('async_student_login', _login('async/auth/login/'), scale=0.1, is_async=True),
+    Route('async_send_otp', _auth('async/auth/send-otp/', _otp), is_async=True),
+    Route('async_verify_otp', _auth('async/auth/verify-otp/', _wrong_otp), ok=(400,),
+          is_async=True),
+    Route('delete_student', _students_by_id(
+        'delete', 'delete/', MOBILE_NO__startswith=CREATED_PREFIX)),
+    Route('internal_stats', _get(lambda ctx, i: 'internal/stats/')),
+]
+
+
+def run_suite(ctx, requests=200, workers=16, modes=MODES, routes=None, stderr=None):
+    """
+    Run the selected routes (all by default) in ``modes``. Returns
+    ``{route: {mode: summary, 'peak_rss_mb': ...}}``; a mode is None when
+    the route had nothing to act on (e.g. delete without created rows).
+    """
+    selected = [route for route in ROUTES if routes is None or route.name in routes]
+    results = {}
+    with QueryCounter() as queries, open(os.devnull, 'w') as devnull:
+        # send_otp and forgot_password print the OTP for every request
+        with contextlib.redirect_stdout(devnull):
+            for route in selected:
+                count = max(1, int(requests * route.scale))
+                entry = {}
+                for mode in modes:
+                    batch = route.build(ctx, count)
+                    if not batch:
+                        entry[mode] = None
+                        continue
+                    if stderr:
+                        stderr.write(f"{route.name} [{mode}]: {len(batch)} requests")
+                    before = queries.count
+                    if mode == 'client':
+                        summary = run_client(batch, API_PREFIX, route.ok, route.is_async)
+                    elif mode == 'wsgi':
+                        summary = run_wsgi(batch, workers, API_PREFIX, route.ok)
+                    else:
+                        summary = run_asgi(batch, workers, API_PREFIX, route.ok)
+                    summary['queries_per_request'] = round((queries.count - before) / len(batch), 2)
+                    entry[mode] = summary
+                entry['peak_rss_mb'] = peak_rss_mb()
+                results[route.name] = entry
+    return results
+
+
+def run_metadata(**options):
+    return {
+        'started_at': timezone.now().isoformat(),
+        'vendor': connection.vendor,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        **options,
+    }
+
+
+# Metrics compared between runs, and whether a rise is an improvement
+COMPARED_METRICS = {
+    'p50_ms': False,
+    'p95_ms': False,
+    'p99_ms': False,
+    'throughput_rps': True,
+    'queries_per_request': False,
+    'errors': False,
+}
+
+
+def compare_runs(base, new, threshold=10.0):
+    """
+    Per route, mode and metric changes from ``base`` to ``new`` (both
+    run_suite JSON documents). A change worse than ``threshold`` percent
+    is listed under ``regressions``; any new error or query also counts.
+    """
+    changes, regressions = [], []
+    for name, entry in new['routes'].items():
+        old = base['routes'].get(name)
+        if not old:
+            continue
+        for mode in MODES:
+            before_mode, after_mode = old.get(mode), entry.get(mode)
+            if not before_mode or not after_mode:
+                continue
+            for metric, higher_is_better in COMPARED_METRICS.items():
+                before, after = before_mode.get(metric), after_mode.get(metric)
+                if before is None or after is None:
+                    continue
+                change_pct = round((after - before) / before * 100, 1) if before else None
+                if metric in ('errors', 'queries_per_request'):
+                    worse = after > before
+                elif higher_is_better:
+                    worse = change_pct is not None and change_pct < -threshold
+                else:
+                    worse = change_pct is not None and change_pct > threshold
+                row = {
+                    'route': name, 'mode': mode, 'metric': metric,
+                    'before': before, 'after': after, 'change_pct': change_pct,
+                }
+                changes.append(row)
+                if worse:
+                    regressions.append(row)
+    return {
+        'threshold_pct': threshold,
+        'base': base.get('meta', {}),
+        'new': new.get('meta', {}),
+        'peak_rss_mb': {
+            'before': base.get('meta', {}).get('peak_rss_mb'),
+            'after': new.get('meta', {}).get('peak_rss_mb'),
+        },
+        'regressions': regressions,
+        'changes': changes,
+    }
@@ -0,0 +1,102 @@
+# student_api/conf.py
+from django.conf import settings
+
+DEFAULTS = {
+    # Keyset pagination for the list endpoints
+    'PAGE_SIZE': 50,
+    'MAX_PAGE_SIZE': 500,
+    # Rows fetched per query when streaming a list as NDJSON
+    'STREAM_CHUNK_SIZE': 2000,
+    # Search queries shorter than a trigram rank only the students behind
+    # this many index rows of their prefix, so their cost stays bounded
+    'SEARCH_SHORT_QUERY_CANDIDATES': 1000,
+    # Read-through cache for get_student (local LRU + Django cache alias)
+    'CACHE_ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'CACHE_LOCAL_MAXSIZE': 10000,
+    'CACHE_LOCAL_TTL': 30,
+    'CACHE_SHARED_TTL': 300,
+    # Named field groups for ?preset= on the student read endpoints
+    'FIELD_PRESETS': {
+        'mobile': ['STUDENT_ID', 'NAME', 'PROFILE_STATUS', 'EMAIL_VERIFIED'],
+        'summary': ['STUDENT_ID', 'NAME', 'EMAIL', 'COLLEGE', 'PROFILE_STATUS', 'CREATED_AT'],
+    },
+    # Bulk endpoints: rows per INSERT/UPDATE statement and items per request
+    'BULK_BATCH_SIZE': 500,
+    'BULK_MAX_ITEMS': 10000,
+    # OTP storage backend (dotted path), lifetime in seconds and cache alias
+    'OTP_STORE': 'student_api.services.otp_store.DatabaseOTPStore',
+    'OTP_TTL': 300,
+    'OTP_CACHE_ALIAS': 'default',
+    # Per-identity limits on the auth endpoints, keyed by URL name
+    'RATE_LIMIT_ENABLED': True,
+    'RATE_LIMIT_BACKEND': 'local',  # 'local' (per process) or 'cache' (shared)
+    'RATE_LIMIT_CACHE_ALIAS': 'default',
+    # Most identities the 'local' backend tracks per process (least recently seen go first)
+    'RATE_LIMIT_LOCAL_MAX_KEYS': 100000,
+    'RATE_LIMITS': {
+        'student_login': {'mobile_no': '5/min', 'ip': '60/min'},
+        'send_otp': {'mobile_no': '3/min', 'ip': '30/min'},
+        'verify_otp': {'mobile_no': '5/min', 'ip': '60/min'},
+        'forgot_password': {'mobile_no': '3/min', 'ip': '30/min'},
+    },
+    # Lifetime of the access tokens issued at login, and the cache alias
+    # holding revoked UNIQUE_TOKEN nonces (use a shared cache with several
+    # workers, or a revocation only applies in the process that made it)
+    'ACCESS_TOKEN_TTL': 900,
+    'TOKEN_REVOCATION_CACHE_ALIAS': 'default',
+    # PBKDF2 work factor (None = Django's default) and hashing threads for async views
+    'PASSWORD_HASH_ITERATIONS': None,
+    'PASSWORD_HASH_WORKERS': 4,
+    # Database aliases that GET requests read from (see db.routers), and how
+    # long a client that wrote keeps reading from the primary
+    'READ_REPLICAS': [],
+    'REPLICA_PIN_SECONDS': 5,
+    'REPLICA_PIN_COOKIE': 'primary_pin',
+    'REPLICA_PIN_CACHE_ALIAS': 'default',
+    # Expose GET /api/internal/stats/ (cache and other runtime counters)
+    'STATS_ENDPOINT_ENABLED': False,
+    # Per-route request histograms (see student_api.metrics), the /metrics
+    # endpoint serving them, the Server-Timing header, and how many runs of
+    # the same SELECT in one request get it flagged as a likely N+1
+    'METRICS_ENABLED': True,
+    'METRICS_ENDPOINT_ENABLED': False,
+    'SERVER_TIMING_ENABLED': False,
+    'REPEATED_QUERY_THRESHOLD': 10,
+    # Sampling profiler (see student_api.profiling): which routes (URL names,
+    # empty = all) and what share of their requests to profile, with which
+    # profiler ('sampler' for collapsed stacks, 'cprofile' for pstats), how
+    # often the sampler ticks, and where the per-route files go (None = a
+    # directory under the system temp dir). Each route stops after
+    # PROFILING_MAX_SAMPLES requests or once its file reaches
+    # PROFILING_MAX_FILE_BYTES. Collapsed stacks are rewritten at most every
+    # PROFILING_FLUSH_INTERVAL seconds (and at the cap and on exit).
+    # A signed X-Student-Profile header (see `manage.py profile_token`)
+    # profiles one request even while disabled.
+    'PROFILING_ENABLED': False,
+    'PROFILING_ROUTES': [],
+    'PROFILING_SAMPLE_RATE': 0.01,
+    'PROFILING_PROFILER': 'sampler',
+    'PROFILING_INTERVAL': 0.002,
+    'PROFILING_DIR': None,
+    'PROFILING_MAX_SAMPLES': 500,
+    'PROFILING_MAX_FILE_BYTES': 5 * 1024 * 1024,
+    'PROFILING_FLUSH_INTERVAL': 10,
+    'PROFILING_TOKEN_MAX_AGE': 3600,
+    # Change feed (students/changes/): rows newer than SETTLE_SECONDS are
+    # held back until in-flight transactions have committed, and hard-delete
+    # tombstones are kept RETENTION_DAYS (older cursors get 410 Gone)
+    'CHANGE_FEED_SETTLE_SECONDS': 2,
+    'CHANGE_FEED_RETENTION_DAYS': 30,
+    # analytics/students/: values listed per dimension (?top=) and days of
+    # signups (?days=) by default, and the most a request may ask for
+    'ANALYTICS_TOP_VALUES': 20,
+    'ANALYTICS_MAX_TOP_VALUES': 500,
+    'ANALYTICS_SIGNUP_DAYS': 30,
+    'ANALYTICS_MAX_SIGNUP_DAYS': 366,
+}
+
+
+def get_setting(name):
+    """Read a STUDENT_API setting, falling back to the app default"""
+    return getattr(settings, 'STUDENT_API', {}).get(name, DEFAULTS[name])
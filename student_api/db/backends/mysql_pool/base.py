@@ -0,0 +1,18 @@
+"""
+MySQL backend with a per-process connection pool:
+
+    DATABASES['default'] = {
+        'ENGINE': 'student_api.db.backends.mysql_pool',
+        ...,
+        'POOL': {'MIN_SIZE': 2, 'MAX_SIZE': 20, 'TIMEOUT': 5},
+    }
+"""
+from django.db.backends.mysql.base import DatabaseWrapper as MySQLDatabaseWrapper
+
+from student_api.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, MySQLDatabaseWrapper):
+    def ping(self, raw):
+        # mysqlclient's ping() is one round trip and raises when the server is gone
+        raw.ping()
@@ -0,0 +1,12 @@
+"""
+SQLite backend with the same connection pool as mysql_pool, so the pooling
+layer can be exercised without a MySQL server. File databases only:
+Django never closes in-memory SQLite connections.
+"""
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+
+from student_api.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, SQLiteDatabaseWrapper):
+    pass
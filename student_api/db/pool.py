@@ -0,0 +1,310 @@
+# student_api/db/pool.py
+import functools
+import os
+import threading
+import time
+
+from django.db.utils import OperationalError
+
+# DATABASES[alias]['POOL'] keys
+POOL_DEFAULTS = {
+    'MIN_SIZE': 0,          # connections opened up front and kept through idle pruning
+    'MAX_SIZE': 10,         # hard cap per process; keep workers * MAX_SIZE < max_connections
+    'TIMEOUT': 10,          # seconds a checkout waits for a free connection
+    'RECYCLE': 3600,        # close connections older than this (None to keep forever)
+    'IDLE_TIMEOUT': 300,    # close idle connections above MIN_SIZE after this long
+    'PRE_PING': True,       # check a connection is alive before handing it out
+}
+
+
+class PoolTimeout(OperationalError):
+    """No connection became free within the checkout timeout"""
+
+
+class _PooledConnection:
+    __slots__ = ('raw', 'created_at', 'idle_since')
+
+    def __init__(self, raw, now):
+        self.raw = raw
+        self.created_at = now
+        self.idle_since = now
+
+
+def _select_one(raw):
+    cursor = raw.cursor()
+    try:
+        cursor.execute('SELECT 1')
+    finally:
+        cursor.close()
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of raw DB-API connections.
+
+    ``connect()`` opens a new connection and ``ping(raw)`` raises if one is
+    dead. Idle connections are reused most-recently-used first, so the
+    warm ones stay warm and the rest age out through IDLE_TIMEOUT.
+    """
+
+    def __init__(self, connect, ping=None, min_size=0, max_size=10, timeout=10,
+                 recycle=None, idle_timeout=None, pre_ping=True, clock=time.monotonic):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= MIN_SIZE <= MAX_SIZE, MAX_SIZE >= 1")
+        self._connect = connect
+        self._ping = ping or _select_one
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.idle_timeout = idle_timeout
+        self.pre_ping = pre_ping
+        self._clock = clock
+
+        self._cond = threading.Condition()
+        self._idle = []      # stack, most recently returned last
+        self._in_use = {}    # id(raw) -> _PooledConnection
+        self._size = 0       # open connections plus slots reserved for opening
+        self.checkouts = self.waits = self.timeouts = 0
+        self.created = self.closed = self.recycled = self.ping_failures = 0
+
+    def fill(self):
+        """Open connections until MIN_SIZE are available"""
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            record = self._open()
+            with self._cond:
+                self._idle.insert(0, record)
+                self._cond.notify()
+
+    def checkout(self):
+        """A healthy raw connection; waits up to ``timeout`` when the pool is exhausted"""
+        while True:
+            record, stale = self._reserve()
+            self._close_all(stale)
+            if record is None:
+                record = self._open()
+            elif self.pre_ping and not self._is_alive(record):
+                continue
+            with self._cond:
+                self._in_use[id(record.raw)] = record
+                self.checkouts += 1
+            return record.raw
+
+    def checkin(self, raw, discard=False):
+        """Return a connection; ``discard`` closes it instead (broken or mid-transaction)"""
+        stale = []
+        with self._cond:
+            record = self._in_use.pop(id(raw), None)
+            if record is None:
+                stale.append(_PooledConnection(raw, 0))  # not ours
+            elif discard:
+                self._size -= 1
+                stale.append(record)
+            else:
+                record.idle_since = self._clock()
+                self._idle.append(record)
+                stale.extend(self._prune())
+            self._cond.notify()
+        self._close_all(stale)
+
+    def close(self):
+        """Close every idle connection (checked-out ones close on checkin)"""
+        with self._cond:
+            stale, self._idle = self._idle, []
+            self._size -= len(stale)
+            self._cond.notify_all()
+        self._close_all(stale)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self._size,
+                'in_use': len(self._in_use),
+                'idle': len(self._idle),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'timeouts': self.timeouts,
+                'created': self.created,
+                'closed': self.closed,
+                'recycled': self.recycled,
+                'ping_failures': self.ping_failures,
+            }
+
+    def _reserve(self):
+        """
+        Take an idle connection or a slot to open one (record is None).
+        Returns (record, stale connections to close outside the lock).
+        """
+        stale = []
+        deadline = None
+        with self._cond:
+            while True:
+                now = self._clock()
+                stale.extend(self._prune(now))
+                while self._idle:
+                    record = self._idle.pop()
+                    if self.recycle is not None and now - record.created_at >= self.recycle:
+                        self._size -= 1
+                        self.recycled += 1
+                        stale.append(record)
+                        continue
+                    return record, stale
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, stale
+                if deadline is None:
+                    self.waits += 1
+                    deadline = now + self.timeout
+                remaining = deadline - now
+                if remaining <= 0:
+                    self.timeouts += 1
+                    break
+                self._cond.wait(remaining)
+        self._close_all(stale)
+        raise PoolTimeout(
+            f"No database connection became free within {self.timeout}s "
+            f"(MAX_SIZE={self.max_size})"
+        )
+
+    def _prune(self, now=None):
+        """Drop idle connections past IDLE_TIMEOUT down to MIN_SIZE; caller holds the lock"""
+        if self.idle_timeout is None:
+            return []
+        now = self._clock() if now is None else now
+        stale = []
+        # Oldest idle connections sit at the bottom of the stack
+        while (self._idle and self._size > self.min_size
+               and now - self._idle[0].idle_since >= self.idle_timeout):
+            stale.append(self._idle.pop(0))
+            self._size -= 1
+            self.recycled += 1
+        return stale
+
+    def _open(self):
+        """Open a connection for a slot already counted in _size"""
+        try:
+            raw = self._connect()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.created += 1
+        return _PooledConnection(raw, self._clock())
+
+    def _is_alive(self, record):
+        try:
+            self._ping(record.raw)
+            return True
+        except Exception:
+            with self._cond:
+                self.ping_failures += 1
+                self._size -= 1
+                self._cond.notify()
+            self._close_all([record])
+            return False
+
+    def _close_all(self, records):
+        for record in records:
+            try:
+                record.raw.close()
+            except Exception:
+                pass
+        if records:
+            with self._cond:
+                self.closed += len(records)
+
+
+_pools = {}
+_pools_pid = os.getpid()
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, build=None):
+    """
+    The process-wide pool for a database alias, created with ``build()`` on
+    first use. Without ``build`` returns None when there is no pool yet.
+    """
+    global _pools, _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            # Forked worker: the parent's sockets are not ours to reuse or close
+            _pools, _pools_pid = {}, os.getpid()
+        pool = _pools.get(alias)
+        if pool is None and build is not None:
+            pool = _pools[alias] = build()
+    return pool
+
+
+def close_pools():
+    """Close the idle connections of every pool in this process"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
+
+
+def pool_stats():
+    """Stats for every pool in this process, by database alias"""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.stats() for alias, pool in pools.items()}
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Hands out connections from a per-process ConnectionPool instead of
+    connecting for every request. Django's close() (end of request with
+    CONN_MAX_AGE = 0) returns the connection to the pool. Configure with
+    DATABASES[alias]['POOL'], see POOL_DEFAULTS.
+    """
+
+    def ping(self, raw):
+        _select_one(raw)
+
+    def get_new_connection(self, conn_params):
+        connect = functools.partial(super().get_new_connection, conn_params)
+        pool = get_pool(self.alias, functools.partial(self._build_pool, connect))
+        return pool.checkout()
+
+    def _build_pool(self, connect):
+        options = {**POOL_DEFAULTS, **self.settings_dict.get('POOL', {})}
+        pool = ConnectionPool(
+            connect,
+            ping=self.ping,
+            min_size=options['MIN_SIZE'],
+            max_size=options['MAX_SIZE'],
+            timeout=options['TIMEOUT'],
+            recycle=options['RECYCLE'],
+            idle_timeout=options['IDLE_TIMEOUT'],
+            pre_ping=options['PRE_PING'],
+        )
+        pool.fill()
+        return pool
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # Inside atomic() close() keeps self.connection, so it cannot be shared
+        discard = self.in_atomic_block
+        if not discard and not self.autocommit:
+            try:
+                with self.wrap_database_errors:
+                    self.connection.rollback()
+            except Exception:
+                discard = True
+        if not discard and self.errors_occurred:
+            discard = not self.is_usable()
+        pool = get_pool(self.alias)
+        if pool is None:
+            with self.wrap_database_errors:
+                self.connection.close()
+        else:
+            pool.checkin(self.connection, discard=discard)
@@ -0,0 +1,121 @@
+# student_api/db/routers.py
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.throttling import BaseThrottle
+
+from ..conf import get_setting
+
+# Routing decision for the request being handled; None outside requests
+_routing = ContextVar('student_api_routing', default=None)
+_ident = BaseThrottle()
+
+
+class RoutingState:
+    """Where this request reads from, and whether it has written yet"""
+    __slots__ = ('read_alias', 'wrote')
+
+    def __init__(self, read_alias):
+        self.read_alias = read_alias
+        self.wrote = False
+
+
+@contextmanager
+def routed(state):
+    """Route the ORM calls made inside the block with ``state``"""
+    token = _routing.set(state)
+    try:
+        yield state
+    finally:
+        _routing.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Reads go to the alias picked for the current request by
+    ReplicaRoutingMiddleware; writes always go to the primary. Outside a
+    request (management commands, shell, signals fired by them) reads use
+    the primary too.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        return state.read_alias if state is not None else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            # Read-your-writes for the rest of this request as well
+            state.wrote = True
+            state.read_alias = DEFAULT_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *get_setting('READ_REPLICAS')}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+def replicas_enabled():
+    return bool(get_setting('READ_REPLICAS'))
+
+
+def choose_read_alias(request, pinned):
+    """A random replica for safe methods, the primary for writes and pinned clients"""
+    replicas = get_setting('READ_REPLICAS')
+    if pinned or not replicas or request.method not in ('GET', 'HEAD', 'OPTIONS'):
+        return DEFAULT_DB_ALIAS
+    return random.choice(replicas)
+
+
+def _pin_key(request):
+    return f'replica-pin:{_ident.get_ident(request)}'
+
+
+def _pin_cache():
+    return caches[get_setting('REPLICA_PIN_CACHE_ALIAS')]
+
+
+def _cookie_pinned(request):
+    try:
+        return float(request.COOKIES.get(get_setting('REPLICA_PIN_COOKIE'), 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def is_pinned(request):
+    """Whether this client wrote within REPLICA_PIN_SECONDS"""
+    return _cookie_pinned(request) or bool(_pin_cache().get(_pin_key(request)))
+
+
+async def ais_pinned(request):
+    return _cookie_pinned(request) or bool(await _pin_cache().aget(_pin_key(request)))
+
+
+def _set_pin_cookie(response, seconds):
+    response.set_cookie(
+        get_setting('REPLICA_PIN_COOKIE'), str(int(time.time() + seconds) + 1),
+        max_age=seconds, httponly=True, samesite='Lax',
+    )
+
+
+def pin(request, response):
+    """
+    Keep this client on the primary for REPLICA_PIN_SECONDS: a cookie for
+    clients that send cookies back, and a cache entry under the client
+    address for those that do not.
+    """
+    seconds = get_setting('REPLICA_PIN_SECONDS')
+    _set_pin_cookie(response, seconds)
+    _pin_cache().set(_pin_key(request), True, seconds)
+
+
+async def apin(request, response):
+    seconds = get_setting('REPLICA_PIN_SECONDS')
+    _set_pin_cookie(response, seconds)
+    await _pin_cache().aset(_pin_key(request), True, seconds)
@@ -0,0 +1,19 @@
+# student_api/exceptions.py
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed, Throttled
+from rest_framework.views import exception_handler
+
+
+def api_exception_handler(exc, context):
+    """DRF's handler, with throttled and unauthenticated requests answered in the API envelope"""
+    response = exception_handler(exc, context)
+    if isinstance(exc, Throttled) and response is not None:
+        response.data = {
+            "success": False,
+            "error": "Too many requests. Please try again later.",
+            "retry_after": exc.wait,
+        }
+        response.status_code = status.HTTP_429_TOO_MANY_REQUESTS
+    elif isinstance(exc, AuthenticationFailed) and response is not None:
+        response.data = {"success": False, "error": str(exc.detail)}
+    return response
@@ -0,0 +1,79 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from student_api.benchmarks.concurrency import (
+    LOGIN_PASSWORD, build_requests, run_asgi, run_wsgi
+)
+from student_api.benchmarks.data import ensure_student_table, seed_students
+from student_api.models import Student
+
+SCENARIOS = ['get_student', 'list_students', 'login']
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent throughput of the sync endpoints under WSGI with the "
+        "async endpoints under ASGI, using the same number of workers. "
+        "Seeds the STUDENT table up to --rows first; run it against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--login-requests', type=int, default=100,
+                            help="Requests for the login scenario, which is bound by hashing")
+        parser.add_argument('--workers', type=int, action='append',
+                            help="Worker budget; repeat to compare several (default 16)")
+        parser.add_argument('--scenario', action='append', choices=SCENARIOS, dest='scenarios')
+        parser.add_argument('--with-cache', action='store_true',
+                            help="Leave the student cache on (default measures the ORM path)")
+
+    def handle(self, *args, **options):
+        ensure_student_table()
+        existing = Student.objects.count()
+        if existing < options['rows']:
+            self.stderr.write(f"Seeding {options['rows'] - existing} students...")
+            seed_students(options['rows'] - existing, seed=options['seed'])
+
+        student_ids = list(Student.objects.values_list('STUDENT_ID', flat=True)[:options['rows']])
+        login_student = Student.objects.filter(DELETED=False).order_by('STUDENT_ID').first()
+        login_student.set_password(LOGIN_PASSWORD)
+
+        student_api = {
+            **getattr(settings, 'STUDENT_API', {}),
+            'RATE_LIMIT_ENABLED': False,
+            'CACHE_ENABLED': options['with_cache'],
+        }
+        overrides = override_settings(
+            STUDENT_API=student_api,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        )
+
+        results = []
+        with overrides:
+            for scenario in options['scenarios'] or SCENARIOS:
+                count = options['login_requests'] if scenario == 'login' else options['requests']
+                requests = build_requests(
+                    scenario, count, student_ids, login_student.MOBILE_NO, seed=options['seed']
+                )
+                for workers in options['workers'] or [16]:
+                    self.stderr.write(f"{scenario}: {count} requests, {workers} workers...")
+                    wsgi = run_wsgi(requests, workers)
+                    asgi = run_asgi(requests, workers)
+                    results.append({
+                        'scenario': scenario,
+                        'workers': workers,
+                        'wsgi': wsgi,
+                        'asgi': asgi,
+                        'asgi_speedup': round(asgi['throughput_rps'] / wsgi['throughput_rps'], 2),
+                    })
+
+        self.stdout.write(json.dumps({
+            'rows': len(student_ids),
+            'cache': options['with_cache'],
+            'results': results,
+        }, indent=2))
@@ -0,0 +1,68 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PROFILES = ['student_project.settings', 'student_project.settings_api']
+MEASURES = ['boot_ms', 'first_request_ms', 'request_p50_us', 'request_mean_us']
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare settings profiles (default: the full project settings and the "
+        "API-only student_project.settings_api): worker startup time, first "
+        "request, and per-request overhead of GET students/<id>/ served from "
+        "the cache. Each run boots a fresh interpreter on a scratch SQLite file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', action='append', dest='profiles',
+                            help="Settings module to measure (repeatable)")
+        parser.add_argument('--runs', type=int, default=5,
+                            help="Fresh interpreters per profile")
+        parser.add_argument('--requests', type=int, default=2000,
+                            help="Timed requests per run")
+
+    def run_once(self, profile, sqlite_path, requests):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-m', 'student_api.benchmarks.boot', profile, sqlite_path,
+             str(requests)],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        wall_ms = (time.perf_counter() - start) * 1000
+        if result.returncode:
+            raise CommandError(f"{profile} failed:\n{result.stderr}")
+        return dict(json.loads(result.stdout.splitlines()[-1]), process_ms=wall_ms)
+
+    def handle(self, *args, **options):
+        profiles = options['profiles'] or PROFILES
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for profile in profiles:
+                sqlite_path = os.path.join(directory, f'{profile}.sqlite3')
+                runs = [self.run_once(profile, sqlite_path, options['requests'])
+                        for _ in range(options['runs'])]
+                results[profile] = {
+                    key: round(statistics.median(run[key] for run in runs), 1)
+                    for key in ['process_ms', *MEASURES]
+                }
+                results[profile]['modules'] = runs[-1]['modules']
+                self.stderr.write(f"{profile}: {results[profile]}")
+
+        if len(profiles) > 1:
+            base = results[profiles[0]]
+            results['change_pct'] = {
+                profile: {
+                    key: round((results[profile][key] - base[key]) / base[key] * 100, 1)
+                    for key in ['process_ms', *MEASURES] if base[key]
+                }
+                for profile in profiles[1:]
+            }
+        self.stdout.write(json.dumps(results, indent=2))
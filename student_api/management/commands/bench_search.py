@@ -0,0 +1,80 @@
+import json
+import statistics
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from student_api.benchmarks.data import ensure_student_table, seed_students
+from student_api.models import Student, StudentSearchToken
+from student_api.services.search_service import StudentSearchService
+
+DEFAULT_QUERIES = ['a', 'ra', 'sharma', 'iit', 'anna univ', 'priya.menon', 'zzzz']
+
+
+def _time(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'max_ms': round(max(timings), 3),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the trigram search index with the old icontains query. "
+        "Seeds the STUDENT table up to --rows first; run it against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--limit', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--query', action='append', dest='queries')
+
+    def handle(self, *args, **options):
+        ensure_student_table()
+        existing = Student.objects.count()
+        if existing < options['rows']:
+            self.stderr.write(f"Seeding {options['rows'] - existing} students...")
+            seed_students(options['rows'] - existing, seed=options['seed'])
+        rows = Student.objects.count()
+        if StudentSearchToken.objects.values('STUDENT_ID').distinct().count() < rows:
+            self.stderr.write("Building search index...")
+            call_command('rebuild_search_index', stdout=self.stderr)
+
+        limit, repeat = options['limit'], options['repeat']
+        results = []
+        for query in options['queries'] or DEFAULT_QUERIES:
+            def legacy():
+                # What search_students did before: full match set plus COUNT(*)
+                students = Student.objects.filter(
+                    Q(NAME__icontains=query) | Q(EMAIL__icontains=query) |
+                    Q(COLLEGE__icontains=query)
+                )
+                list(students)
+                students.count()
+
+            def indexed():
+                StudentSearchService.search(query, limit)
+
+            results.append({
+                'query': query,
+                'matches': StudentSearchService.matches(query).count(),
+                'icontains': _time(legacy, repeat),
+                'trigram_index': _time(indexed, repeat),
+            })
+
+        self.stdout.write(json.dumps({
+            'rows': rows,
+            'limit': limit,
+            'repeat': repeat,
+            'results': results,
+        }, indent=2))
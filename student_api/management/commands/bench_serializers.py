@@ -0,0 +1,82 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from student_api.benchmarks.data import ensure_student_table, seed_students
+from student_api.models import Student
+from student_api.serializers import StudentSerializer, student_rows
+
+
+def _time(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'max_ms': round(max(timings), 3),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare StudentSerializer(many=True) over model instances with the "
+        "values_list fast path used by the list endpoints, for several page sizes. "
+        "Seeds the STUDENT table up to --rows first; run it against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--size', type=int, action='append', dest='sizes',
+                            help="Rows per list (repeatable; default 50, 500, 5000)")
+
+    def handle(self, *args, **options):
+        ensure_student_table()
+        existing = Student.objects.count()
+        if existing < options['rows']:
+            self.stderr.write(f"Seeding {options['rows'] - existing} students...")
+            seed_students(options['rows'] - existing, seed=options['seed'])
+
+        renderer = JSONRenderer()
+        repeat = options['repeat']
+        results = []
+        for size in options['sizes'] or [50, 500, 5000]:
+            queryset = Student.objects.order_by('STUDENT_ID')[:size]
+
+            def model_serializer():
+                return StudentSerializer(list(queryset), many=True).data
+
+            def values_list():
+                return student_rows.serialize(student_rows.values(queryset))
+
+            # Same rows fetched up front, to separate serialization from SQL
+            instances = list(queryset)
+            rows = list(student_rows.values(queryset))
+
+            results.append({
+                'rows': size,
+                'identical_json': renderer.render(model_serializer()) == renderer.render(values_list()),
+                'fetch_and_serialize': {
+                    'model_serializer': _time(model_serializer, repeat),
+                    'values_list': _time(values_list, repeat),
+                },
+                'serialize_only': {
+                    'model_serializer': _time(
+                        lambda: StudentSerializer(instances, many=True).data, repeat
+                    ),
+                    'values_list': _time(lambda: student_rows.serialize(rows), repeat),
+                },
+            })
+
+        self.stdout.write(json.dumps({
+            'rows': Student.objects.count(),
+            'repeat': repeat,
+            'results': results,
+        }, indent=2))
@@ -0,0 +1,137 @@
+import json
+import re
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from student_api.benchmarks.concurrency import LOGIN_PASSWORD
+from student_api.benchmarks.data import ensure_student_table, flush_students, seed_students
+from student_api.benchmarks.suite import (
+    MODES, ROUTES, BenchContext, compare_runs, peak_rss_mb, run_metadata, run_suite
+)
+from student_api.models import Student, StudentRollup, StudentSearchToken
+from student_api.services.counter_service import StudentCounterService
+from student_api.services.rollup_service import StudentRollupService
+
+SIZE_SUFFIXES = {'': 1, 'k': 1_000, 'm': 1_000_000}
+
+
+def row_count(value):
+    """10000, 10k, 100k or 1M"""
+    match = re.fullmatch(r'(\d+)([kKmM]?)', value)
+    if not match:
+        raise ValueError(value)
+    return int(match.group(1)) * SIZE_SUFFIXES[match.group(2).lower()]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every API route on a seeded STUDENT table (10k, 100k or 1M rows) "
+        "through the test client and the in-process WSGI/ASGI load generators, and "
+        "print p50/p95/p99 latency, throughput, queries per request and peak RSS as "
+        "JSON. --compare BASE NEW diffs two saved runs. Seeds and modifies the "
+        "database: run it against a scratch SQLite file or a local MySQL schema."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=row_count, default='10k',
+                            help="STUDENT rows to benchmark against (e.g. 10k, 100k, 1M)")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--fresh', action='store_true',
+                            help="Empty STUDENT first so every run starts from the same rows")
+        parser.add_argument('--requests', type=int, default=200,
+                            help="Requests per route and mode (hashing and bulk routes send fewer)")
+        parser.add_argument('--workers', type=int, default=16,
+                            help="Concurrent requests in the wsgi and asgi modes")
+        parser.add_argument('--mode', action='append', choices=MODES, dest='modes')
+        parser.add_argument('--route', action='append', choices=[r.name for r in ROUTES],
+                            dest='routes')
+        parser.add_argument('--with-cache', action='store_true',
+                            help="Leave the student cache on (default measures the ORM path)")
+        parser.add_argument('--output', help="Write the JSON report here instead of stdout")
+        parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'),
+                            help="Compare two saved reports instead of running")
+        parser.add_argument('--threshold', type=float, default=10.0,
+                            help="Percent change counted as a regression (default 10)")
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['compare']:
+            report = self.compare(*options['compare'], threshold=options['threshold'])
+            self.emit(report, options['output'])
+            if options['fail_on_regression'] and report['regressions']:
+                raise CommandError(f"{len(report['regressions'])} regressions")
+            return
+
+        started = time.perf_counter()
+        login_student = self.prepare(options['rows'], options['seed'], options['fresh'])
+        student_api = {
+            **getattr(settings, 'STUDENT_API', {}),
+            'RATE_LIMIT_ENABLED': False,
+            'CACHE_ENABLED': options['with_cache'],
+            'STATS_ENDPOINT_ENABLED': True,
+        }
+        overrides = override_settings(
+            STUDENT_API=student_api,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        )
+        meta = run_metadata(
+            rows=Student.objects.count(),
+            seed=options['seed'],
+            requests=options['requests'],
+            workers=options['workers'],
+            modes=options['modes'] or MODES,
+            cache=options['with_cache'],
+        )
+        with overrides:
+            routes = run_suite(
+                BenchContext(login_student, options['seed']),
+                requests=options['requests'],
+                workers=options['workers'],
+                modes=options['modes'] or MODES,
+                routes=options['routes'],
+                stderr=self.stderr,
+            )
+        meta['duration_s'] = round(time.perf_counter() - started, 1)
+        meta['peak_rss_mb'] = peak_rss_mb()
+        self.emit({'meta': meta, 'routes': routes}, options['output'])
+
+    def prepare(self, rows, seed, fresh):
+        """Seed STUDENT up to ``rows`` and return the student used for logins"""
+        ensure_student_table()
+        if fresh:
+            flush_students()
+        existing = Student.objects.count()
+        if existing < rows:
+            self.stderr.write(f"Seeding {rows - existing} students...")
+            seed_students(rows - existing, seed=seed)
+            # Bulk inserts skip the signals that keep these in step
+            StudentCounterService.reconcile()
+            StudentRollupService.rebuild()
+            self.stderr.write("Building search index...")
+            call_command('rebuild_search_index', stdout=self.stderr)
+        else:
+            if not StudentSearchToken.objects.exists():
+                call_command('rebuild_search_index', stdout=self.stderr)
+            if not StudentRollup.objects.exists():
+                StudentRollupService.rebuild()
+
+        login_student = Student.objects.filter(DELETED=False).order_by('STUDENT_ID').first()
+        login_student.set_password(LOGIN_PASSWORD)
+        return login_student
+
+    def compare(self, base_path, new_path, threshold):
+        with open(base_path) as base, open(new_path) as new:
+            return compare_runs(json.load(base), json.load(new), threshold)
+
+    def emit(self, report, path):
+        text = json.dumps(report, indent=2)
+        if path:
+            with open(path, 'w') as f:
+                f.write(text + '\n')
+            self.stderr.write(f"Wrote {path}")
+        else:
+            self.stdout.write(text)
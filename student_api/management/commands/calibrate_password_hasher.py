@@ -0,0 +1,54 @@
+import hashlib
+import os
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _time_pbkdf2(iterations, samples):
+    salt = os.urandom(16)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hashlib.pbkdf2_hmac('sha256', b'calibration-password', salt, iterations)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure PBKDF2-SHA256 on this host and print the iteration count that "
+        "takes about --target-ms per hash, for STUDENT_API['PASSWORD_HASH_ITERATIONS']"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=float, default=100.0)
+        parser.add_argument('--samples', type=int, default=5)
+        parser.add_argument('--minimum', type=int, default=100_000,
+                            help="Never recommend fewer iterations than this")
+
+    def handle(self, *args, **options):
+        target = options['target_ms'] / 1000
+        if target <= 0:
+            raise CommandError("--target-ms must be positive")
+        samples = max(1, options['samples'])
+
+        # Start small and scale until one measurement is long enough to trust
+        iterations = 10_000
+        elapsed = _time_pbkdf2(iterations, samples)
+        while elapsed < 0.02:
+            iterations *= 4
+            elapsed = _time_pbkdf2(iterations, samples)
+
+        recommended = int(iterations * target / elapsed)
+        recommended = max(options['minimum'], recommended // 1000 * 1000)
+        measured = _time_pbkdf2(recommended, samples)
+
+        self.stdout.write(
+            f"{recommended} iterations -> {measured * 1000:.1f} ms per hash "
+            f"(target {options['target_ms']:.0f} ms, median of {samples})"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"STUDENT_API['PASSWORD_HASH_ITERATIONS'] = {recommended}"
+        ))
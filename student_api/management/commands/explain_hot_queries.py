@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from student_api.services.index_advisor import (
+    create_missing_indexes, explain, hot_queries, missing_index_ddl
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the hot queries from views.py, flag full scans and filesorts, "
+        "and print DDL for the recommended STUDENT indexes that are missing"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--fail-on-scan', action='store_true',
+                            help="Exit with an error if any hot query scans or filesorts")
+        parser.add_argument('--apply', action='store_true',
+                            help="Create the missing recommended indexes before explaining")
+        parser.add_argument('--verbose-plans', action='store_true',
+                            help="Print the raw EXPLAIN output for every query")
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if options['apply']:
+            for index in create_missing_indexes(using):
+                self.stdout.write(f"Created index {index.name}")
+
+        failures = []
+        for query in hot_queries():
+            report = explain(query, using)
+            problems = report.problems
+            label = self.style.ERROR('SCAN') if problems else self.style.SUCCESS('OK  ')
+            self.stdout.write(f"{label} {query.name}")
+            for problem in problems:
+                hint = f" (expected {query.index})" if query.index else ""
+                self.stdout.write(f"       {problem}{hint}")
+            if options['verbose_plans'] or problems:
+                for line in report.plan.splitlines():
+                    self.stdout.write(f"       | {line}")
+            if problems:
+                failures.append(query.name)
+
+        ddl = missing_index_ddl(using)
+        if ddl:
+            self.stdout.write("\nRecommended indexes missing from STUDENT:")
+            for statement in ddl:
+                self.stdout.write(statement)
+        else:
+            self.stdout.write("\nAll recommended STUDENT indexes exist.")
+
+        if failures and options['fail_on_scan']:
+            raise CommandError(f"{len(failures)} hot query(ies) regressed to a scan: {failures}")
@@ -0,0 +1,114 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from student_api.conf import get_setting
+from student_api.services.import_service import (
+    ImportCheckpoint, InvalidCheckpoint, StudentImporter, detect_format,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream students from a CSV (with a header line) or NDJSON file and "
+        "upsert them on EMAIL in chunks. Invalid rows go to a reject file; "
+        "progress is checkpointed after every chunk so an interrupted import "
+        "can be resumed with --resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'ndjson'],
+                            help="Input format (default: from the file extension)")
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help="Records per transaction and checkpoint")
+        parser.add_argument('--batch-size', type=int,
+                            help="Rows per INSERT (default: BULK_BATCH_SIZE)")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Password hashing processes (0 hashes in-process)")
+        parser.add_argument('--hash-iterations', type=int,
+                            help="PBKDF2 iterations for imported passwords; upgraded "
+                                 "to the configured work factor on first login")
+        parser.add_argument('--checkpoint', help="Default: <path>.checkpoint.json")
+        parser.add_argument('--rejects', help="Default: <path>.rejects.ndjson")
+        parser.add_argument('--encoding', default='utf-8')
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument('--resume', action='store_true',
+                           help="Continue from an existing checkpoint")
+        group.add_argument('--restart', action='store_true',
+                           help="Ignore an existing checkpoint and start over")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.isfile(path):
+            raise CommandError(f"{path} does not exist")
+        try:
+            fmt = options['format'] or detect_format(path)
+        except ValueError as e:
+            raise CommandError(str(e))
+        rejects_path = options['rejects'] or f'{path}.rejects.ndjson'
+
+        checkpoint = ImportCheckpoint(options['checkpoint'] or f'{path}.checkpoint.json', path)
+        if checkpoint.exists():
+            if options['resume']:
+                try:
+                    checkpoint.load()
+                except InvalidCheckpoint as e:
+                    raise CommandError(f"{e}; use --restart to start over")
+                self.stderr.write(
+                    f"Resuming after record {checkpoint.state['records']} "
+                    f"(byte {checkpoint.state['offset']})"
+                )
+            elif not options['restart']:
+                raise CommandError(
+                    f"{checkpoint.path} exists; pass --resume to continue or --restart to start over"
+                )
+
+        workers = options['workers']
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+        importer = StudentImporter(
+            batch_size=options['batch_size'] or get_setting('BULK_BATCH_SIZE'),
+            executor=executor,
+            workers=workers,
+            hash_iterations=options['hash_iterations'],
+        )
+
+        start = time.perf_counter()
+        first = checkpoint.state['records']
+
+        def progress(state):
+            elapsed = time.perf_counter() - start
+            rate = (state['records'] - first) / elapsed if elapsed else 0
+            self.stderr.write(
+                f"{state['records']} records ({state['created']} created, "
+                f"{state['updated']} updated, {state['rejected']} rejected) "
+                f"- {rate:.0f}/s"
+            )
+
+        mode = 'r+b' if checkpoint.state['reject_offset'] and os.path.exists(rejects_path) else 'wb'
+        try:
+            with open(path, 'rb') as f, open(rejects_path, mode) as rejects:
+                state = importer.run(
+                    f, fmt, checkpoint, rejects,
+                    chunk_size=options['chunk_size'],
+                    encoding=options['encoding'],
+                    progress=progress,
+                )
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        checkpoint.remove()
+        if not state['rejected']:
+            os.remove(rejects_path)
+        summary = (
+            f"Imported {state['records']} records in {time.perf_counter() - start:.1f}s: "
+            f"{state['created']} created, {state['updated']} updated, "
+            f"{state['duplicates']} duplicate(s) in the input, {state['rejected']} rejected"
+        )
+        if state['rejected']:
+            self.stdout.write(self.style.WARNING(f"{summary} (see {rejects_path})"))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
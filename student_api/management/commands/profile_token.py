@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from student_api.conf import get_setting
+from student_api.profiling import PROFILE_HEADER, make_profile_token, profile_dir
+
+
+class Command(BaseCommand):
+    help = (
+        "Print a signed X-Student-Profile header value. Requests that send it "
+        "are profiled (subject to the per-route caps) even while "
+        "PROFILING_ENABLED is off, until the token expires."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--route', default='*',
+                            help="URL name the token is valid for (default: any route)")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{PROFILE_HEADER}: {make_profile_token(options['route'])}")
+        self.stderr.write(
+            f"Valid for {get_setting('PROFILING_TOKEN_MAX_AGE')}s; "
+            f"profiles are written to {profile_dir()}"
+        )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from student_api.conf import get_setting
+from student_api.services.change_feed_service import StudentChangeFeedService
+
+
+class Command(BaseCommand):
+    help = "Delete change-feed tombstones older than CHANGE_FEED_RETENTION_DAYS"
+
+    def handle(self, *args, **options):
+        deleted = StudentChangeFeedService.prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(
+            f"Pruned {deleted} tombstones older than "
+            f"{get_setting('CHANGE_FEED_RETENTION_DAYS')} days"
+        ))
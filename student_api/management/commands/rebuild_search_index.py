@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from student_api.models import Student, StudentSearchToken
+from student_api.services.search_service import StudentSearchService
+from student_api.utils.pagination import iterate_keyset
+
+
+class Command(BaseCommand):
+    help = "Rebuild the STUDENT_SEARCH_TOKEN trigram index from STUDENT"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        StudentSearchToken.objects.all().delete()
+
+        batch, indexed = [], 0
+        for student in iterate_keyset(Student.objects.all(), 'id', batch_size):
+            batch.append(student)
+            if len(batch) >= batch_size:
+                StudentSearchService.index_students(batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            StudentSearchService.index_students(batch)
+            indexed += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} students"))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from student_api.services.counter_service import StudentCounterService
+from student_api.services.rollup_service import StudentRollupService
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount STUDENT_ROLLUP (and the STUDENT_COUNTER status buckets) from "
+        "STUDENT and fix any drift. Safe to run while the API is serving."
+    )
+
+    def handle(self, *args, **options):
+        drift = StudentRollupService.rebuild()
+        for (dimension, value, deleted), (stored, actual) in sorted(drift.items()):
+            self.stdout.write(f"{dimension}={value!r} deleted={deleted}: {stored} -> {actual}")
+        counter_drift = StudentCounterService.reconcile()
+        for (profile_status, deleted), (stored, actual) in sorted(counter_drift.items()):
+            self.stdout.write(f"PROFILE_STATUS={profile_status!r} deleted={deleted}: {stored} -> {actual}")
+        fixed = len(drift) + len(counter_drift)
+        if fixed:
+            self.stdout.write(self.style.WARNING(f"Fixed {fixed} drifted rollup(s)"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Rollups are in sync"))
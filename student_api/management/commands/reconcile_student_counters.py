@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from student_api.services.counter_service import StudentCounterService
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount STUDENT rows per (PROFILE_STATUS, DELETED) and fix any drift "
+        "in STUDENT_COUNTER. Safe to run periodically (e.g. from cron)."
+    )
+
+    def handle(self, *args, **options):
+        drift = StudentCounterService.reconcile()
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Counters are in sync"))
+            return
+        for (profile_status, deleted), (stored, actual) in sorted(drift.items()):
+            self.stdout.write(
+                f"{profile_status} deleted={deleted}: {stored} -> {actual}"
+            )
+        self.stdout.write(self.style.WARNING(f"Fixed {len(drift)} drifted counter(s)"))
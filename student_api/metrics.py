@@ -0,0 +1,208 @@
+# student_api/metrics.py
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.backends.signals import connection_created
+
+from .conf import get_setting
+
+logger = logging.getLogger('student_api.metrics')
+
+# Measurements of the request being handled; None outside requests
+_current = ContextVar('student_api_metrics', default=None)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class RequestMetrics:
+    """What one request spent, filled in by query_wrapper() and the serialization timers"""
+    __slots__ = ('start', 'queries', 'db_time', 'serialize_time', 'statements')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.statements = Counter()
+
+    def repeated(self, threshold):
+        """SELECTs (with placeholders) run at least ``threshold`` times"""
+        return {sql: n for sql, n in self.statements.items() if n >= threshold}
+
+    def server_timing(self, total):
+        app = max(total - self.db_time - self.serialize_time, 0.0)
+        return (
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries", '
+            f'ser;dur={self.serialize_time * 1000:.1f}, '
+            f'app;dur={app * 1000:.1f}, '
+            f'total;dur={total * 1000:.1f}'
+        )
+
+
+@contextmanager
+def measured(metrics):
+    """Attribute the queries and serialization inside the block to ``metrics``"""
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed_serialization():
+    """Count the block as serialization time of the current request"""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serialize_time += time.perf_counter() - start
+
+
+def time_rendering(response):
+    """Count the rendering of a template/DRF response as serialization time"""
+    metrics = _current.get()
+    if metrics is None:
+        return
+    start = time.perf_counter()
+
+    def rendered(response):
+        metrics.serialize_time += time.perf_counter() - start
+
+    response.add_post_render_callback(rendered)
+
+
+def query_wrapper(execute, sql, params, many, context):
+    """connection.execute_wrapper() recording queries and DB time per request"""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - start
+        metrics.queries += 1
+        # Batched writes repeat their INSERT/UPDATE by design; N+1 is about reads
+        if sql.startswith('SELECT'):
+            metrics.statements[sql] += 1
+
+
+def _attach(sender=None, connection=None, **kwargs):
+    if query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_wrapper)
+
+
+def install_query_wrapper():
+    """Wrap every database connection as it opens (called from AppConfig.ready)"""
+    connection_created.connect(_attach, dispatch_uid='student_api_metrics')
+
+
+class Histogram:
+    """Cumulative Prometheus histogram with one series per route"""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}
+
+    def observe(self, route, value):
+        series = self._series.get(route)
+        if series is None:
+            # counts per bucket (the last one is +Inf), then sum
+            series = self._series[route] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def exposition(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for route, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{route="{route}",le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{route="{route}"}} {total}')
+            lines.append(f'{self.name}_count{{route="{route}"}} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """Per-process request histograms, exposed in the Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.latency = Histogram(
+                'student_api_request_duration_seconds', 'Time to build the response.',
+                LATENCY_BUCKETS,
+            )
+            self.db_time = Histogram(
+                'student_api_db_duration_seconds', 'Time spent in SQL per request.',
+                LATENCY_BUCKETS,
+            )
+            self.queries = Histogram(
+                'student_api_db_queries', 'SQL statements per request.', QUERY_BUCKETS,
+            )
+            self.serialize_time = Histogram(
+                'student_api_serialization_duration_seconds',
+                'Time spent serializing and rendering per request.', LATENCY_BUCKETS,
+            )
+            self.response_size = Histogram(
+                'student_api_response_size_bytes', 'Response body size.', SIZE_BUCKETS,
+            )
+            self.repeated_queries = Counter()
+
+    def record(self, route, metrics, total, size, repeated):
+        with self._lock:
+            self.latency.observe(route, total)
+            self.db_time.observe(route, metrics.db_time)
+            self.queries.observe(route, metrics.queries)
+            self.serialize_time.observe(route, metrics.serialize_time)
+            if size is not None:
+                self.response_size.observe(route, size)
+            if repeated:
+                self.repeated_queries[route] += 1
+
+    def exposition(self):
+        with self._lock:
+            lines = []
+            for histogram in (self.latency, self.db_time, self.queries,
+                              self.serialize_time, self.response_size):
+                lines.extend(histogram.exposition())
+            name = 'student_api_repeated_query_requests_total'
+            lines.append(f'# HELP {name} Requests that ran the same SQL statement '
+                         f'REPEATED_QUERY_THRESHOLD or more times (likely N+1).')
+            lines.append(f'# TYPE {name} counter')
+            for route, count in sorted(self.repeated_queries.items()):
+                lines.append(f'{name}{{route="{route}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def finish(request, metrics, size):
+    """Record a finished request under its URL name and flag repeated queries"""
+    total = time.perf_counter() - metrics.start
+    match = request.resolver_match
+    route = match.url_name if match is not None and match.url_name else 'unmatched'
+    repeated = metrics.repeated(get_setting('REPEATED_QUERY_THRESHOLD'))
+    for sql, count in repeated.items():
+        logger.warning("%s ran the same query %d times (N+1?): %s", route, count, sql[:300])
+    registry.record(route, metrics, total, size, repeated)
+    return total
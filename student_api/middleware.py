@@ -0,0 +1,184 @@
+# student_api/middleware.py
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .conf import get_setting
+from .db import routers
+from .metrics import RequestMetrics, finish, measured, time_rendering
+from .profiling import profile_call, route_to_profile
+
+
+def _iterate_routed(iterator, state):
+    """Run a streaming body's queries with the request's routing state"""
+    iterator = iter(iterator)
+    while True:
+        with routers.routed(state):
+            chunk = next(iterator, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+async def _aiterate_routed(iterator, state):
+    iterator = aiter(iterator)
+    while True:
+        with routers.routed(state):
+            chunk = await anext(iterator, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Chooses the database each request reads from (see db.routers): a read
+    replica for GET/HEAD/OPTIONS, the primary for everything else and for
+    clients that wrote within REPLICA_PIN_SECONDS. A request that writes
+    pins its client to the primary. Does nothing while READ_REPLICAS is empty.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not routers.replicas_enabled():
+            return self.get_response(request)
+
+        state = routers.RoutingState(
+            routers.choose_read_alias(request, routers.is_pinned(request))
+        )
+        with routers.routed(state):
+            response = self.get_response(request)
+        if response.streaming and not response.is_async:
+            response.streaming_content = _iterate_routed(response.streaming_content, state)
+        if state.wrote:
+            routers.pin(request, response)
+        return response
+
+    async def __acall__(self, request):
+        if not routers.replicas_enabled():
+            return await self.get_response(request)
+
+        state = routers.RoutingState(
+            routers.choose_read_alias(request, await routers.ais_pinned(request))
+        )
+        with routers.routed(state):
+            response = await self.get_response(request)
+        if response.streaming and response.is_async:
+            response.streaming_content = _aiterate_routed(response.streaming_content, state)
+        if state.wrote:
+            await routers.apin(request, response)
+        return response
+
+
+def _iterate_measured(iterator, request, metrics):
+    """Stream a body under ``metrics`` and record the request once it ends"""
+    size = 0
+    iterator = iter(iterator)
+    while True:
+        with measured(metrics):
+            chunk = next(iterator, None)
+        if chunk is None:
+            break
+        size += len(chunk)
+        yield chunk
+    finish(request, metrics, size)
+
+
+async def _aiterate_measured(iterator, request, metrics):
+    size = 0
+    iterator = aiter(iterator)
+    while True:
+        with measured(metrics):
+            chunk = await anext(iterator, None)
+        if chunk is None:
+            break
+        size += len(chunk)
+        yield chunk
+    finish(request, metrics, size)
+
+
+class RequestMetricsMiddleware:
+    """
+    Per-route latency, SQL count and time, serialization time and response
+    size (see student_api.metrics), exposed at /metrics. With
+    SERVER_TIMING_ENABLED the same timings go out in a Server-Timing
+    header. Streamed responses are recorded when their body ends. Keep it
+    first in MIDDLEWARE so the latency covers the other middleware too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not get_setting('METRICS_ENABLED'):
+            return self.get_response(request)
+
+        with measured(RequestMetrics()) as metrics:
+            response = self.get_response(request)
+        if response.streaming and not response.is_async:
+            response.streaming_content = _iterate_measured(
+                response.streaming_content, request, metrics
+            )
+            return response
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not get_setting('METRICS_ENABLED'):
+            return await self.get_response(request)
+
+        with measured(RequestMetrics()) as metrics:
+            response = await self.get_response(request)
+        if response.streaming and response.is_async:
+            response.streaming_content = _aiterate_measured(
+                response.streaming_content, request, metrics
+            )
+            return response
+        return self._finish(request, response, metrics)
+
+    def _finish(self, request, response, metrics):
+        size = None if response.streaming else len(response.content)
+        total = finish(request, metrics, size)
+        if get_setting('SERVER_TIMING_ENABLED'):
+            response.headers['Server-Timing'] = metrics.server_timing(total)
+        return response
+
+    def process_template_response(self, request, response):
+        time_rendering(response)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a sample of requests (see student_api.profiling) while
+    PROFILING_ENABLED, or any request with a signed X-Student-Profile
+    header. Only the view and rendering are covered, not a streamed body.
+    Async requests pass through: their work hops between the event loop
+    and executor threads, so a per-thread profile would mix requests.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.get_response(request)
+        route = route_to_profile(request)
+        if route is None:
+            return self.get_response(request)
+        return profile_call(route, self.get_response, request)
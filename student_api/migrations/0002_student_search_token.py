@@ -0,0 +1,29 @@
+# Generated by Django 4.2 on 2026-10-18 04:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student_api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('TOKEN', models.CharField(max_length=3)),
+                ('STUDENT_ID', models.IntegerField(db_index=True)),
+                ('WEIGHT', models.PositiveSmallIntegerField()),
+            ],
+            options={
+                'db_table': 'STUDENT_SEARCH_TOKEN',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='studentsearchtoken',
+            index=models.Index(fields=['TOKEN', 'STUDENT_ID'], name='IDX_SEARCH_TOKEN_STUDENT'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2 on 2026-10-18 04:53
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def seed_counters(apps, schema_editor):
+    """Fill STUDENT_COUNTER from the existing STUDENT rows"""
+    Student = apps.get_model('student_api', 'Student')
+    StudentCounter = apps.get_model('student_api', 'StudentCounter')
+    connection = schema_editor.connection
+    if Student._meta.db_table not in connection.introspection.table_names():
+        return
+    counts = {}
+    rows = Student.objects.values('PROFILE_STATUS', 'DELETED').annotate(n=Count('STUDENT_ID')).order_by()
+    for row in rows:
+        deleted = row['DELETED']
+        if isinstance(deleted, bytes):
+            deleted = bool(int.from_bytes(deleted, byteorder='big'))
+        key = (row['PROFILE_STATUS'], bool(deleted))
+        counts[key] = counts.get(key, 0) + row['n']
+    StudentCounter.objects.bulk_create([
+        StudentCounter(PROFILE_STATUS=status, DELETED=deleted, COUNT=n)
+        for (status, deleted), n in counts.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student_api', '0002_student_search_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('PROFILE_STATUS', models.CharField(max_length=20)),
+                ('DELETED', models.BooleanField()),
+                ('COUNT', models.BigIntegerField(default=0)),
+                ('UPDATED_AT', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'STUDENT_COUNTER',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='studentcounter',
+            constraint=models.UniqueConstraint(fields=('PROFILE_STATUS', 'DELETED'), name='UNQ_STUDENT_COUNTER_BUCKET'),
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2 on 2026-10-18 05:39
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student_api', '0003_student_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('STUDENT_ID', models.IntegerField()),
+                ('DELETED_AT', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'STUDENT_TOMBSTONE',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='studenttombstone',
+            index=models.Index(fields=['DELETED_AT', 'id'], name='IDX_TOMBSTONE_DELETED'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2 on 2026-10-18 05:43
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def seed_rollups(apps, schema_editor):
+    """Fill STUDENT_ROLLUP from the existing STUDENT rows"""
+    Student = apps.get_model('student_api', 'Student')
+    StudentRollup = apps.get_model('student_api', 'StudentRollup')
+    connection = schema_editor.connection
+    if Student._meta.db_table not in connection.introspection.table_names():
+        return
+
+    def as_bool(value):
+        if isinstance(value, bytes):
+            return bool(int.from_bytes(value, byteorder='big'))
+        return bool(value)
+
+    counts = {}
+    students = Student.objects.annotate(
+        SIGNUP_DATE=TruncDate('CREATED_AT', tzinfo=timezone.get_default_timezone())
+    )
+    for dimension in ('ADDRESS_STATE', 'COLLEGE', 'EDUCATION', 'EMAIL_VERIFIED', 'SIGNUP_DATE'):
+        rows = students.values(dimension, 'DELETED').annotate(n=Count('STUDENT_ID')).order_by()
+        for row in rows:
+            value = row[dimension]
+            if dimension == 'EMAIL_VERIFIED':
+                value = 'true' if as_bool(value) else 'false'
+            elif dimension == 'SIGNUP_DATE':
+                value = value.isoformat()
+            else:
+                value = (value or '')[:255]
+            key = (dimension, value, as_bool(row['DELETED']))
+            counts[key] = counts.get(key, 0) + row['n']
+    StudentRollup.objects.bulk_create([
+        StudentRollup(DIMENSION=dimension, VALUE=value, DELETED=deleted, COUNT=n)
+        for (dimension, value, deleted), n in counts.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student_api', '0004_student_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('DIMENSION', models.CharField(max_length=20)),
+                ('VALUE', models.CharField(max_length=255)),
+                ('DELETED', models.BooleanField()),
+                ('COUNT', models.BigIntegerField(default=0)),
+                ('UPDATED_AT', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'STUDENT_ROLLUP',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='studentrollup',
+            constraint=models.UniqueConstraint(fields=('DIMENSION', 'VALUE', 'DELETED'), name='UNQ_STUDENT_ROLLUP_BUCKET'),
+        ),
+        migrations.RunPython(seed_rollups, migrations.RunPython.noop),
+    ]
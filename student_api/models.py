@@ -1,7 +1,18 @@
 # student_api/models.py
-from django.db import models
+from django.db import models, router, transaction
 from django.utils import timezone
 
+
+def bit_to_bool(value):
+    """MySQL BIT(1) columns come back from mysqlclient as bytes"""
+    if isinstance(value, bytes):
+        return bool(int.from_bytes(value, byteorder='big'))
+    return value
+
+
+_NOT_LOADED = object()
+
+
 class Student(models.Model):
     STUDENT_ID = models.AutoField(primary_key=True)
     NAME = models.CharField(max_length=45, default='Doctor')
@@ -28,6 +39,22 @@ class Student(models.Model):
     class Meta:
         db_table = 'STUDENT'
         managed = False
+        # STUDENT is not managed by migrations, so these are never created
+        # automatically: `manage.py explain_hot_queries` prints the DDL for
+        # any that are missing and checks the hot queries use them.
+        indexes = [
+            # student_login, send_otp, verify_otp, forgot_password, reset_password
+            models.Index(fields=['MOBILE_NO', 'DELETED'], name='IDX_STUDENT_MOBILE_DELETED'),
+            # get_all_students keyset pages (order=created)
+            models.Index(fields=['CREATED_AT', 'STUDENT_ID'], name='IDX_STUDENT_CREATED'),
+            # get_active_students / get_students_by_status keyset pages
+            models.Index(fields=['PROFILE_STATUS', 'CREATED_AT', 'STUDENT_ID'],
+                         name='IDX_STUDENT_STATUS_CREATED'),
+            models.Index(fields=['PROFILE_STATUS', 'STUDENT_ID'], name='IDX_STUDENT_STATUS_ID'),
+            # ETag / Last-Modified of the list endpoints (newest UPDATED_AT)
+            models.Index(fields=['UPDATED_AT', 'STUDENT_ID'], name='IDX_STUDENT_UPDATED'),
+            models.Index(fields=['PROFILE_STATUS', 'UPDATED_AT'], name='IDX_STUDENT_STATUS_UPDATED'),
+        ]
 
     def __str__(self):
         return f"{self.NAME} ({self.EMAIL})"
@@ -35,57 +62,279 @@ class Student(models.Model):
     # Custom method to handle MySQL bit field conversion
     def save(self, *args, **kwargs):
         # Convert bytes to boolean if needed (for MySQL bit fields)
-        if isinstance(self.EMAIL_VERIFIED, bytes):
-            self.EMAIL_VERIFIED = bool(int.from_bytes(self.EMAIL_VERIFIED, byteorder='big'))
-        if isinstance(self.DELETED, bytes):
-            self.DELETED = bool(int.from_bytes(self.DELETED, byteorder='big'))
-        super().save(*args, **kwargs)
+        for attname in ('EMAIL_VERIFIED', 'DELETED'):
+            if attname in self.__dict__:
+                setattr(self, attname, bit_to_bool(getattr(self, attname)))
+
+        # Only write the columns that changed since the row was loaded
+        adding = self._state.adding
+        if (not adding and kwargs.get('update_fields') is None
+                and not kwargs.get('force_insert') and hasattr(self, '_loaded_values')):
+            dirty = self.get_dirty_fields()
+            if not dirty:
+                return
+            kwargs['update_fields'] = dirty + ['UPDATED_AT']
+        update_fields = kwargs.get('update_fields')
+
+        # Keep STUDENT_COUNTER and STUDENT_ROLLUP in the same transaction as the row change
+        from .services.counter_service import StudentCounterService
+        from .services.rollup_service import ROLLUP_COLUMNS, StudentRollupService
+        touches_key = update_fields is None or bool(
+            {'PROFILE_STATUS', 'DELETED'} & set(update_fields)
+        )
+        touches_rollups = update_fields is None or bool(set(ROLLUP_COLUMNS) & set(update_fields))
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            old = None
+            if not adding and (touches_key or touches_rollups):
+                old = self._locked_row(using)
+            super().save(*args, **kwargs)
+            # No stored row means save() inserted one
+            if touches_key:
+                StudentCounterService.record_change(
+                    None if old is None else self.counter_key(old), self.counter_key()
+                )
+            if touches_rollups:
+                StudentRollupService.record_change(
+                    None if old is None else self.rollup_values(old), self.rollup_values()
+                )
+        self._remember_values(update_fields)
+
+    def delete(self, *args, **kwargs):
+        from .services.counter_service import StudentCounterService
+        from .services.rollup_service import StudentRollupService
+        from .services.token_service import StudentTokenService
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            old = self._locked_row(using)
+            student_id = self.STUDENT_ID
+            result = super().delete(*args, **kwargs)
+            # A concurrent delete got there first and already moved the counts
+            if old is not None:
+                StudentCounterService.record_change(self.counter_key(old), None)
+                StudentRollupService.record_change(self.rollup_values(old), None)
+                # Tokens verify without a query, so they outlive the row unless revoked
+                nonces = {old['UNIQUE_TOKEN'], self.UNIQUE_TOKEN}
+                transaction.on_commit(
+                    lambda: StudentTokenService.revoke_many(
+                        (student_id, nonce) for nonce in nonces
+                    ),
+                    using=using,
+                )
+        return result
+
+    def _locked_row(self, using):
+        """
+        The stored PROFILE_STATUS, UNIQUE_TOKEN and rollup columns, locked
+        until the transaction ends (None when there is no row). The counters
+        are moved from these rather than from the in-memory snapshot, which
+        a concurrent write may have made stale.
+        """
+        from .services.rollup_service import ROLLUP_COLUMNS
+        return (Student.objects.using(using).select_for_update().filter(pk=self.pk)
+                .values('PROFILE_STATUS', 'UNIQUE_TOKEN', *ROLLUP_COLUMNS).first())
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using, fields, **kwargs)
+        # The reloaded values are what the database holds now
+        self._remember_values(fields)
 
     @classmethod
     def from_db(cls, db, field_names, values):
         # Handle conversion when loading from database
         instance = super().from_db(db, field_names, values)
         
-        # Convert bytes to boolean for bit fields
-        if isinstance(instance.EMAIL_VERIFIED, bytes):
-            instance.EMAIL_VERIFIED = bool(int.from_bytes(instance.EMAIL_VERIFIED, byteorder='big'))
-        if isinstance(instance.DELETED, bytes):
-            instance.DELETED = bool(int.from_bytes(instance.DELETED, byteorder='big'))
-            
+        # Convert bytes to boolean for bit fields (skipping deferred ones)
+        for attname in ('EMAIL_VERIFIED', 'DELETED'):
+            if attname in instance.__dict__:
+                setattr(instance, attname, bit_to_bool(getattr(instance, attname)))
+
+        instance._loaded_values = {}
+        instance._remember_values()
         return instance
 
+    # CHANGE TRACKING
+    def _remember_values(self, fields=None):
+        """Snapshot column values as stored, so save() can diff against them"""
+        if not hasattr(self, '_loaded_values'):
+            self._loaded_values = {}
+        for field in self._meta.concrete_fields:
+            if field.attname not in self.__dict__:
+                continue  # deferred
+            if fields is None or field.name in fields or field.attname in fields:
+                self._loaded_values[field.attname] = getattr(self, field.attname)
+
+    def get_dirty_fields(self):
+        """Names of the loaded columns whose value differs from the database"""
+        dirty = []
+        for field in self._meta.concrete_fields:
+            if field.primary_key or field.attname not in self.__dict__:
+                continue
+            stored = self._loaded_values.get(field.attname, _NOT_LOADED)
+            if stored is _NOT_LOADED or stored != getattr(self, field.attname):
+                dirty.append(field.attname)
+        return dirty
+
+    def counter_key(self, values=None):
+        """The STUDENT_COUNTER bucket of this row, or of stored ``values``"""
+        if values is None:
+            return (self.PROFILE_STATUS, bool(self.DELETED))
+        return (values['PROFILE_STATUS'], bool(bit_to_bool(values['DELETED'])))
+
+    def rollup_values(self, values=None):
+        """The columns that place this row (or stored ``values``) in the STUDENT_ROLLUP buckets"""
+        from .services.rollup_service import ROLLUP_COLUMNS
+        if values is None:
+            return {column: getattr(self, column) for column in ROLLUP_COLUMNS}
+        return {column: values[column] for column in ROLLUP_COLUMNS}
+
     # NEW METHODS ADDED BELOW
-    def set_password(self, raw_password):
-        """Encrypt and set password"""
-        from .utils.encryption import SimplePasswordEncryption
-        encryptor = SimplePasswordEncryption()
-        self.PASSWORD = encryptor.encrypt_password(raw_password, self.MOBILE_NO)
+    def set_password(self, raw_password, save=True):
+        """Hash and set password (save=False leaves the write to the caller)"""
+        from django.contrib.auth.hashers import make_password
+        self.PASSWORD = make_password(raw_password)
         self.PASSWORD_UPDATED_AT = timezone.now()
-        self.save()
+        self.rotate_token(save=False)
+        if save:
+            self.save()
+
+    def rotate_token(self, save=True):
+        """New UNIQUE_TOKEN nonce; access tokens issued with the old one are revoked"""
+        from .services.token_service import StudentTokenService
+        if self.UNIQUE_TOKEN:
+            StudentTokenService.revoke_many([(self.STUDENT_ID, self.UNIQUE_TOKEN)])
+        self.UNIQUE_TOKEN = StudentTokenService.new_nonce()
+        if save:
+            self.save()
 
     def check_password(self, raw_password):
-        """Verify password"""
-        from .utils.encryption import SimplePasswordEncryption
-        encryptor = SimplePasswordEncryption()
-        decrypted = encryptor.decrypt_password(self.PASSWORD, self.MOBILE_NO)
-        return decrypted == raw_password
-
-    def generate_otp(self):
-        """Generate and save OTP"""
+        """Verify password, re-hashing legacy or outdated values on success"""
+        is_valid, upgraded = self._verify_password(raw_password)
+        if upgraded:
+            self.PASSWORD = upgraded
+            self.save()
+        return is_valid
+
+    async def acheck_password(self, raw_password):
+        """check_password for async views: hashing runs on the bounded hash pool"""
+        from .utils.hashers import run_in_hash_pool
+        is_valid, upgraded = await run_in_hash_pool(self._verify_password, raw_password)
+        if upgraded:
+            self.PASSWORD = upgraded
+            await self.asave()
+        return is_valid
+
+    def _verify_password(self, raw_password):
+        """
+        CPU-only part of check_password. Returns (is_valid, new_hash), where
+        new_hash is set when the stored value should be upgraded: legacy XOR
+        ciphertext, or a hasher/work factor that is no longer preferred.
+        """
+        from django.contrib.auth.hashers import check_password, make_password
+        from .utils.hashers import check_legacy_password, is_legacy_password
+
+        if is_legacy_password(self.PASSWORD):
+            is_valid = check_legacy_password(raw_password, self.PASSWORD, self.MOBILE_NO)
+            return is_valid, make_password(raw_password) if is_valid else None
+
+        needs_upgrade = []
+        is_valid = check_password(raw_password, self.PASSWORD, setter=needs_upgrade.append)
+        return is_valid, make_password(raw_password) if needs_upgrade else None
+
+    def generate_otp(self, forgot_password=False):
+        """Generate an OTP and keep it in the configured OTP store"""
         from .services.otp_service import OTPService
-        self.OTP = OTPService.generate_otp()
-        self.OTP_SENT_AT = timezone.now()
-        self.save()
-        return self.OTP
+        return OTPService.send_otp(self, forgot_password=forgot_password)
 
-    def soft_delete(self):
+    def soft_delete(self, save=True):
         """Soft delete instead of permanent delete"""
         self.DELETED = True
         self.PROFILE_STATUS = 'inactive'
-        self.save()
+        self.rotate_token(save=False)
+        if save:
+            self.save()
 
-    def restore(self):
+    def restore(self, save=True):
         """Restore soft deleted student"""
         self.DELETED = False
         self.PROFILE_STATUS = 'active'
-        self.save()
\ No newline at end of file
+        if save:
+            self.save()
+
+
+class StudentSearchToken(models.Model):
+    """
+    Trigram inverted index over the searchable Student columns.
+    One row per distinct (trigram, column, student); kept in sync by
+    student_api.signals and rebuilt with `manage.py rebuild_search_index`.
+    """
+    TOKEN = models.CharField(max_length=3)
+    STUDENT_ID = models.IntegerField(db_index=True)
+    WEIGHT = models.PositiveSmallIntegerField()
+
+    class Meta:
+        db_table = 'STUDENT_SEARCH_TOKEN'
+        indexes = [
+            models.Index(fields=['TOKEN', 'STUDENT_ID'], name='IDX_SEARCH_TOKEN_STUDENT'),
+        ]
+
+
+class StudentCounter(models.Model):
+    """
+    Number of STUDENT rows per (PROFILE_STATUS, DELETED) bucket, so list
+    endpoints never COUNT(*). Maintained by Student.save/delete and the bulk
+    paths; `manage.py reconcile_student_counters` repairs any drift.
+    """
+    PROFILE_STATUS = models.CharField(max_length=20)
+    DELETED = models.BooleanField()
+    COUNT = models.BigIntegerField(default=0)
+    UPDATED_AT = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'STUDENT_COUNTER'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['PROFILE_STATUS', 'DELETED'], name='UNQ_STUDENT_COUNTER_BUCKET'
+            ),
+        ]
+
+
+class StudentTombstone(models.Model):
+    """
+    One row per hard-deleted student, so the change feed (students/changes/)
+    can report deletes that leave no STUDENT row behind. Written by
+    student_api.signals in the deleting transaction; rows older than
+    CHANGE_FEED_RETENTION_DAYS are removed by `manage.py prune_student_tombstones`.
+    """
+    STUDENT_ID = models.IntegerField()
+    DELETED_AT = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'STUDENT_TOMBSTONE'
+        indexes = [
+            models.Index(fields=['DELETED_AT', 'id'], name='IDX_TOMBSTONE_DELETED'),
+        ]
+
+
+class StudentRollup(models.Model):
+    """
+    Number of STUDENT rows per (DIMENSION, VALUE, DELETED): one dimension
+    per reported column (ADDRESS_STATE, COLLEGE, EDUCATION, EMAIL_VERIFIED)
+    plus SIGNUP_DATE, the CREATED_AT day in TIME_ZONE. PROFILE_STATUS is
+    already counted by STUDENT_COUNTER. Maintained alongside it by
+    Student.save/delete and the bulk paths; `manage.py rebuild_student_rollups`
+    recounts everything.
+    """
+    DIMENSION = models.CharField(max_length=20)
+    VALUE = models.CharField(max_length=255)
+    DELETED = models.BooleanField()
+    COUNT = models.BigIntegerField(default=0)
+    UPDATED_AT = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'STUDENT_ROLLUP'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['DIMENSION', 'VALUE', 'DELETED'], name='UNQ_STUDENT_ROLLUP_BUCKET'
+            ),
+        ]
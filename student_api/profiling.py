@@ -0,0 +1,286 @@
+# student_api/profiling.py
+import atexit
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from django.core import signing
+from django.urls import Resolver404, resolve
+
+from .conf import get_setting
+
+PROFILE_HEADER = 'X-Student-Profile'
+_SIGNING_SALT = 'student_api.profiling'
+
+
+def make_profile_token(route='*'):
+    """Value for the X-Student-Profile header that profiles ``route`` ('*' = any)"""
+    return signing.TimestampSigner(salt=_SIGNING_SALT).sign(route)
+
+
+def _token_route(request):
+    """Route named by a valid, unexpired profile header, else None"""
+    token = request.headers.get(PROFILE_HEADER)
+    if not token:
+        return None
+    try:
+        return signing.TimestampSigner(salt=_SIGNING_SALT).unsign(
+            token, max_age=get_setting('PROFILING_TOKEN_MAX_AGE')
+        )
+    except signing.BadSignature:
+        return None
+
+
+def profile_dir():
+    return get_setting('PROFILING_DIR') or os.path.join(
+        tempfile.gettempdir(), 'student_api_profiles'
+    )
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of registered threads every ``interval``
+    seconds from one daemon thread, which sleeps while nothing is profiled.
+    Costs the profiled request one sys._current_frames() walk per tick.
+    """
+
+    def __init__(self):
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def start(self, thread_id):
+        stacks = Counter()
+        with self._lock:
+            self._targets[thread_id] = stacks
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='student-api-profiler', daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+        return stacks
+
+    def stop(self, thread_id):
+        with self._lock:
+            self._targets.pop(thread_id, None)
+            if not self._targets:
+                self._wakeup.clear()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            time.sleep(get_setting('PROFILING_INTERVAL'))
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, stacks in self._targets.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[collapse(frame)] += 1
+
+
+def collapse(frame):
+    """One stack in the collapsed format (root first, ';'-separated)"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class RouteProfiles:
+    """
+    Per-route aggregates of profiled requests, written to PROFILING_DIR as
+    ``<route>.<pid>.collapsed`` (flamegraph.pl / speedscope input) or
+    ``<route>.<pid>.pstats``. Collapsed files are rewritten after a route's
+    first request, then at most every PROFILING_FLUSH_INTERVAL seconds and
+    when the route reaches its cap; pstats files after each request. A
+    route stops being profiled after PROFILING_MAX_SAMPLES requests or once
+    its file reaches PROFILING_MAX_FILE_BYTES.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Serializes file writes only; requests aggregate under _lock meanwhile
+        self._write_lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stacks = {}
+            self._stats = {}
+            self._samples = Counter()
+            self._full = set()
+            # Per route: snapshots taken, the last one written, when taken
+            self._versions = Counter()
+            self._written = Counter()
+            self._flushed_at = {}
+            self._pending = set()  # routes with stacks newer than their file
+
+    def accepts(self, route):
+        with self._lock:
+            return (route not in self._full
+                    and self._samples[route] < get_setting('PROFILING_MAX_SAMPLES'))
+
+    def _path(self, route, suffix):
+        directory = profile_dir()
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f'{route}.{os.getpid()}.{suffix}')
+
+    def add_stacks(self, route, stacks):
+        now = time.monotonic()
+        with self._lock:
+            self._samples[route] += 1
+            total = self._stacks.setdefault(route, Counter())
+            total.update(stacks)
+            self._pending.add(route)
+            flushed_at = self._flushed_at.get(route)
+            if not (flushed_at is None
+                    or now - flushed_at >= get_setting('PROFILING_FLUSH_INTERVAL')
+                    or self._samples[route] >= get_setting('PROFILING_MAX_SAMPLES')):
+                return
+            snapshot = self._snapshot_stacks(route, now)
+        self._write_stacks(route, *snapshot)
+
+    def flush(self):
+        """Write every collapsed profile that has samples not yet on disk"""
+        now = time.monotonic()
+        with self._lock:
+            snapshots = [(route, self._snapshot_stacks(route, now))
+                          for route in list(self._pending)]
+        for route, snapshot in snapshots:
+            self._write_stacks(route, *snapshot)
+
+    def _snapshot_stacks(self, route, now):
+        """Copy of the route's stacks to write outside _lock; caller holds _lock"""
+        self._pending.discard(route)
+        self._versions[route] += 1
+        self._flushed_at[route] = now
+        return self._stacks[route].copy(), self._versions[route]
+
+    def _write_stacks(self, route, stacks, version):
+        with self._write_lock:
+            # A newer snapshot of this route already reached the disk
+            if version <= self._written[route]:
+                return
+            self._written[route] = version
+            # Keep the heaviest stacks when the file would outgrow the cap
+            limit, size, lines = get_setting('PROFILING_MAX_FILE_BYTES'), 0, []
+            for stack, count in stacks.most_common():
+                line = f'{stack} {count}\n'
+                size += len(line.encode())
+                if size > limit:
+                    with self._lock:
+                        self._full.add(route)
+                    break
+                lines.append(line)
+            with open(self._path(route, 'collapsed'), 'w') as f:
+                f.writelines(lines)
+
+    def add_profile(self, route, profile):
+        import pstats
+        with self._lock:
+            self._samples[route] += 1
+            stats = self._stats.get(route)
+            if stats is None:
+                stats = self._stats[route] = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+            path = self._path(route, 'pstats')
+            stats.dump_stats(path)
+            if os.path.getsize(path) >= get_setting('PROFILING_MAX_FILE_BYTES'):
+                self._full.add(route)
+
+    def snapshot(self):
+        with self._lock:
+            return {'samples': dict(self._samples), 'full': sorted(self._full)}
+
+
+sampler = StackSampler()
+route_profiles = RouteProfiles()
+# Write out the stacks gathered since the last periodic write
+atexit.register(route_profiles.flush)
+
+
+def route_to_profile(request):
+    """
+    URL name to profile this request under, or None. Requests are picked
+    at PROFILING_SAMPLE_RATE among PROFILING_ROUTES while PROFILING_ENABLED,
+    or when they carry a signed X-Student-Profile header for their route.
+    """
+    forced = _token_route(request)
+    if forced is None:
+        if not get_setting('PROFILING_ENABLED'):
+            return None
+        if random.random() >= get_setting('PROFILING_SAMPLE_RATE'):
+            return None
+    try:
+        route = resolve(request.path_info).url_name
+    except Resolver404:
+        return None
+    if route is None:
+        return None
+    if forced is not None:
+        if forced not in ('*', route):
+            return None
+    else:
+        routes = get_setting('PROFILING_ROUTES')
+        if routes and route not in routes:
+            return None
+    return route if route_profiles.accepts(route) else None
+
+
+# cProfile hooks the whole interpreter on Python 3.12+, so a second
+# profile in another thread fails to start; only one runs at a time
+_cprofile_lock = threading.Lock()
+
+
+def _cprofile_call(route, func, args):
+    """
+    (True, result) after running ``func`` under cProfile, or (False, None)
+    without calling it when another profile (or tool) holds the hook.
+    """
+    if not _cprofile_lock.acquire(blocking=False):
+        return False, None
+    try:
+        # Imported on first use: pstats alone adds ~20 ms to worker startup
+        import cProfile
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiling tool is already active
+            return False, None
+        try:
+            return True, func(*args)
+        finally:
+            profile.disable()
+            route_profiles.add_profile(route, profile)
+    finally:
+        _cprofile_lock.release()
+
+
+def profile_call(route, func, *args):
+    """
+    Run ``func(*args)`` under the configured profiler and aggregate it under
+    ``route``. A cProfile request that finds the profiler busy falls back to
+    the stack sampler.
+    """
+    if get_setting('PROFILING_PROFILER') == 'cprofile':
+        profiled, result = _cprofile_call(route, func, args)
+        if profiled:
+            return result
+
+    thread_id = threading.get_ident()
+    stacks = sampler.start(thread_id)
+    try:
+        return func(*args)
+    finally:
+        sampler.stop(thread_id)
+        route_profiles.add_stacks(route, stacks)
@@ -0,0 +1,28 @@
+# student_api/renderers.py
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils import encoders
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline-delimited JSON. Streaming list views bypass rendering and
+    write rows directly; this renderer only handles the non-streamed
+    responses (errors) sent to clients that asked for NDJSON.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return json_line(data)
+
+
+def json_line(data):
+    """Encode one NDJSON record"""
+    return json.dumps(
+        data, cls=encoders.JSONEncoder, ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8') + b'\n'
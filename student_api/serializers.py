@@ -1,13 +1,168 @@
 # student_api/serializers.py
-from rest_framework import serializers
-from .models import Student
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from .conf import get_setting
+from .metrics import timed_serialization
+from .models import Student, bit_to_bool
+
+# Credentials and one-time secrets: never part of any response
+SENSITIVE_FIELDS = ('PASSWORD', 'OTP', 'UNIQUE_TOKEN')
+
+class InvalidFields(ValueError):
+    pass
 
 class StudentSerializer(serializers.ModelSerializer):
+    """Read representation of a student; ``fields`` narrows it to a subset"""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    def to_representation(self, instance):
+        with timed_serialization():
+            return super().to_representation(instance)
+
     class Meta:
         model = Student
-        fields = '__all__'
+        exclude = SENSITIVE_FIELDS
         read_only_fields = ('STUDENT_ID', 'CREATED_AT', 'UPDATED_AT')
 
+def resolve_fields(fields=None, preset=None):
+    """
+    Field names for ?fields=A,B and/or ?preset=<name> (STUDENT_API['FIELD_PRESETS']),
+    in serializer order; None when neither is given. Unknown names and the
+    sensitive columns raise InvalidFields.
+    """
+    if not fields and not preset:
+        return None
+    wanted = set()
+    if preset:
+        presets = get_setting('FIELD_PRESETS')
+        if preset not in presets:
+            raise InvalidFields(f"Unknown preset '{preset}'. Presets: {sorted(presets)}")
+        wanted.update(presets[preset])
+    if fields:
+        wanted.update(name.strip().upper() for name in fields.split(',') if name.strip())
+    readable = [field.field_name for field in student_rows.fields]
+    unknown = wanted - set(readable)
+    if unknown:
+        raise InvalidFields(
+            f"Unknown or restricted fields: {sorted(unknown)}. Allowed: {readable}"
+        )
+    return [name for name in readable if name in wanted]
+
+def _datetime_converter(tz):
+    """DateTimeField.to_representation for ISO 8601 output, with the timezone fixed"""
+    def convert(value):
+        if not value:
+            return None
+        aware = value.utcoffset() is not None
+        if tz is not None:
+            value = value.astimezone(tz) if aware else timezone.make_aware(value, tz)
+        elif aware:
+            value = timezone.make_naive(value, datetime.timezone.utc)
+        value = value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+def _boolean(value):
+    return bool(bit_to_bool(value))
+
+class ValuesListSerializer:
+    """
+    Read-only fast path for list endpoints. Rows come from values_list()
+    and each column goes through a converter precompiled from the matching
+    field of ``serializer_class``. No model instances are built and no DRF
+    field machinery runs per row. The output equals
+    ``serializer_class(instances, many=True).data``.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self._fields = None
+        self._converters = {}  # per active timezone
+
+    @property
+    def fields(self):
+        if self._fields is None:
+            self._fields = [
+                field for field in self.serializer_class().fields.values()
+                if not field.write_only
+            ]
+        return self._fields
+
+    @property
+    def columns(self):
+        return [field.source for field in self.fields]
+
+    def values(self, queryset, fields=None, extra=()):
+        """
+        ``queryset`` as named rows holding the columns for ``fields`` (None
+        for all), plus ``extra`` columns the caller needs, such as keyset keys.
+        Extra columns come last and are left out of the output.
+        """
+        selected = self.fields if fields is None else [
+            field for field in self.fields if field.field_name in fields
+        ]
+        columns = [field.source for field in selected]
+        columns += [column for column in extra if column not in columns]
+        return queryset.values_list(*columns, named=True)
+
+    def _compile(self, field, tz):
+        if isinstance(field, serializers.BooleanField):
+            return _boolean
+        if isinstance(field, serializers.IntegerField):
+            return int
+        if isinstance(field, serializers.CharField):
+            return str
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        if (isinstance(field, serializers.DateTimeField)
+                and output_format and output_format.lower() == ISO_8601
+                and getattr(field, 'timezone', tz) == tz):
+            return _datetime_converter(tz)
+        return field.to_representation
+
+    def converters(self, fields=None):
+        """
+        (name, converter) pairs for the active timezone, compiled once per
+        timezone; narrowed to ``fields`` in the same order as values()
+        """
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        compiled = self._converters.get(tz)
+        if compiled is None:
+            compiled = self._converters[tz] = [
+                (field.field_name, self._compile(field, tz)) for field in self.fields
+            ]
+        if fields is None:
+            return compiled
+        return [(name, convert) for name, convert in compiled if name in fields]
+
+    def to_representation(self, row, fields=None):
+        return {
+            name: None if value is None else convert(value)
+            for (name, convert), value in zip(self.converters(fields), row)
+        }
+
+    def serialize(self, rows, fields=None):
+        converters = self.converters(fields)
+        with timed_serialization():
+            return [
+                {
+                    name: None if value is None else convert(value)
+                    for (name, convert), value in zip(converters, row)
+                }
+                for row in rows
+            ]
+
+# Shared by the list, search and streaming endpoints
+student_rows = ValuesListSerializer(StudentSerializer)
+
 class StudentCreateSerializer(serializers.ModelSerializer):
     
     class Meta:
@@ -18,6 +173,12 @@ class StudentCreateSerializer(serializers.ModelSerializer):
             'PROFILE_STATUS', 'PASSWORD', 'DEVICE_ID'
         ]
 
+class StudentBulkCreateSerializer(StudentCreateSerializer):
+    """Per-item validation for bulk create; EMAIL uniqueness is checked in one query"""
+
+    class Meta(StudentCreateSerializer.Meta):
+        extra_kwargs = {'EMAIL': {'validators': []}}
+
 class StudentUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Student
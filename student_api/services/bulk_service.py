@@ -0,0 +1,204 @@
+# student_api/services/bulk_service.py
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from ..models import Student, bit_to_bool
+from .cache_service import student_cache
+from .counter_service import StudentCounterService
+from .rollup_service import ROLLUP_COLUMNS, StudentRollupService
+from .search_service import StudentSearchService
+from .token_service import StudentTokenService
+
+VALID_STATUSES = ['active', 'inactive', 'suspended']
+_DUPLICATE_EMAIL = {"EMAIL": ["student with this EMAIL already exists."]}
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class StudentBulkService:
+    """
+    Batch versions of the student write paths. Bulk INSERT/UPDATE skip
+    Student.save(), so each method maintains STUDENT_COUNTER, STUDENT_ROLLUP,
+    the search index and the read cache itself, inside the same transaction.
+    """
+
+    @staticmethod
+    def create(validated_items, batch_size):
+        """
+        Insert already-validated StudentCreateSerializer payloads.
+
+        ``validated_items`` is a list of (index, validated_data). Emails that
+        already exist, or repeat within the batch, are rejected per item.
+        Returns ``{index: result}``.
+        """
+        results = {}
+        # EMAIL is compared case-insensitively, as MySQL's default collation
+        # does for the unique index. There the IN lookup already ignores case;
+        # the lowered forms let other backends match lowercase stored emails.
+        emails = list({form for _, data in validated_items
+                       for form in (data['EMAIL'], data['EMAIL'].lower())})
+        existing = set()
+        for chunk in _chunks(emails, batch_size):
+            existing.update(
+                email.lower() for email in
+                Student.objects.filter(EMAIL__in=chunk).values_list('EMAIL', flat=True)
+            )
+
+        to_insert, seen = [], set()
+        for index, data in validated_items:
+            email = data['EMAIL'].lower()
+            if email in existing or email in seen:
+                results[index] = {"success": False, "errors": _DUPLICATE_EMAIL}
+                continue
+            seen.add(email)
+            data = dict(data)
+            raw_password = data.pop('PASSWORD')
+            data['EMAIL_VERIFIED'] = False
+            data['DELETED'] = False
+            data['PROFILE_STATUS'] = 'active'
+            student = Student(**data)
+            # Encrypted up front so each row is a single INSERT
+            student.set_password(raw_password, save=False)
+            to_insert.append((index, student))
+
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    Student.objects.bulk_create(
+                        [student for _, student in to_insert], batch_size=batch_size
+                    )
+            except IntegrityError:
+                # A concurrent insert took an email after the check above
+                to_insert = StudentBulkService._insert_each(to_insert, results)
+            students = [student for _, student in to_insert]
+            if any(student.STUDENT_ID is None for student in students):
+                # MySQL cannot return the generated keys from a bulk INSERT
+                ids = {}
+                for chunk in _chunks([s.EMAIL for s in students], batch_size):
+                    ids.update(Student.objects.filter(EMAIL__in=chunk)
+                               .values_list('EMAIL', 'STUDENT_ID'))
+                for student in students:
+                    student.STUDENT_ID = ids[student.EMAIL]
+            StudentCounterService.apply(Counter({('active', False): len(students)}))
+            StudentRollupService.record_created(students)
+            StudentSearchService.index_students(students)
+
+        for index, student in to_insert:
+            results[index] = {"success": True, "student_id": student.STUDENT_ID}
+        return results
+
+    @staticmethod
+    def _insert_each(to_insert, results):
+        """
+        Insert ``(index, student)`` pairs one savepoint at a time, recording
+        the rows that hit the unique EMAIL index in ``results``; returns the
+        pairs that were inserted.
+        """
+        inserted = []
+        for index, student in to_insert:
+            # Undo what the failed batch INSERT may have set
+            student.STUDENT_ID = None
+            student._state.adding = True
+            try:
+                with transaction.atomic():
+                    Student.objects.bulk_create([student])
+            except IntegrityError:
+                results[index] = {"success": False, "errors": _DUPLICATE_EMAIL}
+                continue
+            inserted.append((index, student))
+        return inserted
+
+    @staticmethod
+    def _update(student_ids, batch_size, check, values, revoke_tokens=False):
+        """
+        Lock the listed rows, apply ``values`` with one UPDATE per batch to
+        those that pass ``check(status, deleted)`` (which returns an error
+        message or None), and move the counters and rollups to match.
+        ``revoke_tokens`` also clears UNIQUE_TOKEN on the changed rows and
+        revokes their access tokens.
+        """
+        results = {}
+        new_status = values['PROFILE_STATUS']
+        new_deleted = values.get('DELETED')
+        new_rollups = {column: value for column, value in values.items() if column in ROLLUP_COLUMNS}
+        deltas, rollup_deltas = Counter(), Counter()
+        with transaction.atomic():
+            for chunk in _chunks(student_ids, batch_size):
+                current, nonces, rollups = {}, {}, {}
+                for row in (
+                    Student.objects.select_for_update()
+                    .filter(STUDENT_ID__in=chunk)
+                    .values_list('STUDENT_ID', 'PROFILE_STATUS', 'UNIQUE_TOKEN', *ROLLUP_COLUMNS,
+                                 named=True)
+                ):
+                    current[row.STUDENT_ID] = (row.PROFILE_STATUS, bit_to_bool(row.DELETED))
+                    nonces[row.STUDENT_ID] = row.UNIQUE_TOKEN
+                    rollups[row.STUDENT_ID] = {column: getattr(row, column) for column in ROLLUP_COLUMNS}
+                changed = []
+                for student_id in chunk:
+                    if student_id not in current:
+                        results[student_id] = {"success": False, "error": "Student not found"}
+                        continue
+                    old_status, old_deleted = current[student_id]
+                    error = check(old_status, old_deleted)
+                    if error:
+                        results[student_id] = {"success": False, "error": error}
+                        continue
+                    results[student_id] = {
+                        "success": True,
+                        "old_status": old_status,
+                        "new_status": new_status,
+                    }
+                    changed.append(student_id)
+                    deleted = old_deleted if new_deleted is None else new_deleted
+                    deltas[(old_status, old_deleted)] -= 1
+                    deltas[(new_status, deleted)] += 1
+                    if new_rollups:
+                        old_rollups = rollups[student_id]
+                        rollup_deltas.update(StudentRollupService.deltas(
+                            old_rollups, {**old_rollups, **new_rollups}
+                        ))
+
+                if changed:
+                    extra = {'UNIQUE_TOKEN': None} if revoke_tokens else {}
+                    Student.objects.filter(STUDENT_ID__in=changed).update(
+                        UPDATED_AT=timezone.now(), **values, **extra
+                    )
+                    student_cache.invalidate_many(changed)
+                    if revoke_tokens:
+                        StudentTokenService.revoke_many(
+                            (student_id, nonces[student_id]) for student_id in changed
+                        )
+            StudentCounterService.apply(deltas)
+            StudentRollupService.apply(rollup_deltas)
+        return results
+
+    @staticmethod
+    def change_status(student_ids, new_status, batch_size):
+        return StudentBulkService._update(
+            student_ids, batch_size,
+            lambda status, deleted: None,
+            {'PROFILE_STATUS': new_status},
+        )
+
+    @staticmethod
+    def soft_delete(student_ids, batch_size):
+        return StudentBulkService._update(
+            student_ids, batch_size,
+            lambda status, deleted: "Student is already deleted" if deleted else None,
+            {'DELETED': True, 'PROFILE_STATUS': 'inactive'},
+            revoke_tokens=True,
+        )
+
+    @staticmethod
+    def restore(student_ids, batch_size):
+        return StudentBulkService._update(
+            student_ids, batch_size,
+            lambda status, deleted: None if deleted else "Student is not deleted",
+            {'DELETED': False, 'PROFILE_STATUS': 'active'},
+        )
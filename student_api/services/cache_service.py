@@ -0,0 +1,203 @@
+# student_api/services/cache_service.py
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.db import transaction
+
+from ..conf import get_setting
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe in-process LRU with a size bound and per-entry TTL"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+class StudentCache:
+    """
+    Read-through cache of serialized student records.
+
+    Tier 1 is a per-process LRU; tier 2 is the Django cache named by
+    CACHE_ALIAS, shared by all workers. Writes invalidate both tiers (see
+    student_api.signals); the local tier may lag writes made in other
+    workers for at most CACHE_LOCAL_TTL seconds.
+    """
+    KEY_PREFIX = 'student:v2:'
+
+    def __init__(self):
+        self._local = None
+        self._lock = threading.Lock()
+        self.shared_hits = self.shared_misses = self.shared_errors = 0
+
+    @property
+    def enabled(self):
+        return get_setting('CACHE_ENABLED')
+
+    @property
+    def local(self):
+        if self._local is None:
+            with self._lock:
+                if self._local is None:
+                    self._local = LRUCache(
+                        get_setting('CACHE_LOCAL_MAXSIZE'), get_setting('CACHE_LOCAL_TTL')
+                    )
+        return self._local
+
+    @property
+    def shared(self):
+        return caches[get_setting('CACHE_ALIAS')]
+
+    def key(self, student_id):
+        return f'{self.KEY_PREFIX}{student_id}'
+
+    def get_or_load(self, student_id, loader):
+        """Return the cached record, calling ``loader()`` on a miss in both tiers"""
+        if not self.enabled:
+            return loader()
+
+        key = self.key(student_id)
+        data = self.local.get(key, _MISSING)
+        if data is not _MISSING:
+            return data
+
+        try:
+            data = self.shared.get(key, _MISSING)
+        except Exception:
+            # A broken shared cache must not take reads down with it
+            self.shared_errors += 1
+            data = _MISSING
+        if data is not _MISSING:
+            self.shared_hits += 1
+            self.local.set(key, data)
+            return data
+
+        self.shared_misses += 1
+        data = loader()
+        self.set(student_id, data)
+        return data
+
+    async def aget_or_load(self, student_id, loader):
+        """get_or_load() for async views; ``loader`` is a coroutine function"""
+        if not self.enabled:
+            return await loader()
+
+        key = self.key(student_id)
+        data = self.local.get(key, _MISSING)
+        if data is not _MISSING:
+            return data
+
+        try:
+            data = await self.shared.aget(key, _MISSING)
+        except Exception:
+            self.shared_errors += 1
+            data = _MISSING
+        if data is not _MISSING:
+            self.shared_hits += 1
+            self.local.set(key, data)
+            return data
+
+        self.shared_misses += 1
+        data = await loader()
+        self.local.set(key, data)
+        try:
+            await self.shared.aset(key, data, get_setting('CACHE_SHARED_TTL'))
+        except Exception:
+            self.shared_errors += 1
+        return data
+
+    def set(self, student_id, data):
+        key = self.key(student_id)
+        self.local.set(key, data)
+        try:
+            self.shared.set(key, data, get_setting('CACHE_SHARED_TTL'))
+        except Exception:
+            self.shared_errors += 1
+
+    def invalidate(self, student_id):
+        """
+        Drop a record from both tiers now and again after the surrounding
+        transaction commits, so a concurrent reader cannot re-cache the
+        pre-commit row.
+        """
+        if not self.enabled:
+            return
+        self._evict(student_id)
+        transaction.on_commit(lambda: self._evict(student_id))
+
+    def invalidate_many(self, student_ids):
+        for student_id in student_ids:
+            self.invalidate(student_id)
+
+    def _evict(self, student_id):
+        key = self.key(student_id)
+        self.local.delete(key)
+        try:
+            self.shared.delete(key)
+        except Exception:
+            self.shared_errors += 1
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'local': self.local.stats(),
+            'shared': {
+                'hits': self.shared_hits,
+                'misses': self.shared_misses,
+                'errors': self.shared_errors,
+            },
+        }
+
+
+student_cache = StudentCache()
@@ -0,0 +1,133 @@
+# student_api/services/change_feed_service.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..conf import get_setting
+from ..models import Student, StudentTombstone
+from ..serializers import student_rows
+from ..utils.pagination import InvalidCursor, encode_cursor, load_cursor, seek_filter
+
+FEED = 'changes'
+# Both streams seek on IDX_STUDENT_UPDATED / IDX_TOMBSTONE_DELETED; the
+# primary key breaks ties between rows changed in the same instant
+STUDENT_KEYS = ('UPDATED_AT', 'STUDENT_ID')
+TOMBSTONE_KEYS = ('DELETED_AT', 'id')
+
+
+class ResyncRequired(Exception):
+    """The cursor is older than the tombstones kept, so deletes may have been missed"""
+
+
+class ChangeFeedPage:
+    def __init__(self, rows, deleted, next_cursor, has_more):
+        self.rows = rows
+        self.deleted = deleted
+        self.next_cursor = next_cursor
+        self.has_more = has_more
+
+
+class StudentChangeFeedService:
+    """
+    Delta sync over UPDATED_AT: students changed (created, updated, soft
+    deleted or restored) and students hard deleted since a cursor, in
+    commit-safe order. The cursor holds a (time, id) position in each of
+    the two streams, so ties on the same timestamp are never skipped or
+    repeated.
+    """
+
+    @staticmethod
+    def _position(model, keys, values):
+        if values[0] is None:
+            return None
+        try:
+            return [model._meta.get_field(key).to_python(value)
+                    for key, value in zip(keys, values)]
+        except ValidationError:
+            raise InvalidCursor("Malformed cursor")
+
+    @staticmethod
+    def decode(cursor):
+        """
+        (student position, tombstone position) for a feed cursor, or for an
+        ISO 8601 timestamp to start from. None positions start from the beginning.
+        """
+        if not cursor:
+            return None, None
+        try:
+            since = parse_datetime(cursor)
+        except ValueError:
+            # Well formed but out of range, e.g. month 13
+            raise InvalidCursor("Malformed cursor")
+        if since is not None:
+            if settings.USE_TZ and timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            return [since, 0], [since, 0]
+        _, values = load_cursor(cursor, FEED, 4)
+        return (
+            StudentChangeFeedService._position(Student, STUDENT_KEYS, values[:2]),
+            StudentChangeFeedService._position(StudentTombstone, TOMBSTONE_KEYS, values[2:]),
+        )
+
+    @staticmethod
+    def encode(student_position, tombstone_position):
+        return encode_cursor(FEED, [*(student_position or [None, None]),
+                                    *(tombstone_position or [None, None])], 'next')
+
+    @staticmethod
+    def _seek(queryset, keys, position, horizon, limit):
+        """
+        Up to ``limit`` rows of ``queryset`` past ``position`` and no later
+        than ``horizon``, as (rows, next position, more to come). A drained
+        stream moves on to the horizon, so quiet streams keep a fresh cursor.
+        """
+        queryset = queryset.filter(**{f'{keys[0]}__lte': horizon})
+        if position is not None:
+            queryset = queryset.filter(seek_filter(keys, position))
+        rows = list(queryset.order_by(*keys)[:limit + 1])
+        more = len(rows) > limit
+        rows = rows[:limit]
+        if rows:
+            position = [getattr(rows[-1], key) for key in keys]
+        if not more and (position is None or position[0] < horizon):
+            position = [horizon, 0]
+        return rows, position, more
+
+    @staticmethod
+    def page(cursor, limit, fields=None):
+        """One page of changes after ``cursor``; raises InvalidCursor or ResyncRequired"""
+        student_position, tombstone_position = StudentChangeFeedService.decode(cursor)
+        now = timezone.now()
+        retention = get_setting('CHANGE_FEED_RETENTION_DAYS')
+        # Students are never pruned, so only the tombstone position can go stale
+        if tombstone_position is not None and tombstone_position[0] < now - timedelta(days=retention):
+            raise ResyncRequired(
+                f"Cursor is older than {retention} days; download the full list and start a new feed"
+            )
+        # Rows stamped within the settle window may still be joined by
+        # transactions that began earlier and commit later, so hold them back
+        horizon = now - timedelta(seconds=get_setting('CHANGE_FEED_SETTLE_SECONDS'))
+
+        rows, student_position, students_full = StudentChangeFeedService._seek(
+            student_rows.values(Student.objects.all(), fields, extra=STUDENT_KEYS),
+            STUDENT_KEYS, student_position, horizon, limit,
+        )
+        tombstones, tombstone_position, tombstones_full = StudentChangeFeedService._seek(
+            StudentTombstone.objects.values_list(*TOMBSTONE_KEYS, 'STUDENT_ID', named=True),
+            TOMBSTONE_KEYS, tombstone_position, horizon, limit,
+        )
+        return ChangeFeedPage(
+            rows, tombstones,
+            StudentChangeFeedService.encode(student_position, tombstone_position),
+            students_full or tombstones_full,
+        )
+
+    @staticmethod
+    def prune_tombstones():
+        """Delete tombstones past CHANGE_FEED_RETENTION_DAYS; returns how many"""
+        cutoff = timezone.now() - timedelta(days=get_setting('CHANGE_FEED_RETENTION_DAYS'))
+        deleted, _ = StudentTombstone.objects.filter(DELETED_AT__lt=cutoff).delete()
+        return deleted
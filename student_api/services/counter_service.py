@@ -0,0 +1,89 @@
+# student_api/services/counter_service.py
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from ..models import Student, StudentCounter, bit_to_bool
+
+
+class StudentCounterService:
+    @staticmethod
+    def record_change(old_key, new_key):
+        """Move one student between (PROFILE_STATUS, DELETED) buckets"""
+        if old_key == new_key:
+            return
+        deltas = Counter()
+        if old_key is not None:
+            deltas[old_key] -= 1
+        if new_key is not None:
+            deltas[new_key] += 1
+        StudentCounterService.apply(deltas)
+
+    @staticmethod
+    def apply(deltas):
+        """
+        Add ``{(status, deleted): delta}`` to the counters with one
+        UPDATE ... SET COUNT = COUNT + n per bucket. Must run inside the
+        transaction that changes the student rows.
+        """
+        for (profile_status, deleted), delta in sorted(deltas.items()):
+            if not delta:
+                continue
+            bucket = StudentCounter.objects.filter(
+                PROFILE_STATUS=profile_status, DELETED=deleted
+            )
+            values = {'COUNT': F('COUNT') + delta, 'UPDATED_AT': timezone.now()}
+            if bucket.update(**values):
+                continue
+            try:
+                with transaction.atomic():
+                    StudentCounter.objects.create(
+                        PROFILE_STATUS=profile_status, DELETED=deleted, COUNT=delta
+                    )
+            except IntegrityError:
+                # Another transaction created the bucket first
+                bucket.update(**values)
+
+    @staticmethod
+    def total(**filters):
+        """Sum of the counters matching ``filters`` (PROFILE_STATUS / DELETED)"""
+        result = StudentCounter.objects.filter(**filters).aggregate(total=Sum('COUNT'))
+        return result['total'] or 0
+
+    @staticmethod
+    async def atotal(**filters):
+        """total() for async views"""
+        result = await StudentCounter.objects.filter(**filters).aaggregate(total=Sum('COUNT'))
+        return result['total'] or 0
+
+    @staticmethod
+    def actual_counts():
+        """Exact bucket sizes from a GROUP BY over STUDENT"""
+        rows = (Student.objects.values('PROFILE_STATUS', 'DELETED')
+                .annotate(n=Count('STUDENT_ID')).order_by())
+        counts = Counter()
+        for row in rows:
+            counts[(row['PROFILE_STATUS'], bit_to_bool(row['DELETED']))] += row['n']
+        return counts
+
+    @staticmethod
+    def reconcile():
+        """
+        Rewrite every counter from a full GROUP BY. Returns the buckets
+        that had drifted as ``{(status, deleted): (stored, actual)}``.
+        """
+        with transaction.atomic():
+            stored = {
+                (c.PROFILE_STATUS, c.DELETED): c.COUNT
+                for c in StudentCounter.objects.select_for_update()
+            }
+            actual = StudentCounterService.actual_counts()
+            drift = {}
+            for key in set(stored) | set(actual):
+                if stored.get(key, 0) != actual.get(key, 0):
+                    drift[key] = (stored.get(key, 0), actual.get(key, 0))
+            deltas = Counter({key: new - old for key, (old, new) in drift.items()})
+            StudentCounterService.apply(deltas)
+        return drift
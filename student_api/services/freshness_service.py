@@ -0,0 +1,69 @@
+# student_api/services/freshness_service.py
+from django.db.models import Max, Sum
+from django.utils.dateparse import parse_datetime
+
+from ..models import Student, StudentCounter
+from ..utils.conditional import Validators, make_etag
+
+# Total and last change of the STUDENT_COUNTER buckets behind a list
+COUNTER_STATE = {'total': Sum('COUNT'), 'changed': Max('UPDATED_AT')}
+
+
+class StudentFreshnessService:
+    """
+    Validators for conditional GETs, built from UPDATED_AT without loading
+    or serializing the students themselves.
+    """
+
+    @staticmethod
+    def record_validators(updated_at, fields=None):
+        """
+        Validators for one student. ``updated_at`` is the model value or the
+        ISO string of a cached record; rows without one get no validators.
+        """
+        if isinstance(updated_at, str):
+            updated_at = parse_datetime(updated_at)
+        if updated_at is None:
+            return Validators(None)
+        return Validators(
+            make_etag('student', updated_at.isoformat(), ','.join(fields or ())),
+            updated_at,
+        )
+
+    @staticmethod
+    def latest_change(**filters):
+        """
+        Newest UPDATED_AT among the matching students, as a one-row seek on
+        IDX_STUDENT_UPDATED / IDX_STUDENT_STATUS_UPDATED (same as MAX()).
+        """
+        return (Student.objects.filter(**filters)
+                .order_by('-UPDATED_AT').values_list('UPDATED_AT', flat=True))
+
+    @staticmethod
+    def _list_validators(latest, counters, variant):
+        # Hard deletes leave MAX(UPDATED_AT) alone but move the counters
+        changed = counters['changed']
+        changes = [dt for dt in (latest, changed) if dt is not None]
+        return Validators(
+            make_etag('students', variant, latest and latest.isoformat(),
+                      counters['total'] or 0, changed and changed.isoformat()),
+            max(changes) if changes else None,
+        )
+
+    @staticmethod
+    def list_validators(filters, variant=''):
+        """
+        Validators for a list of students matching ``filters`` (the counter
+        filter of the list view); ``variant`` tells representations apart
+        (format, fields and page parameters).
+        """
+        latest = StudentFreshnessService.latest_change(**filters).first()
+        counters = StudentCounter.objects.filter(**filters).aggregate(**COUNTER_STATE)
+        return StudentFreshnessService._list_validators(latest, counters, variant)
+
+    @staticmethod
+    async def alist_validators(filters, variant=''):
+        """list_validators() for async views"""
+        latest = await StudentFreshnessService.latest_change(**filters).afirst()
+        counters = await StudentCounter.objects.filter(**filters).aaggregate(**COUNTER_STATE)
+        return StudentFreshnessService._list_validators(latest, counters, variant)
@@ -0,0 +1,317 @@
+# student_api/services/import_service.py
+import csv
+import json
+import os
+from collections import Counter
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+
+from ..models import Student
+from ..serializers import StudentBulkCreateSerializer
+from ..utils.hashers import hash_passwords
+from .bulk_service import _chunks
+from .cache_service import student_cache
+from .counter_service import StudentCounterService
+from .rollup_service import ROLLUP_COLUMNS, StudentRollupService
+from .search_service import StudentSearchService
+
+FORMATS = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+# Columns an import overwrites on students that already exist (matched on
+# EMAIL), when the input has them; status, verification and passwords stay
+# as the student left them
+UPSERT_FIELDS = [
+    'NAME', 'COUNTRY_CODE', 'MOBILE_NO', 'EDUCATION', 'COLLEGE',
+    'ADDRESS_STATE', 'ADDRESS', 'DEVICE_ID',
+]
+# Serializer fields whose CSV cell may be left empty to mean "no value"
+_NULLABLE = {
+    name for name, field in StudentBulkCreateSerializer().fields.items() if field.allow_null
+}
+
+
+class InvalidCheckpoint(ValueError):
+    """The checkpoint does not belong to this input file (or it changed since)"""
+
+
+def detect_format(path):
+    fmt = FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Cannot tell the format of {path}; pass csv or ndjson explicitly")
+    return fmt
+
+
+class _OffsetLines:
+    """Decoded lines of a binary file, tracking the byte offset after the last one read"""
+
+    def __init__(self, f, encoding):
+        self.f = f
+        self.encoding = encoding
+        self.offset = f.tell()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.f.readline()
+        if not line:
+            raise StopIteration
+        self.offset += len(line)
+        return line.decode(self.encoding)
+
+
+def read_records(f, fmt, offset=0, encoding='utf-8'):
+    """
+    Yield ``(end_offset, row, error)`` for each record of a CSV (with a
+    header line) or NDJSON file opened in binary mode, from byte ``offset``
+    on. ``end_offset`` is where the next record starts, so it can be stored
+    as a checkpoint. Rows that cannot be parsed come with an ``error``.
+    """
+    lines = _OffsetLines(f, encoding)
+    if fmt == 'csv':
+        header = [name.strip().lstrip('\ufeff').upper() for name in next(csv.reader(lines), [])]
+        if offset > lines.offset:
+            f.seek(offset)
+            lines.offset = offset
+        # csv.reader pulls only the lines of one record at a time, so the
+        # offset after each row is the end of that (possibly multi-line) record
+        for values in csv.reader(lines):
+            if not values:
+                continue
+            if len(values) != len(header):
+                yield lines.offset, values, {
+                    "non_field_errors": [f"Expected {len(header)} columns, got {len(values)}"]
+                }
+                continue
+            yield lines.offset, dict(zip(header, values)), None
+    else:
+        f.seek(offset)
+        lines.offset = offset
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield lines.offset, line.rstrip('\n'), {"non_field_errors": [f"Invalid JSON: {e}"]}
+                continue
+            if not isinstance(row, dict):
+                yield lines.offset, row, {"non_field_errors": ["Expected a JSON object"]}
+                continue
+            yield lines.offset, {key.upper(): value for key, value in row.items()}, None
+
+
+class ImportCheckpoint:
+    """
+    Progress of one import, saved after every committed chunk. ``offset``
+    is the input byte offset to resume from; ``reject_offset`` the size of
+    the reject file at that point, so a resumed run drops rejects written
+    for a chunk that never committed.
+    """
+
+    def __init__(self, path, source):
+        self.path = path
+        stat = os.stat(source)
+        self.state = {
+            'source': os.path.abspath(source),
+            'source_size': stat.st_size,
+            'source_mtime_ns': stat.st_mtime_ns,
+            'offset': 0,
+            'reject_offset': 0,
+            'records': 0,
+            'created': 0,
+            'updated': 0,
+            'rejected': 0,
+            'duplicates': 0,
+        }
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        with open(self.path) as f:
+            saved = json.load(f)
+        for key in ('source', 'source_size', 'source_mtime_ns'):
+            if saved.get(key) != self.state[key]:
+                raise InvalidCheckpoint(
+                    f"{self.path} was written for a different or modified input ({key} differs)"
+                )
+        self.state.update(saved)
+
+    def save(self):
+        # Write then rename, so a crash never leaves a half-written checkpoint
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def remove(self):
+        if self.exists():
+            os.remove(self.path)
+
+
+class StudentImporter:
+    """
+    Upserts students from parsed records in chunks: validation with the
+    StudentCreateSerializer rules, password hashing for new students on
+    ``executor`` (a process pool, or None to hash in-process), one
+    INSERT ... ON CONFLICT / ON DUPLICATE KEY UPDATE per batch on EMAIL,
+    and the counter, rollup, search index and cache upkeep that save() would do.
+    New students are created like create_student does: active, email not
+    verified.
+    """
+
+    def __init__(self, batch_size=500, executor=None, workers=1, hash_iterations=None):
+        self.batch_size = batch_size
+        self.executor = executor
+        self.workers = max(1, workers)
+        self.hash_iterations = hash_iterations
+
+    def validate(self, records):
+        """Split ``(number, row, error)`` records into (valid, rejects)"""
+        # One serializer for the whole chunk: building the ModelSerializer
+        # fields costs more than validating a row
+        serializer = StudentBulkCreateSerializer()
+        valid, rejects = [], []
+        for number, row, error in records:
+            if error is None:
+                row = {key: value for key, value in row.items()
+                       if not (value == '' and key in _NULLABLE)}
+                try:
+                    valid.append((number, serializer.run_validation(row)))
+                    continue
+                except ValidationError as e:
+                    error = as_serializer_error(e)
+            rejects.append({"record": number, "errors": error, "row": row})
+        return valid, rejects
+
+    def hash(self, raw_passwords):
+        if self.executor is None or len(raw_passwords) < 2:
+            return hash_passwords(raw_passwords, self.hash_iterations)
+        size = -(-len(raw_passwords) // self.workers)
+        batches = self.executor.map(
+            hash_passwords, _chunks(raw_passwords, size),
+            [self.hash_iterations] * self.workers,
+        )
+        return [encoded for batch in batches for encoded in batch]
+
+    def upsert(self, valid):
+        """Write validated rows; returns (created, updated, duplicates)"""
+        # The last row for an EMAIL wins, as if the rows were applied in order
+        latest = {}
+        for number, data in valid:
+            latest[data['EMAIL']] = data
+        duplicates = len(valid) - len(latest)
+
+        existing = {}
+        for chunk in _chunks(list(latest), self.batch_size):
+            existing.update(
+                Student.objects.filter(EMAIL__in=chunk).values_list('EMAIL', 'STUDENT_ID')
+            )
+        new_emails = [email for email in latest if email not in existing]
+        hashed = dict(zip(
+            new_emails, self.hash([latest[email]['PASSWORD'] for email in new_emails])
+        ))
+
+        now = timezone.now()
+        students, groups = [], {}
+        for email, data in latest.items():
+            # Rows only overwrite the columns they have, so group them by those
+            update_fields = tuple(field for field in UPSERT_FIELDS if field in data)
+            data = dict(data, EMAIL_VERIFIED=False, DELETED=False, PROFILE_STATUS='active')
+            data.pop('PASSWORD')
+            # Existing rows keep their password: the INSERT half never lands
+            # for them, and an unusable value is safe if it somehow does
+            password = hashed.get(email) or make_password(None)
+            student = Student(**data, PASSWORD=password, PASSWORD_UPDATED_AT=now)
+            students.append(student)
+            groups.setdefault(update_fields, []).append(student)
+
+        # MySQL matches ON DUPLICATE KEY on any unique key and takes no target
+        unique_fields = (['EMAIL'] if connection.features.supports_update_conflicts_with_target
+                         else None)
+        with transaction.atomic():
+            # Existing rows leave their old rollup buckets for the merged values
+            old_rollups = {}
+            for chunk in _chunks(list(existing), self.batch_size):
+                for row in (Student.objects.select_for_update().filter(EMAIL__in=chunk)
+                            .values_list('EMAIL', *ROLLUP_COLUMNS, named=True)):
+                    old_rollups[row.EMAIL] = {column: getattr(row, column) for column in ROLLUP_COLUMNS}
+            for update_fields, group in groups.items():
+                Student.objects.bulk_create(
+                    group, batch_size=self.batch_size, update_conflicts=True,
+                    unique_fields=unique_fields, update_fields=[*update_fields, 'UPDATED_AT'],
+                )
+            ids = {}
+            for chunk in _chunks(list(latest), self.batch_size):
+                ids.update(
+                    Student.objects.filter(EMAIL__in=chunk).values_list('EMAIL', 'STUDENT_ID')
+                )
+            for student in students:
+                student.STUDENT_ID = ids[student.EMAIL]
+            StudentCounterService.apply(Counter({('active', False): len(new_emails)}))
+            rollup_deltas = Counter()
+            for update_fields, group in groups.items():
+                for student in group:
+                    old = old_rollups.get(student.EMAIL)
+                    new = student.rollup_values() if old is None else {
+                        **old, **{column: getattr(student, column)
+                                  for column in update_fields if column in ROLLUP_COLUMNS},
+                    }
+                    rollup_deltas.update(StudentRollupService.deltas(old, new))
+                # Existing students only get the searchable columns the file
+                # has; the rest of these objects are defaults, not their values
+                StudentSearchService.index_students(
+                    [student for student in group if student.EMAIL in existing], update_fields
+                )
+            StudentRollupService.apply(rollup_deltas)
+            StudentSearchService.index_students(
+                student for student in students if student.EMAIL not in existing
+            )
+            student_cache.invalidate_many(list(existing.values()))
+        return len(new_emails), len(existing), duplicates
+
+    def run(self, f, fmt, checkpoint, rejects, chunk_size=5000, encoding='utf-8',
+            progress=None):
+        """
+        Import records from ``f`` (binary) starting at ``checkpoint``'s
+        offset. Rejected rows go to ``rejects`` (a binary file) as NDJSON.
+        ``progress(state)`` is called after each chunk commits.
+        """
+        state = checkpoint.state
+        rejects.seek(state['reject_offset'])
+        rejects.truncate()
+
+        def flush(chunk, end_offset):
+            valid, rejected = self.validate(chunk)
+            created, updated, duplicates = self.upsert(valid) if valid else (0, 0, 0)
+            for reject in rejected:
+                rejects.write(json.dumps(reject, default=str).encode() + b'\n')
+            rejects.flush()
+            state['offset'] = end_offset
+            state['reject_offset'] = rejects.tell()
+            state['records'] += len(chunk)
+            state['created'] += created
+            state['updated'] += updated
+            state['duplicates'] += duplicates
+            state['rejected'] += len(rejected)
+            checkpoint.save()
+            if progress:
+                progress(state)
+
+        chunk, end_offset = [], state['offset']
+        number = state['records']
+        for end_offset, row, error in read_records(f, fmt, state['offset'], encoding):
+            number += 1
+            chunk.append((number, row, error))
+            if len(chunk) >= chunk_size:
+                flush(chunk, end_offset)
+                chunk = []
+        if chunk:
+            flush(chunk, end_offset)
+        return state
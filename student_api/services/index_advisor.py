@@ -0,0 +1,182 @@
+# student_api/services/index_advisor.py
+import json
+import re
+
+from django.db import connections
+from django.utils import timezone
+
+from ..models import Student
+from ..utils.pagination import KeysetPaginator
+from .freshness_service import StudentFreshnessService
+from .search_service import StudentSearchService
+
+
+class HotQuery:
+    """
+    A query the API runs on every request of some endpoint. ``allow_sort``
+    marks queries whose ORDER BY cannot come from an index (ranked search).
+    """
+
+    def __init__(self, name, build, index=None, allow_sort=False):
+        self.name = name
+        self.build = build
+        self.index = index
+        self.allow_sort = allow_sort
+
+
+def _page(ordering, queryset, values=None):
+    return KeysetPaginator(ordering, 50).page_queryset(queryset, values)
+
+
+def hot_queries():
+    """The querysets views.py issues, built exactly as the views build them"""
+    now = timezone.now()
+    active = Student.objects.filter(PROFILE_STATUS='active')
+    return [
+        HotQuery('auth lookup by mobile (login/otp/password reset)',
+                 lambda: Student.objects.filter(MOBILE_NO='9000000000', DELETED=False)[:21],
+                 'IDX_STUDENT_MOBILE_DELETED'),
+        HotQuery('get_student',
+                 lambda: Student.objects.filter(STUDENT_ID=1)[:21]),
+        HotQuery('get_all_students first page',
+                 lambda: _page('created', Student.objects.all()),
+                 'IDX_STUDENT_CREATED'),
+        HotQuery('get_all_students next page',
+                 lambda: _page('created', Student.objects.all(), [now, 1]),
+                 'IDX_STUDENT_CREATED'),
+        HotQuery('get_students_by_status first page',
+                 lambda: _page('created', active),
+                 'IDX_STUDENT_STATUS_CREATED'),
+        HotQuery('get_students_by_status next page',
+                 lambda: _page('created', active, [now, 1]),
+                 'IDX_STUDENT_STATUS_CREATED'),
+        HotQuery('get_students_by_status order=id / stream',
+                 lambda: _page('id', active, [1]),
+                 'IDX_STUDENT_STATUS_ID'),
+        HotQuery('get_all_students validators (newest UPDATED_AT)',
+                 lambda: StudentFreshnessService.latest_change()[:1],
+                 'IDX_STUDENT_UPDATED'),
+        HotQuery('get_students_by_status validators (newest UPDATED_AT)',
+                 lambda: StudentFreshnessService.latest_change(PROFILE_STATUS='active')[:1],
+                 'IDX_STUDENT_STATUS_UPDATED'),
+        HotQuery('search_students (3+ characters)',
+                 lambda: StudentSearchService.matches('sharma').order_by('-score', 'STUDENT_ID')[:51],
+                 allow_sort=True),
+        HotQuery('search_students (short prefix candidates)',
+                 lambda: StudentSearchService.prefix_candidates('ra'),
+                 'IDX_SEARCH_TOKEN_STUDENT'),
+        HotQuery('search_students (short prefix)',
+                 lambda: StudentSearchService.prefix_matches('ra', [1, 2, 3])
+                 .order_by('-score', 'STUDENT_ID')[:51],
+                 allow_sort=True),
+    ]
+
+
+class PlanReport:
+    def __init__(self, query, plan, full_scans, filesort):
+        self.query = query
+        self.plan = plan
+        self.full_scans = full_scans
+        self.filesort = filesort
+
+    @property
+    def problems(self):
+        problems = [f"full table scan on {table}" for table in self.full_scans]
+        if self.filesort and not self.query.allow_sort:
+            problems.append("sort not served by an index (filesort / temp b-tree)")
+        return problems
+
+
+_SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(.*)$')
+
+
+def _parse_sqlite(plan):
+    full_scans, filesort = [], False
+    for line in plan.splitlines():
+        match = _SQLITE_SCAN.search(line)
+        if match and 'USING' not in match.group(2):
+            full_scans.append(match.group(1))
+        if 'USE TEMP B-TREE FOR ORDER BY' in line:
+            filesort = True
+    return full_scans, filesort
+
+
+def _parse_mysql(plan):
+    full_scans, filesort = [], False
+
+    def walk(node):
+        nonlocal filesort
+        if isinstance(node, dict):
+            if node.get('using_filesort'):
+                filesort = True
+            if node.get('access_type') == 'ALL':
+                full_scans.append(node.get('table_name', '?'))
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    walk(json.loads(plan))
+    return full_scans, filesort
+
+
+def _explain_sqlite(queryset, connection):
+    """
+    EXPLAIN QUERY PLAN keyed on the schema version: sqlite3 caches prepared
+    statements by SQL text, and a cached statement keeps reporting the plan
+    it was prepared with after an index is created or dropped.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA schema_version')
+        version = cursor.fetchone()[0]
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql} /* schema {version} */', params)
+        return '\n'.join(' '.join(str(col) for col in row) for row in cursor.fetchall())
+
+
+def explain(query, using='default'):
+    """Run EXPLAIN for a hot query and flag full scans and filesorts"""
+    vendor = connections[using].vendor
+    queryset = query.build().using(using)
+    if vendor == 'mysql':
+        plan = queryset.explain(format='json')
+        full_scans, filesort = _parse_mysql(plan)
+    elif vendor == 'sqlite':
+        plan = _explain_sqlite(queryset, connections[using])
+        full_scans, filesort = _parse_sqlite(plan)
+    else:
+        raise NotImplementedError(f"EXPLAIN parsing is not implemented for {vendor}")
+    return PlanReport(query, plan, full_scans, filesort)
+
+
+def missing_indexes(using='default'):
+    """Student.Meta.indexes that do not exist in the database yet"""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        existing = connection.introspection.get_constraints(cursor, Student._meta.db_table)
+    existing_columns = {
+        tuple(info['columns']) for info in existing.values() if info.get('index')
+    }
+    missing = []
+    for index in Student._meta.indexes:
+        columns = tuple(Student._meta.get_field(f).column for f in index.fields)
+        if index.name not in existing and columns not in existing_columns:
+            missing.append(index)
+    return missing
+
+
+def missing_index_ddl(using='default'):
+    """CREATE INDEX statements for the recommended indexes that are missing"""
+    # Only used to render SQL, so the editor is never entered (no transaction)
+    editor = connections[using].schema_editor(collect_sql=True)
+    return [f"{index.create_sql(Student, editor)};" for index in missing_indexes(using)]
+
+
+def create_missing_indexes(using='default'):
+    """Create the missing recommended indexes (migrations skip unmanaged models)"""
+    missing = missing_indexes(using)
+    with connections[using].schema_editor() as editor:
+        for index in missing:
+            editor.add_index(Student, index)
+    return missing
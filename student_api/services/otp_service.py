@@ -1,9 +1,22 @@
-# student_api/services/otp_service.py
 import random
 from datetime import datetime, timedelta
 from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from ..conf import get_setting
+from . import otp_store
+
+OTP_MESSAGES = {
+    otp_store.VERIFIED: "OTP verified successfully",
+    otp_store.INVALID: "Invalid OTP",
+    otp_store.EXPIRED: "OTP expired",
+    otp_store.MISSING: "OTP not generated",
+}
 
 class OTPService:
+    _store = None
+    _store_path = None
+
     @staticmethod
     def generate_otp():
         """Generate 6-digit OTP"""
@@ -11,27 +24,43 @@ class OTPService:
     
     @staticmethod
     def is_otp_expired(otp_sent_at):
-        """Check if OTP is expired (5 minutes)"""
+        """Check if OTP is expired (OTP_TTL, 5 minutes by default)"""
         if not otp_sent_at:
             return True
-        expiry_time = otp_sent_at + timedelta(minutes=5)
+        expiry_time = otp_sent_at + timedelta(seconds=get_setting('OTP_TTL'))
         return timezone.now() > expiry_time
+
+    @classmethod
+    def get_store(cls):
+        """The configured OTP store (STUDENT_API['OTP_STORE']), built once"""
+        path = get_setting('OTP_STORE')
+        if cls._store is None or cls._store_path != path:
+            cls._store = import_string(path)()
+            cls._store_path = path
+        return cls._store
+
+    @classmethod
+    def send_otp(cls, student, forgot_password=False):
+        """Generate an OTP for student and put it in the store"""
+        otp = cls.generate_otp()
+        cls.get_store().put(student, otp, forgot_password=forgot_password)
+        return otp
     
-    @staticmethod
-    def verify_otp(student, entered_otp):
-        """Verify OTP for student"""
-        if not student.OTP or not student.OTP_SENT_AT:
-            return False, "OTP not generated"
-        
-        if OTPService.is_otp_expired(student.OTP_SENT_AT):
-            return False, "OTP expired"
-        
-        if student.OTP != entered_otp:
-            return False, "Invalid OTP"
-        
-        # Clear OTP after successful verification
-        student.OTP = None
-        student.OTP_SENT_AT = None
-        student.save()
-        
-        return True, "OTP verified successfully"
\ No newline at end of file
+    @classmethod
+    def verify_otp(cls, student, entered_otp):
+        """Verify OTP for student; a correct OTP is consumed and cannot be reused"""
+        outcome = cls.get_store().consume(student, entered_otp)
+        return outcome == otp_store.VERIFIED, OTP_MESSAGES[outcome]
+
+    @classmethod
+    async def asend_otp(cls, student, forgot_password=False):
+        """send_otp() for async views"""
+        otp = cls.generate_otp()
+        await cls.get_store().aput(student, otp, forgot_password=forgot_password)
+        return otp
+
+    @classmethod
+    async def averify_otp(cls, student, entered_otp):
+        """verify_otp() for async views"""
+        outcome = await cls.get_store().aconsume(student, entered_otp)
+        return outcome == otp_store.VERIFIED, OTP_MESSAGES[outcome]
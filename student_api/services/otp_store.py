@@ -0,0 +1,158 @@
+# student_api/services/otp_store.py
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.utils import timezone
+
+from ..conf import get_setting
+
+# Outcomes of OTPStore.consume()
+VERIFIED = 'verified'
+INVALID = 'invalid'
+EXPIRED = 'expired'
+MISSING = 'missing'
+
+
+class BaseOTPStore:
+    """
+    Where issued OTPs live until they are used or expire. ``consume`` must be
+    atomic: of several concurrent calls with the right code, only one may
+    return VERIFIED.
+    """
+
+    def __init__(self):
+        self.ttl = get_setting('OTP_TTL')
+
+    def put(self, student, code, forgot_password=False):
+        raise NotImplementedError
+
+    def consume(self, student, code):
+        raise NotImplementedError
+
+    # Async views call these; stores that do blocking I/O run it off the loop
+    async def aput(self, student, code, forgot_password=False):
+        return await sync_to_async(self.put)(student, code, forgot_password)
+
+    async def aconsume(self, student, code):
+        return await sync_to_async(self.consume)(student, code)
+
+
+class DatabaseOTPStore(BaseOTPStore):
+    """
+    The original layout: OTP, OTP_SENT_AT and FORGOT_PASSWORD_SENT_AT on the
+    STUDENT row. Kept as the default so existing OTPs stay valid while
+    migrating to one of the TTL stores.
+    """
+
+    def put(self, student, code, forgot_password=False):
+        now = timezone.now()
+        student.OTP = code
+        student.OTP_SENT_AT = now
+        if forgot_password:
+            student.FORGOT_PASSWORD_SENT_AT = now
+        student.save()
+
+    def consume(self, student, code):
+        from ..models import Student
+        from .cache_service import student_cache
+
+        cutoff = timezone.now() - timedelta(seconds=self.ttl)
+        # Conditional UPDATE: only one request can clear a matching OTP
+        cleared = Student.objects.filter(
+            STUDENT_ID=student.STUDENT_ID, OTP=code, OTP_SENT_AT__gt=cutoff
+        ).update(OTP=None, OTP_SENT_AT=None, UPDATED_AT=timezone.now())
+        if cleared:
+            student.OTP = student.OTP_SENT_AT = None
+            student._remember_values(['OTP', 'OTP_SENT_AT'])
+            student_cache.invalidate(student.STUDENT_ID)
+            return VERIFIED
+        if not student.OTP or not student.OTP_SENT_AT:
+            return MISSING
+        if student.OTP_SENT_AT <= cutoff:
+            return EXPIRED
+        return INVALID
+
+
+class InMemoryOTPStore(BaseOTPStore):
+    """
+    Per-process store; for single-worker deployments and tests. Every OTP
+    has the same TTL, so insertion order is expiry order: put() drops the
+    expired entries at the front, and unverified OTPs do not pile up.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        super().__init__()
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._clock = clock
+
+    def put(self, student, code, forgot_password=False):
+        now = self._clock()
+        with self._lock:
+            self._data.pop(student.STUDENT_ID, None)
+            self._data[student.STUDENT_ID] = (code, now + self.ttl)
+            while self._data:
+                student_id, (_, expires_at) = next(iter(self._data.items()))
+                if expires_at > now:
+                    break
+                del self._data[student_id]
+
+    def consume(self, student, code):
+        with self._lock:
+            entry = self._data.get(student.STUDENT_ID)
+            if entry is None:
+                return MISSING
+            stored, expires_at = entry
+            if expires_at <= self._clock():
+                del self._data[student.STUDENT_ID]
+                return EXPIRED
+            if stored != code:
+                return INVALID
+            del self._data[student.STUDENT_ID]
+            return VERIFIED
+
+    def __len__(self):
+        return len(self._data)
+
+    # No I/O, so no need to leave the event loop
+    async def aput(self, student, code, forgot_password=False):
+        return self.put(student, code, forgot_password)
+
+    async def aconsume(self, student, code):
+        return self.consume(student, code)
+
+
+class CacheOTPStore(BaseOTPStore):
+    """
+    Django cache backed store shared by all workers (OTP_CACHE_ALIAS).
+    Expiry is the cache TTL; consume-once relies on cache.delete() reporting
+    whether this call removed the key.
+    """
+    KEY_PREFIX = 'otp:v1:'
+
+    @property
+    def cache(self):
+        return caches[get_setting('OTP_CACHE_ALIAS')]
+
+    def key(self, student):
+        return f'{self.KEY_PREFIX}{student.STUDENT_ID}'
+
+    def put(self, student, code, forgot_password=False):
+        record = {'code': code, 'sent_at': timezone.now().isoformat()}
+        if forgot_password:
+            record['forgot_password'] = True
+        self.cache.set(self.key(student), record, self.ttl)
+
+    def consume(self, student, code):
+        key = self.key(student)
+        record = self.cache.get(key)
+        if record is None:
+            return MISSING
+        if record['code'] != code:
+            return INVALID
+        # Another request may have consumed it between get() and delete()
+        return VERIFIED if self.cache.delete(key) else MISSING
@@ -0,0 +1,200 @@
+# student_api/services/rollup_service.py
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from ..models import Student, StudentCounter, StudentRollup, bit_to_bool
+
+
+def _text(value):
+    # NULL and '' are both "not given"
+    return (value or '')[:255]
+
+
+def _flag(value):
+    return 'true' if bit_to_bool(value) else 'false'
+
+
+def _day(value):
+    """CREATED_AT (or a TruncDate result) as an ISO date in TIME_ZONE"""
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value, timezone.get_default_timezone())
+        value = value.date()
+    return value.isoformat()
+
+
+# Rollup dimension -> (STUDENT column, bucket of a column value)
+DIMENSIONS = {
+    'ADDRESS_STATE': ('ADDRESS_STATE', _text),
+    'COLLEGE': ('COLLEGE', _text),
+    'EDUCATION': ('EDUCATION', _text),
+    'EMAIL_VERIFIED': ('EMAIL_VERIFIED', _flag),
+    'SIGNUP_DATE': ('CREATED_AT', _day),
+}
+# Columns whose change moves a student between rollup buckets
+ROLLUP_COLUMNS = (*(column for column, _ in DIMENSIONS.values()), 'DELETED')
+
+
+class StudentRollupService:
+    """
+    Pre-aggregated student counts for the analytics endpoint, kept current
+    by applying +1/-1 deltas in the transaction of each write, so reads cost
+    a few small queries however many students there are.
+    """
+
+    @staticmethod
+    def keys(values):
+        """The buckets of one student, from ``{column: value}`` for ROLLUP_COLUMNS"""
+        deleted = bool(bit_to_bool(values['DELETED']))
+        return [
+            (dimension, bucket(values[column]), deleted)
+            for dimension, (column, bucket) in DIMENSIONS.items()
+        ]
+
+    @staticmethod
+    def deltas(old_values, new_values):
+        """Bucket moves of one student; None values mean created / deleted"""
+        deltas = Counter()
+        if old_values is not None:
+            for key in StudentRollupService.keys(old_values):
+                deltas[key] -= 1
+        if new_values is not None:
+            for key in StudentRollupService.keys(new_values):
+                deltas[key] += 1
+        return deltas
+
+    @staticmethod
+    def record_change(old_values, new_values):
+        StudentRollupService.apply(StudentRollupService.deltas(old_values, new_values))
+
+    @staticmethod
+    def record_created(students):
+        """Count freshly inserted ``students`` (after bulk_create set CREATED_AT)"""
+        deltas = Counter()
+        for student in students:
+            deltas.update(StudentRollupService.keys(student.rollup_values()))
+        StudentRollupService.apply(deltas)
+
+    @staticmethod
+    def apply(deltas):
+        """
+        Add ``{(dimension, value, deleted): delta}`` to the rollups with one
+        UPDATE ... SET COUNT = COUNT + n per bucket. Must run inside the
+        transaction that changes the student rows.
+        """
+        for (dimension, value, deleted), delta in sorted(deltas.items()):
+            if not delta:
+                continue
+            bucket = StudentRollup.objects.filter(
+                DIMENSION=dimension, VALUE=value, DELETED=deleted
+            )
+            values = {'COUNT': F('COUNT') + delta, 'UPDATED_AT': timezone.now()}
+            if bucket.update(**values):
+                continue
+            try:
+                with transaction.atomic():
+                    StudentRollup.objects.create(
+                        DIMENSION=dimension, VALUE=value, DELETED=deleted, COUNT=delta
+                    )
+            except IntegrityError:
+                # Another transaction created the bucket first
+                bucket.update(**values)
+
+    @staticmethod
+    def actual_counts():
+        """Exact bucket sizes from one GROUP BY over STUDENT per dimension"""
+        counts = Counter()
+        for dimension, (column, bucket) in DIMENSIONS.items():
+            rows = Student.objects.all()
+            if column == 'CREATED_AT':
+                rows = rows.annotate(
+                    day=TruncDate('CREATED_AT', tzinfo=timezone.get_default_timezone())
+                )
+                column = 'day'
+            rows = rows.values(column, 'DELETED').annotate(n=Count('STUDENT_ID')).order_by()
+            for row in rows:
+                counts[(dimension, bucket(row[column]), bit_to_bool(row['DELETED']))] += row['n']
+        return counts
+
+    @staticmethod
+    def rebuild():
+        """
+        Recount every rollup from STUDENT and drop empty buckets. Returns
+        the buckets that had drifted as ``{(dimension, value, deleted): (stored, actual)}``.
+        Readers keep seeing the old counts until the rebuild commits.
+        """
+        with transaction.atomic():
+            stored = {
+                (r.DIMENSION, r.VALUE, r.DELETED): r.COUNT
+                for r in StudentRollup.objects.select_for_update()
+            }
+            actual = StudentRollupService.actual_counts()
+            drift = {}
+            for key in set(stored) | set(actual):
+                if stored.get(key, 0) != actual.get(key, 0):
+                    drift[key] = (stored.get(key, 0), actual.get(key, 0))
+            StudentRollupService.apply(
+                Counter({key: new - old for key, (old, new) in drift.items()})
+            )
+            StudentRollup.objects.filter(COUNT=0).delete()
+        return drift
+
+    @staticmethod
+    def _counts(queryset, key, include_deleted):
+        if not include_deleted:
+            queryset = queryset.filter(DELETED=False)
+        return queryset.values(key).annotate(n=Sum('COUNT')).filter(n__gt=0)
+
+    @staticmethod
+    def summary(top, days, include_deleted=False):
+        """
+        Student counts per value of each dimension (the ``top`` largest,
+        with the rest summed as ``other``) and signups per day for the last
+        ``days`` days, read from STUDENT_COUNTER and STUDENT_ROLLUP only.
+        """
+        statuses = {
+            row['PROFILE_STATUS']: row['n'] for row in
+            StudentRollupService._counts(StudentCounter.objects, 'PROFILE_STATUS', include_deleted)
+        }
+        total = sum(statuses.values())
+        result = {
+            "total": total,
+            "PROFILE_STATUS": {
+                "values": [{"value": value, "count": n} for value, n
+                           in sorted(statuses.items(), key=lambda item: (-item[1], item[0]))],
+                "other": 0,
+            },
+        }
+
+        rollups = StudentRollup.objects.all()
+        for dimension in DIMENSIONS:
+            if dimension == 'SIGNUP_DATE':
+                continue
+            rows = list(
+                StudentRollupService._counts(rollups.filter(DIMENSION=dimension), 'VALUE',
+                                             include_deleted)
+                .order_by('-n', 'VALUE')[:top]
+            )
+            result[dimension] = {
+                "values": [{"value": row['VALUE'], "count": row['n']} for row in rows],
+                "other": max(total - sum(row['n'] for row in rows), 0),
+            }
+
+        today = _day(timezone.now())
+        first = date.fromisoformat(today) - timedelta(days=days - 1)
+        signups = {
+            row['VALUE']: row['n'] for row in StudentRollupService._counts(
+                rollups.filter(DIMENSION='SIGNUP_DATE', VALUE__gte=first.isoformat()),
+                'VALUE', include_deleted,
+            )
+        }
+        result["daily_signups"] = [
+            {"date": day, "count": signups.get(day, 0)}
+            for day in ((first + timedelta(days=i)).isoformat() for i in range(days))
+        ]
+        return result
@@ -0,0 +1,177 @@
+# student_api/services/search_service.py
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from ..conf import get_setting
+from ..models import Student, StudentSearchToken
+from ..serializers import student_rows
+from ..utils.pagination import InvalidCursor, encode_cursor, load_cursor
+
+# Searchable columns and how much a match in each one counts towards rank.
+# Weights must stay distinct: they also identify which column a token came from.
+SEARCH_FIELDS = {
+    'NAME': 3,
+    'EMAIL': 2,
+    'COLLEGE': 1,
+}
+GRAM_SIZE = 3
+RANK_ORDERING = 'rank'
+
+
+class SearchPage:
+    def __init__(self, rows, next_cursor, total=None):
+        self.rows = rows
+        self.next_cursor = next_cursor
+        self.prev_cursor = None
+        self.total = total
+
+
+class StudentSearchService:
+    @staticmethod
+    def trigrams(text):
+        """
+        Distinct trigrams of ``text``. The value is padded at the end so every
+        character starts a gram, which lets 1-2 character queries run as an
+        index prefix scan on TOKEN.
+        """
+        text = (text or '').lower()
+        padded = text + ' ' * (GRAM_SIZE - 1)
+        return {padded[i:i + GRAM_SIZE] for i in range(len(text))}
+
+    @staticmethod
+    def tokens_for(student, fields=SEARCH_FIELDS):
+        """Build the index rows for one student"""
+        return [
+            StudentSearchToken(
+                TOKEN=gram, STUDENT_ID=student.STUDENT_ID, WEIGHT=SEARCH_FIELDS[field]
+            )
+            for field in fields
+            for gram in StudentSearchService.trigrams(getattr(student, field))
+        ]
+
+    @staticmethod
+    def index_student(student, fields=SEARCH_FIELDS):
+        """
+        Replace the index rows of one student, limited to ``fields`` when
+        only some searchable columns changed (rows are told apart by WEIGHT)
+        """
+        fields = [field for field in SEARCH_FIELDS if field in fields]
+        with transaction.atomic():
+            StudentSearchToken.objects.filter(
+                STUDENT_ID=student.STUDENT_ID,
+                WEIGHT__in=[SEARCH_FIELDS[field] for field in fields],
+            ).delete()
+            StudentSearchToken.objects.bulk_create(
+                StudentSearchService.tokens_for(student, fields)
+            )
+
+    @staticmethod
+    def remove_student(student_id):
+        """Drop the index rows of a deleted student"""
+        StudentSearchToken.objects.filter(STUDENT_ID=student_id).delete()
+
+    @staticmethod
+    def index_students(students, fields=SEARCH_FIELDS, batch_size=5000):
+        """
+        Replace the index rows for many students (bulk paths and rebuilds),
+        limited to ``fields`` like index_student()
+        """
+        students = list(students)
+        fields = [field for field in SEARCH_FIELDS if field in fields]
+        if not students or not fields:
+            return
+        with transaction.atomic():
+            StudentSearchToken.objects.filter(
+                STUDENT_ID__in=[s.STUDENT_ID for s in students],
+                WEIGHT__in=[SEARCH_FIELDS[field] for field in fields],
+            ).delete()
+            tokens = []
+            for student in students:
+                tokens.extend(StudentSearchService.tokens_for(student, fields))
+            StudentSearchToken.objects.bulk_create(tokens, batch_size=batch_size)
+
+    @staticmethod
+    def matches(query):
+        """
+        Per-student (STUDENT_ID, score) rows matching ``query``.
+
+        Queries of three or more characters must match every trigram, which
+        approximates the old substring semantics. Shorter queries become a
+        prefix scan on the token index, cut off after
+        SEARCH_SHORT_QUERY_CANDIDATES rows: only the students found there are
+        ranked. The score sums the column weights of the matching grams, so
+        NAME hits outrank EMAIL and COLLEGE hits.
+        """
+        query = query.strip().lower()
+        if len(query) < GRAM_SIZE:
+            # Fetched up front because MySQL rejects LIMIT inside IN (...)
+            candidates = set(StudentSearchService.prefix_candidates(query))
+            return StudentSearchService.prefix_matches(query, candidates)
+
+        grams = {query[i:i + GRAM_SIZE] for i in range(len(query) - GRAM_SIZE + 1)}
+        return (StudentSearchToken.objects.filter(TOKEN__in=grams)
+                .values('STUDENT_ID')
+                .annotate(hits=Count('TOKEN', distinct=True), score=Sum('WEIGHT'))
+                .filter(hits=len(grams)))
+
+    @staticmethod
+    def prefix_candidates(prefix):
+        """
+        STUDENT_IDs behind the first SEARCH_SHORT_QUERY_CANDIDATES index rows
+        for ``prefix``, read in IDX_SEARCH_TOKEN_STUDENT order so the LIMIT
+        ends the scan
+        """
+        return (StudentSearchToken.objects.filter(TOKEN__startswith=prefix)
+                .order_by('TOKEN', 'STUDENT_ID')
+                .values_list('STUDENT_ID', flat=True)[:get_setting('SEARCH_SHORT_QUERY_CANDIDATES')])
+
+    @staticmethod
+    def prefix_matches(prefix, student_ids):
+        """(STUDENT_ID, score) rows for a short ``prefix``, among ``student_ids`` only"""
+        return (StudentSearchToken.objects.filter(TOKEN__startswith=prefix, STUDENT_ID__in=student_ids)
+                .values('STUDENT_ID')
+                .annotate(score=Sum('WEIGHT')))
+
+    @staticmethod
+    def search(query, limit=50, cursor=None, with_total=False, fields=None):
+        """
+        Relevance-ranked page of students for ``query``, as value rows
+        holding the columns for ``fields`` (None for all).
+        Pages are keyed by (score DESC, STUDENT_ID ASC) so deep pages
+        never use OFFSET.
+        """
+        matches = StudentSearchService.matches(query)
+        total = matches.count() if with_total else None
+
+        if cursor:
+            direction, values = load_cursor(cursor, RANK_ORDERING, 2)
+            if direction != 'next':
+                raise InvalidCursor("Search results can only be paged forward")
+            try:
+                score, student_id = int(values[0]), int(values[1])
+            except (TypeError, ValueError):
+                raise InvalidCursor("Malformed cursor")
+            matches = matches.filter(
+                Q(score__lt=score) | Q(score=score, STUDENT_ID__gt=student_id)
+            )
+
+        ranked = list(matches.order_by('-score', 'STUDENT_ID')[:limit + 1])
+        has_more = len(ranked) > limit
+        ranked = ranked[:limit]
+
+        # Named value rows for the fast list serializer, in rank order
+        students = {
+            student.STUDENT_ID: student for student in student_rows.values(
+                Student.objects.filter(STUDENT_ID__in=[row['STUDENT_ID'] for row in ranked]),
+                fields, extra=('STUDENT_ID',)
+            )
+        }
+        rows = [students[row['STUDENT_ID']] for row in ranked if row['STUDENT_ID'] in students]
+
+        next_cursor = None
+        if has_more and ranked:
+            last = ranked[-1]
+            next_cursor = encode_cursor(
+                RANK_ORDERING, [last['score'], last['STUDENT_ID']], 'next'
+            )
+        return SearchPage(rows, next_cursor, total)
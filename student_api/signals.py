@@ -0,0 +1,39 @@
+# student_api/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Student, StudentTombstone
+from .services.cache_service import student_cache
+from .services.search_service import SEARCH_FIELDS, StudentSearchService
+
+
+@receiver(post_save, sender=Student)
+def index_student_on_save(sender, instance, update_fields=None, **kwargs):
+    """Keep the search index in step with NAME/EMAIL/COLLEGE changes"""
+    if update_fields is None:
+        StudentSearchService.index_student(instance)
+        return
+    changed = set(update_fields) & set(SEARCH_FIELDS)
+    if changed:
+        StudentSearchService.index_student(instance, changed)
+
+
+@receiver(post_delete, sender=Student)
+def unindex_student_on_delete(sender, instance, **kwargs):
+    StudentSearchService.remove_student(instance.STUDENT_ID)
+
+
+@receiver(post_save, sender=Student)
+def invalidate_cached_student_on_save(sender, instance, **kwargs):
+    student_cache.invalidate(instance.STUDENT_ID)
+
+
+@receiver(post_delete, sender=Student)
+def invalidate_cached_student_on_delete(sender, instance, **kwargs):
+    student_cache.invalidate(instance.STUDENT_ID)
+
+
+@receiver(post_delete, sender=Student)
+def record_tombstone_on_delete(sender, instance, **kwargs):
+    """Leave a row for the change feed, in the same transaction as the delete"""
+    StudentTombstone.objects.create(STUDENT_ID=instance.STUDENT_ID)
@@ -1,3 +1,1456 @@
-from django.test import TestCase
+import json
+import os
+import pstats
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from student_project import settings_api
+
+from . import urls
+from .benchmarks.concurrency import LOGIN_PASSWORD
+from .benchmarks.data import generate_students
+from .benchmarks.suite import ROUTES, BenchContext, compare_runs, run_suite
+from .db.pool import ConnectionPool, PoolTimeout, get_pool
+from .management.commands.bench_suite import Command as BenchSuiteCommand
+from .metrics import RequestMetrics, measured, registry
+from .models import Student, StudentCounter, StudentRollup, StudentTombstone
+from .profiling import _cprofile_lock, make_profile_token, route_profiles
+from .serializers import StudentSerializer, student_rows
+from .services import bulk_service
+from .services.cache_service import LRUCache, student_cache
+from .services.change_feed_service import StudentChangeFeedService
+from .services.counter_service import StudentCounterService
+from .services.import_service import ImportCheckpoint, StudentImporter
+from .services.rollup_service import StudentRollupService
+from .services.index_advisor import create_missing_indexes
+from .services.otp_store import (
+    EXPIRED, INVALID, MISSING, VERIFIED, CacheOTPStore, DatabaseOTPStore, InMemoryOTPStore,
+)
+from .services.token_service import InvalidToken, StudentTokenService
+from .throttling import LocalTokenBucket, _local_buckets
+from .utils.encryption import SimplePasswordEncryption
+from .utils.hashers import hash_passwords
+
+
+class StudentTableTestCase(TestCase):
+    """STUDENT is unmanaged, so the test database needs it created explicitly"""
+
+    @classmethod
+    def setUpClass(cls):
+        for alias in cls.databases:
+            with connections[alias].schema_editor() as editor:
+                editor.create_model(Student)
+            create_missing_indexes(using=alias)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        for alias in cls.databases:
+            with connections[alias].schema_editor() as editor:
+                editor.delete_model(Student)
+
+
+class HotQueryPlanTests(StudentTableTestCase):
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command('explain_hot_queries', '--fail-on-scan', stdout=out)
+        self.assertIn("All recommended STUDENT indexes exist.", out.getvalue())
+
+    def test_missing_index_fails_and_prints_ddl(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX "IDX_STUDENT_MOBILE_DELETED"')
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('explain_hot_queries', '--fail-on-scan', stdout=out)
+        self.assertIn('CREATE INDEX "IDX_STUDENT_MOBILE_DELETED"', out.getvalue())
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def make_pool(self, **kwargs):
+        kwargs.setdefault('clock', FakeClock())
+        pool = ConnectionPool(lambda: sqlite3.connect(':memory:', check_same_thread=False), **kwargs)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_reuses_returned_connections(self):
+        pool = self.make_pool(min_size=1, max_size=3)
+        pool.fill()
+        first = pool.checkout()
+        pool.checkin(first)
+        self.assertIs(pool.checkout(), first)
+        stats = pool.stats()
+        self.assertEqual((stats['created'], stats['in_use'], stats['idle']), (1, 1, 0))
+
+    def test_checkout_times_out_when_exhausted(self):
+        pool = self.make_pool(max_size=1, timeout=0.05, clock=time.monotonic)
+        pool.checkout()
+        with self.assertRaises(PoolTimeout):
+            pool.checkout()
+        self.assertEqual((pool.stats()['waits'], pool.stats()['timeouts']), (1, 1))
+
+    def test_waiter_gets_connection_returned_by_another_thread(self):
+        pool = self.make_pool(max_size=1, timeout=5, clock=time.monotonic)
+        held = pool.checkout()
+        timer = threading.Timer(0.05, pool.checkin, args=(held,))
+        timer.start()
+        self.assertIs(pool.checkout(), held)
+        timer.join()
+        self.assertEqual((pool.stats()['waits'], pool.stats()['timeouts']), (1, 0))
+
+    def test_pre_ping_replaces_dead_connection(self):
+        pool = self.make_pool(max_size=2)
+        dead = pool.checkout()
+        pool.checkin(dead)
+        dead.close()
+        fresh = pool.checkout()
+        self.assertIsNot(fresh, dead)
+        fresh.execute('SELECT 1')
+        self.assertEqual(pool.stats()['ping_failures'], 1)
+
+    def test_idle_and_old_connections_are_recycled(self):
+        clock = FakeClock()
+        pool = self.make_pool(min_size=1, max_size=3, recycle=100, idle_timeout=10, clock=clock)
+        a, b = pool.checkout(), pool.checkout()
+        pool.checkin(a)
+        pool.checkin(b)
+        clock.now = 20  # both idle past IDLE_TIMEOUT; MIN_SIZE keeps one
+        self.assertIs(pool.checkout(), b)
+        self.assertEqual(pool.stats()['size'], 1)
+        pool.checkin(b)
+        clock.now = 150  # older than RECYCLE
+        self.assertIsNot(pool.checkout(), b)
+        self.assertEqual(pool.stats()['recycled'], 2)
+
+
+class PooledBackendTests(SimpleTestCase):
+    databases = {'pooled'}
+
+    def test_close_returns_connection_to_pool(self):
+        conn = connections['pooled']
+        conn.close()
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        raw = conn.connection
+        pool = get_pool('pooled')
+        self.assertEqual(pool.stats()['in_use'], 1)
+
+        conn.close()
+        self.assertEqual(pool.stats()['in_use'], 0)
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.assertIs(conn.connection, raw)
+        conn.close()
+
+
+@override_settings(STUDENT_API={
+    'READ_REPLICAS': ['replica1', 'replica2'],
+    'REPLICA_PIN_SECONDS': 5,
+    'CACHE_ENABLED': False,
+})
+class ReplicaRoutingTests(StudentTableTestCase):
+    databases = {'default', 'replica1', 'replica2'}
+
+    def setUp(self):
+        # Writer pins (and cached records) from earlier tests live in the cache
+        cache.clear()
+        # Same row everywhere, with a replica-only NAME to tell reads apart
+        Student.objects.create(
+            STUDENT_ID=1, NAME='Primary', COUNTRY_CODE=91, MOBILE_NO='900',
+            EMAIL='a@example.com', EDUCATION='BSc', PASSWORD='x',
+        )
+        for alias in ('replica1', 'replica2'):
+            Student.objects.using(alias).bulk_create([Student(
+                STUDENT_ID=1, NAME='Replica', COUNTRY_CODE=91, MOBILE_NO='900',
+                EMAIL='a@example.com', EDUCATION='BSc', PASSWORD='x',
+            )])
+
+    def get_name(self, client=None, **extra):
+        response = (client or self.client).get('/api/students/1/', **extra)
+        return response.json()['student']['NAME']
+
+    def test_reads_go_to_a_replica(self):
+        self.assertEqual(self.get_name(), 'Replica')
+        self.assertEqual(Student.objects.get(STUDENT_ID=1).NAME, 'Primary')  # no request
+
+    def test_writer_reads_primary_until_pin_expires(self):
+        response = self.client.put('/api/students/1/update/', {'NAME': 'Updated'},
+                                   content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('primary_pin', response.cookies)
+        self.assertEqual(self.get_name(), 'Updated')
+
+        # Pinned by address even without the cookie; other clients are not
+        self.assertEqual(self.get_name(self.client_class()), 'Updated')
+        self.assertEqual(self.get_name(self.client_class(), REMOTE_ADDR='10.0.0.2'), 'Replica')
+
+    @override_settings(STUDENT_API={
+        'READ_REPLICAS': ['replica1', 'replica2'], 'REPLICA_PIN_SECONDS': 5,
+        'CACHE_ENABLED': True, 'RATE_LIMIT_ENABLED': False,
+    })
+    def test_cache_is_filled_from_primary(self):
+        student_cache.local.clear()
+        self.addCleanup(student_cache.local.clear)
+        self.client.put('/api/students/1/update/', {'NAME': 'Updated'},
+                        content_type='application/json')
+        # An unpinned client misses first; the writer then reads its copy
+        self.assertEqual(self.get_name(self.client_class(), REMOTE_ADDR='10.0.0.2'), 'Updated')
+        self.assertEqual(self.get_name(), 'Updated')
+        self.assertEqual(self.client.get('/api/async/students/1/').json()['student']['NAME'],
+                         'Updated')
+
+    def test_unsafe_methods_read_primary(self):
+        response = self.client.post('/api/students/1/verify-email/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(Student.objects.get(STUDENT_ID=1).EMAIL_VERIFIED)
+
+
+class ValuesListSerializerTests(StudentTableTestCase):
+    def setUp(self):
+        Student.objects.create(
+            NAME='Ana\u00efs \u0928\u093e\u092e', COUNTRY_CODE=91, MOBILE_NO='901',
+            EMAIL='a@example.com', EDUCATION='', PASSWORD='x',
+        )
+        Student.objects.create(
+            NAME='Ravi', COUNTRY_CODE=1, MOBILE_NO='902', EMAIL='r@example.com',
+            EMAIL_VERIFIED=True, EDUCATION='BTech', COLLEGE='IIT Madras',
+            ADDRESS_STATE='Tamil Nadu', ADDRESS='1 Main Road', PROFILE_STATUS='inactive',
+            PASSWORD='y', DELETED=True, OTP='123456',
+            OTP_SENT_AT=timezone.now().replace(microsecond=123456),
+        )
+
+    def assert_parity(self):
+        queryset = Student.objects.order_by('STUDENT_ID')
+        expected = StudentSerializer(queryset, many=True).data
+        actual = student_rows.serialize(student_rows.values(queryset))
+        self.assertEqual(actual, expected)
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(actual), renderer.render(expected))
+
+    def test_matches_student_serializer(self):
+        self.assert_parity()
+
+    def test_matches_student_serializer_in_other_timezone(self):
+        with timezone.override('Asia/Kolkata'):
+            self.assert_parity()
+
+    def test_list_endpoint_output(self):
+        response = self.client.get('/api/students/?order=id')
+        expected = StudentSerializer(Student.objects.order_by('STUDENT_ID'), many=True).data
+        self.assertEqual(response.json()['students'], json.loads(JSONRenderer().render(expected)))
+
+
+@override_settings(STUDENT_API={'CACHE_ENABLED': False, 'RATE_LIMIT_ENABLED': False})
+class SparseFieldsetTests(StudentTableTestCase):
+    def setUp(self):
+        self.student = Student.objects.create(
+            NAME='Ravi', COUNTRY_CODE=91, MOBILE_NO='903', EMAIL='r@example.com',
+            EDUCATION='BTech', ADDRESS='1 Main Road', PASSWORD='secret', OTP='123456',
+        )
+
+    def test_secrets_never_returned(self):
+        record = self.client.get(f'/api/students/{self.student.STUDENT_ID}/').json()['student']
+        listed = self.client.get('/api/students/').json()['students'][0]
+        for name in ('PASSWORD', 'OTP', 'UNIQUE_TOKEN'):
+            self.assertNotIn(name, record)
+            self.assertNotIn(name, listed)
+
+    def test_fields_narrow_list_and_detail(self):
+        listed = self.client.get('/api/students/?fields=name,email').json()['students']
+        self.assertEqual(listed, [{'NAME': 'Ravi', 'EMAIL': 'r@example.com'}])
+        response = self.client.get(
+            f'/api/students/{self.student.STUDENT_ID}/?preset=mobile&fields=email'
+        )
+        self.assertEqual(
+            set(response.json()['student']),
+            {'STUDENT_ID', 'NAME', 'PROFILE_STATUS', 'EMAIL_VERIFIED', 'EMAIL'},
+        )
+
+    def test_columns_pushed_down(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/students/?fields=NAME')
+        sql = queries.captured_queries[-1]['sql']
+        self.assertIn('"NAME"', sql)
+        self.assertNotIn('"ADDRESS"', sql)
+
+    def test_invalid_and_restricted_fields_rejected(self):
+        for query in ('fields=NOPE', 'fields=PASSWORD', 'preset=unknown'):
+            response = self.client.get(f'/api/students/?{query}')
+            self.assertEqual(response.status_code, 400, query)
+            self.assertFalse(response.json()['success'])
+
+
+@override_settings(STUDENT_API={'CACHE_ENABLED': False, 'RATE_LIMIT_ENABLED': False})
+class ConditionalGetTests(StudentTableTestCase):
+    def setUp(self):
+        self.student = Student.objects.create(
+            NAME='Ravi', COUNTRY_CODE=91, MOBILE_NO='904', EMAIL='r@example.com',
+            EDUCATION='BTech', PASSWORD='secret',
+        )
+        self.url = f'/api/students/{self.student.STUDENT_ID}/'
+
+    def test_student_not_modified_until_updated(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+        self.student.NAME = 'Ravi K'
+        self.student.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_fields_have_their_own_etag(self):
+        full = self.client.get(self.url)['ETag']
+        sparse = self.client.get(f'{self.url}?fields=NAME')['ETag']
+        self.assertNotEqual(full, sparse)
+
+    @override_settings(STUDENT_API={'CACHE_ENABLED': True, 'RATE_LIMIT_ENABLED': False})
+    def test_student_from_cache(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_list_not_modified_skips_page_query(self):
+        etag = self.client.get('/api/students/')['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/students/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(any('"NAME"' in q['sql'] for q in queries.captured_queries))
+
+        stream_etag = self.client.get('/api/students/?stream=1')['ETag']
+        self.assertNotEqual(stream_etag, etag)
+
+    def test_list_variants_have_their_own_etag(self):
+        etags = {query: self.client.get(f'/api/students/?{query}')['ETag'] for query in (
+            '', 'fields=NAME', 'preset=summary', 'limit=1', 'order=id', 'total=true',
+            'stream=1', 'stream=1&fields=NAME',
+        )}
+        self.assertEqual(len(set(etags.values())), len(etags), etags)
+        # Equivalent spellings still share one
+        self.assertEqual(etags['fields=NAME'], self.client.get('/api/students/?fields=name')['ETag'])
+        self.assertEqual(etags[''], self.client.get('/api/students/?limit=50')['ETag'])
+
+    def test_list_changes_on_hard_delete(self):
+        Student.objects.create(
+            NAME='Asha', COUNTRY_CODE=91, MOBILE_NO='905', EMAIL='a@example.com',
+            EDUCATION='BSc', PASSWORD='secret',
+        )
+        etag = self.client.get('/api/students/active/')['ETag']
+        # Not the newest row, so only the counters can tell
+        self.student.delete()
+        response = self.client.get('/api/students/active/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['students']), 1)
+
+
+@override_settings(STUDENT_API={
+    'CACHE_ENABLED': False, 'RATE_LIMIT_ENABLED': False, 'STATS_ENDPOINT_ENABLED': True,
+})
+class BenchmarkSuiteTests(StudentTableTestCase):
+    def test_every_route_is_benchmarked(self):
+        named = {pattern.name for pattern in urls.urlpatterns}
+        self.assertEqual(named, {route.name for route in ROUTES})
+
+    def test_prepare_fills_derived_tables(self):
+        StudentTombstone.objects.create(STUDENT_ID=99)
+        command = BenchSuiteCommand(stdout=StringIO(), stderr=StringIO())
+        # STUDENT already exists, and SQLite cannot run DDL inside the test transaction
+        with mock.patch('student_api.management.commands.bench_suite.ensure_student_table'), \
+                mock.patch('student_api.benchmarks.data.ensure_student_table'):
+            command.prepare(30, seed=1, fresh=True)
+        self.assertFalse(StudentTombstone.objects.exists())
+        self.assertEqual(StudentRollupService.rebuild(), {})
+        body = self.client.get('/api/analytics/students/').json()
+        self.assertEqual(body['total'], Student.objects.filter(DELETED=False).count())
+
+    def test_client_pass_over_all_routes(self):
+        Student.objects.bulk_create(generate_students(30, seed=1))
+        StudentCounterService.reconcile()
+        StudentRollupService.rebuild()
+        login_student = Student.objects.filter(DELETED=False).order_by('STUDENT_ID').first()
+        login_student.set_password(LOGIN_PASSWORD)
+
+        # Async views run on other threads, which cannot see this test's transaction
+        routes = [route.name for route in ROUTES if not route.is_async]
+        results = run_suite(
+            BenchContext(login_student, seed=1), requests=4, modes=['client'], routes=routes
+        )
+        errors = {name: entry['client']['errors']
+                  for name, entry in results.items() if entry['client']}
+        self.assertEqual(errors, dict.fromkeys(errors, 0))
+        self.assertEqual(results['get_student']['client']['queries_per_request'], 1)
+        for key in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps'):
+            self.assertIn(key, results['get_all_students']['client'])
+
+    def test_compare_flags_regressions(self):
+        def run(p99, queries):
+            summary = {'p50_ms': 1.0, 'p95_ms': 2.0, 'p99_ms': p99, 'throughput_rps': 100.0,
+                       'queries_per_request': queries, 'errors': 0}
+            return {'meta': {}, 'routes': {'get_student': {'client': summary}}}
+
+        report = compare_runs(run(3.0, 1.0), run(3.2, 2.0), threshold=10)
+        self.assertEqual(
+            [(row['metric'], row['change_pct']) for row in report['regressions']],
+            [('queries_per_request', 100.0)],
+        )
+
+
+IMPORT_HEADER = 'name,country_code,mobile_no,email,education,password\n'
+
+
+@override_settings(STUDENT_API={'CACHE_ENABLED': False})
+class ImportStudentsTests(StudentTableTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'students.csv')
+        self.rejects = f'{self.path}.rejects.ndjson'
+
+    def write(self, rows):
+        with open(self.path, 'w') as f:
+            f.write(IMPORT_HEADER + ''.join(row + '\n' for row in rows))
+
+    def import_students(self, **options):
+        call_command('import_students', self.path, workers=0, hash_iterations=1000,
+                     stdout=StringIO(), stderr=StringIO(), **options)
+
+    def test_upserts_on_email_and_writes_rejects(self):
+        existing = Student.objects.create(
+            NAME='Old', COUNTRY_CODE=91, MOBILE_NO='900', EMAIL='a@example.com',
+            EDUCATION='BSc', PROFILE_STATUS='inactive',
+        )
+        existing.set_password('keep')
+        StudentCounterService.reconcile()
+        self.write([
+            'Asha,91,900,a@example.com,MSc,ignored',
+            ',91,901,b@example.com,BSc,pw',
+            'Ravi,91,902,c@example.com,BTech,pw',
+        ])
+        self.import_students()
+
+        existing.refresh_from_db()
+        self.assertEqual((existing.NAME, existing.EDUCATION), ('Asha', 'MSc'))
+        self.assertEqual(existing.PROFILE_STATUS, 'inactive')
+        self.assertTrue(existing.check_password('keep'))
+
+        created = Student.objects.get(EMAIL='c@example.com')
+        self.assertEqual((created.PROFILE_STATUS, created.EMAIL_VERIFIED), ('active', False))
+        self.assertTrue(created.check_password('pw'))
+        self.assertEqual(
+            StudentCounter.objects.get(PROFILE_STATUS='active', DELETED=False).COUNT, 1
+        )
+
+        with open(self.rejects) as f:
+            rejects = [json.loads(line) for line in f]
+        self.assertEqual([r['record'] for r in rejects], [2])
+        self.assertIn('NAME', rejects[0]['errors'])
+        self.assertFalse(os.path.exists(f'{self.path}.checkpoint.json'))
+
+    def test_update_keeps_search_tokens_of_missing_columns(self):
+        existing = Student.objects.create(
+            NAME='Old', COUNTRY_CODE=91, MOBILE_NO='900', EMAIL='a@example.com',
+            EDUCATION='BSc', COLLEGE='Presidency', PASSWORD='x',
+        )
+        self.write(['Asha,91,900,a@example.com,MSc,pw'])
+        self.import_students()
+
+        def found(query):
+            response = self.client.get('/api/students/search/', {'q': query})
+            return [row['STUDENT_ID'] for row in response.json()['students']]
+
+        self.assertEqual(found('Presidency'), [existing.STUDENT_ID])
+        self.assertEqual(found('Asha'), [existing.STUDENT_ID])
+        self.assertEqual(found('Old'), [])
+
+    def test_resumes_from_checkpoint(self):
+        self.write([
+            ',91,901,b@example.com,BSc,pw',
+            'Asha,91,900,a@example.com,MSc,pw',
+            ',91,903,d@example.com,BSc,pw',
+            'Ravi,91,902,c@example.com,BTech,pw',
+        ])
+
+        class Interrupted(Exception):
+            pass
+
+        def stop(state):
+            raise Interrupted
+
+        checkpoint = ImportCheckpoint(f'{self.path}.checkpoint.json', self.path)
+        with open(self.path, 'rb') as f, open(self.rejects, 'wb') as rejects:
+            with self.assertRaises(Interrupted):
+                StudentImporter(hash_iterations=1000).run(
+                    f, 'csv', checkpoint, rejects, chunk_size=2, progress=stop
+                )
+            # A reject from a chunk that never committed
+            rejects.write(b'{"record": 3}\n')
+
+        with self.assertRaises(CommandError):
+            self.import_students()
+        self.import_students(resume=True)
+
+        self.assertEqual(
+            sorted(Student.objects.values_list('EMAIL', flat=True)),
+            ['a@example.com', 'c@example.com'],
+        )
+        with open(self.rejects) as f:
+            self.assertEqual([json.loads(line)['record'] for line in f], [1, 3])
+
+
+@override_settings(STUDENT_API={
+    'CACHE_ENABLED': False, 'METRICS_ENDPOINT_ENABLED': True, 'SERVER_TIMING_ENABLED': True,
+})
+class RequestMetricsTests(StudentTableTestCase):
+    def setUp(self):
+        registry.reset()
+        self.student = Student.objects.create(
+            NAME='Ravi', COUNTRY_CODE=91, MOBILE_NO='900', EMAIL='r@example.com',
+            EDUCATION='BSc', PASSWORD='secret',
+        )
+
+    def test_records_route_histograms(self):
+        response = self.client.get(f'/api/students/{self.student.STUDENT_ID}/')
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="1 queries"')
+
+        exposition = self.client.get('/metrics').content.decode()
+        self.assertIn('student_api_request_duration_seconds_count{route="get_student"} 1', exposition)
+        self.assertIn('student_api_db_queries_sum{route="get_student"} 1', exposition)
+        self.assertIn(
+            f'student_api_response_size_bytes_sum{{route="get_student"}} {len(response.content)}',
+            exposition,
+        )
+
+    def test_streamed_list_recorded_when_body_ends(self):
+        response = self.client.get('/api/students/?stream=1')
+        self.assertNotIn('student_api_response_size_bytes_count{route="get_all_students"}',
+                         registry.exposition())
+        body = b''.join(response.streaming_content)
+        self.assertIn(
+            f'student_api_response_size_bytes_sum{{route="get_all_students"}} {len(body)}',
+            registry.exposition(),
+        )
+
+    def test_flags_repeated_selects(self):
+        with measured(RequestMetrics()) as metrics:
+            for _ in range(3):
+                Student.objects.filter(pk=self.student.pk).first()
+            Student.objects.filter(EMAIL='r@example.com').first()
+        self.assertEqual(metrics.queries, 4)
+        self.assertEqual(list(metrics.repeated(3).values()), [3])
+
+    @override_settings(STUDENT_API={'METRICS_ENDPOINT_ENABLED': False})
+    def test_endpoint_disabled_by_default(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+
+class ProfilingTests(StudentTableTestCase):
+    def setUp(self):
+        route_profiles.reset()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.student = Student.objects.create(
+            NAME='Ravi', COUNTRY_CODE=91, MOBILE_NO='900', EMAIL='r@example.com',
+            EDUCATION='BSc', PASSWORD='secret',
+        )
+        self.url = f'/api/students/{self.student.STUDENT_ID}/'
+
+    def settings(self, **overrides):
+        return override_settings(STUDENT_API={
+            'CACHE_ENABLED': False, 'PROFILING_DIR': self.dir, **overrides,
+        })
+
+    def test_samples_selected_routes_up_to_cap(self):
+        with self.settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1,
+                           PROFILING_ROUTES=['get_student'], PROFILING_MAX_SAMPLES=2,
+                           PROFILING_INTERVAL=0.0005):
+            for _ in range(3):
+                self.client.get(self.url)
+            self.client.get('/api/students/')
+        self.assertEqual(route_profiles.snapshot()['samples'], {'get_student': 2})
+        self.assertEqual(os.listdir(self.dir), [f'get_student.{os.getpid()}.collapsed'])
+
+    def test_collapsed_files_are_rewritten_periodically(self):
+        path = os.path.join(self.dir, f'get_student.{os.getpid()}.collapsed')
+
+        def written():
+            with open(path) as f:
+                return f.read()
+
+        with self.settings(PROFILING_FLUSH_INTERVAL=60, PROFILING_MAX_SAMPLES=4):
+            for _ in range(3):
+                route_profiles.add_stacks('get_student', Counter({'main;view': 1}))
+            # Only the first request reached the disk
+            self.assertEqual(written(), 'main;view 1\n')
+            route_profiles.flush()
+            self.assertEqual(written(), 'main;view 3\n')
+            # The last request before the cap is written straight away
+            route_profiles.add_stacks('get_student', Counter({'main;view': 1}))
+            self.assertEqual(written(), 'main;view 4\n')
+
+    def test_signed_header_profiles_with_cprofile(self):
+        with self.settings(PROFILING_PROFILER='cprofile'):
+            self.client.get(self.url, HTTP_X_STUDENT_PROFILE='forged:token')
+            self.client.get(self.url, HTTP_X_STUDENT_PROFILE=make_profile_token('search_students'))
+            self.assertEqual(route_profiles.snapshot()['samples'], {})
+
+            self.client.get(self.url, HTTP_X_STUDENT_PROFILE=make_profile_token('get_student'))
+        stats = pstats.Stats(os.path.join(self.dir, f'get_student.{os.getpid()}.pstats'))
+        self.assertTrue(any(name == 'get_student' for _, _, name in stats.stats))
+
+    def test_busy_cprofile_falls_back_to_sampler(self):
+        token = make_profile_token('get_student')
+        with self.settings(PROFILING_PROFILER='cprofile'), _cprofile_lock:
+            # As if another thread were inside a cProfile run
+            response = self.client.get(self.url, HTTP_X_STUDENT_PROFILE=token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(os.listdir(self.dir), [f'get_student.{os.getpid()}.collapsed'])
+
+
+@override_settings(
+    MIDDLEWARE=settings_api.MIDDLEWARE,
+    ROOT_URLCONF=settings_api.ROOT_URLCONF,
+    REST_FRAMEWORK=settings_api.REST_FRAMEWORK,
+    STUDENT_API={'CACHE_ENABLED': False, 'RATE_LIMIT_ENABLED': False},
+)
+class ApiOnlyProfileTests(StudentTableTestCase):
+    def test_endpoints_work_without_session_and_auth(self):
+        student = Student.objects.create(
+            NAME='Ravi', COUNTRY_CODE=91, MOBILE_NO='900', EMAIL='r@example.com',
+            EDUCATION='BSc',
+        )
+        student.set_password('secret')
+
+        response = self.client.get(f'/api/students/{student.STUDENT_ID}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Frame-Options', response)
+
+        response = self.client.post('/api/auth/login/', {'mobile_no': '900', 'password': 'secret'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.cookies, {})
+        self.assertEqual(self.client.get('/admin/').status_code, 404)
+
+    def test_profile_boots_on_its_own_settings(self):
+        # The overrides above keep the test run's INSTALLED_APPS; boot the
+        # real profile in a fresh interpreter to prove it needs none of them
+        with tempfile.TemporaryDirectory() as tmp:
+            result = subprocess.run(
+                [sys.executable, '-c', API_PROFILE_CHECK, os.path.join(tmp, 'api.sqlite3')],
+                cwd=settings_api.BASE_DIR, capture_output=True, text=True, timeout=120,
+            )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(json.loads(result.stdout.splitlines()[-1]), {
+            'apps': ['rest_framework', 'student_api'],
+            'read': 200, 'login': 200, 'cookies': [], 'frame_options': False,
+            'admin': 404, 'cprofile_loaded': False,
+        })
+
+
+API_PROFILE_CHECK = """
+import json, sys
+from student_api.benchmarks.boot import _boot
+handler = _boot('student_project.settings_api', sys.argv[1])
+
+from django.apps import apps
+from django.core.management import call_command
+from django.test import RequestFactory
+from student_api.benchmarks.data import ensure_student_table
+from student_api.models import Student
+
+call_command('migrate', verbosity=0)
+ensure_student_table()
+student = Student.objects.create(NAME='Ravi', COUNTRY_CODE=91, MOBILE_NO='900',
+                                 EMAIL='r@example.com', EDUCATION='BSc')
+student.set_password('secret')
+factory = RequestFactory(SERVER_NAME='localhost')
+read = handler.get_response(factory.get(f'/api/students/{student.STUDENT_ID}/'))
+login = handler.get_response(factory.post(
+    '/api/auth/login/', json.dumps({'mobile_no': '900', 'password': 'secret'}),
+    content_type='application/json'))
+print(json.dumps({
+    'apps': sorted(app.label for app in apps.get_app_configs()),
+    'read': read.status_code, 'login': login.status_code, 'cookies': sorted(login.cookies),
+    'frame_options': read.has_header('X-Frame-Options'),
+    'admin': handler.get_response(factory.get('/admin/')).status_code,
+    'cprofile_loaded': 'cProfile' in sys.modules,
+}))
+"""
+
+
+@override_settings(STUDENT_API={'CACHE_ENABLED': False, 'RATE_LIMIT_ENABLED': False})
+class AccessTokenTests(StudentTableTestCase):
+    def setUp(self):
+        self.student = Student.objects.create(
+            NAME='Ravi', COUNTRY_CODE=91, MOBILE_NO='900', EMAIL='r@example.com',
+            EDUCATION='BSc',
+        )
+        self.student.set_password('secret')
+
+    def login(self):
+        response = self.client.post('/api/auth/login/', {'mobile_no': '900', 'password': 'secret'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['access_token']
+
+    def get_student(self, token):
+        return self.client.get(f'/api/students/{self.student.STUDENT_ID}/',
+                               HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_login_issues_token_verified_without_queries(self):
+        token = self.login()
+        with self.assertNumQueries(0):
+            claims = StudentTokenService.verify(token)
+        self.assertEqual(claims['student_id'], self.student.STUDENT_ID)
+        self.assertEqual(self.get_student(token).status_code, 200)
+
+        response = self.get_student(token[:-2] + 'xx')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {"success": False, "error": "Invalid token"})
+
+    def test_change_password_revokes_tokens(self):
+        token = self.login()
+        other = Student.objects.create(
+            NAME='Asha', COUNTRY_CODE=91, MOBILE_NO='901', EMAIL='a@example.com',
+            EDUCATION='BSc', PASSWORD='x',
+        )
+        body = {'student_id': other.STUDENT_ID, 'current_password': 'x', 'new_password': 'y'}
+        response = self.client.post('/api/auth/change-password/', body,
+                                    content_type='application/json',
+                                    HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 403)
+
+        body = {'student_id': self.student.STUDENT_ID, 'current_password': 'secret',
+                'new_password': 'changed'}
+        response = self.client.post('/api/auth/change-password/', body,
+                                    content_type='application/json',
+                                    HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_student(token).json()['error'], 'Token revoked')
+
+    def test_soft_delete_revokes_tokens(self):
+        token = self.login()
+        self.client.post(f'/api/students/{self.student.STUDENT_ID}/soft-delete/')
+        with self.assertRaises(InvalidToken):
+            StudentTokenService.verify(token)
+
+        self.client.post(f'/api/students/{self.student.STUDENT_ID}/restore/')
+        self.student.set_password('secret')
+        token = self.login()
+        self.client.post('/api/students/bulk/soft-delete/',
+                         {'student_ids': [self.student.STUDENT_ID]}, content_type='application/json')
+        with self.assertRaises(InvalidToken):
+            StudentTokenService.verify(token)
+
+    def test_hard_delete_revokes_tokens(self):
+        token = self.login()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f'/api/students/{self.student.STUDENT_ID}/delete/')
+        self.assertEqual(response.status_code, 200)
+        with self.assertRaises(InvalidToken):
+            StudentTokenService.verify(token)
+
+
+@override_settings(STUDENT_API={
+    'CACHE_ENABLED': False, 'RATE_LIMIT_ENABLED': False, 'CHANGE_FEED_SETTLE_SECONDS': 0,
+})
+class ChangeFeedTests(StudentTableTestCase):
+    def setUp(self):
+        self.students = [
+            Student.objects.create(
+                NAME=f'Student {i}', COUNTRY_CODE=91, MOBILE_NO=f'95{i}',
+                EMAIL=f's{i}@example.com', EDUCATION='BSc', PASSWORD='x',
+            )
+            for i in range(5)
+        ]
+
+    def changes(self, query=''):
+        response = self.client.get(f'/api/students/changes/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_pages_through_timestamp_ties(self):
+        same_instant = timezone.now() - timedelta(seconds=1)
+        Student.objects.update(UPDATED_AT=same_instant)
+
+        seen, cursor = [], ''
+        for _ in range(3):
+            body = self.changes(f'limit=2&fields=STUDENT_ID&cursor={cursor}')
+            seen += [row['STUDENT_ID'] for row in body['students']]
+            cursor = body['next_cursor']
+        self.assertEqual(seen, [student.STUDENT_ID for student in self.students])
+        self.assertFalse(body['has_more'])
+
+        # Polling from the last cursor picks up only later changes
+        self.assertEqual(self.changes(f'cursor={cursor}')['students'], [])
+        self.students[0].NAME = 'Renamed'
+        self.students[0].save()
+        body = self.changes(f'cursor={cursor}')
+        self.assertEqual([row['NAME'] for row in body['students']], ['Renamed'])
+
+    def test_hard_delete_leaves_tombstone(self):
+        cursor = self.changes()['next_cursor']
+        student_id = self.students[1].STUDENT_ID
+        self.students[1].delete()
+
+        body = self.changes(f'cursor={cursor}')
+        self.assertEqual([row['STUDENT_ID'] for row in body['deleted']], [student_id])
+        self.assertEqual(self.changes(f"cursor={body['next_cursor']}")['deleted'], [])
+
+    def test_stale_and_malformed_cursors(self):
+        since = (timezone.now() - timedelta(days=31)).isoformat()
+        response = self.client.get('/api/students/changes/', {'updated_since': since})
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(self.client.get('/api/students/changes/?cursor=nope').status_code, 400)
+        response = self.client.get('/api/students/changes/', {'updated_since': '2024-13-01T00:00:00'})
+        self.assertEqual(response.status_code, 400)
+
+        StudentTombstone.objects.create(STUDENT_ID=1, DELETED_AT=timezone.now() - timedelta(days=40))
+        self.assertEqual(StudentChangeFeedService.prune_tombstones(), 1)
+
+
+@override_settings(STUDENT_API={'CACHE_ENABLED': False, 'RATE_LIMIT_ENABLED': False})
+class StudentRollupTests(StudentTableTestCase):
+    def create(self, i, **extra):
+        return Student.objects.create(
+            NAME=f'Student {i}', COUNTRY_CODE=91, MOBILE_NO=f'96{i}', EMAIL=f'r{i}@example.com',
+            EDUCATION='BSc', PASSWORD='x', **extra,
+        )
+
+    def stored(self):
+        return {(r.DIMENSION, r.VALUE, r.DELETED): r.COUNT
+                for r in StudentRollup.objects.exclude(COUNT=0)}
+
+    def test_rollups_follow_every_write_path(self):
+        first = self.create(1, COLLEGE='IIT', ADDRESS_STATE='Goa')
+        second = self.create(2, COLLEGE='IIT')
+        third = self.create(3)
+        first.EDUCATION = 'MSc'
+        first.EMAIL_VERIFIED = True
+        first.save()
+        second.soft_delete()
+        third.delete()
+        self.client.post('/api/students/bulk/create/', {'students': [{
+            'NAME': 'Asha', 'COUNTRY_CODE': 91, 'MOBILE_NO': '970', 'EMAIL': 'a@example.com',
+            'EDUCATION': 'BSc', 'COLLEGE': 'NIT', 'PASSWORD': 'secret123',
+        }]}, content_type='application/json')
+        self.client.post('/api/students/bulk/restore/', {'student_ids': [second.STUDENT_ID]},
+                         content_type='application/json')
+        StudentImporter().upsert([(1, {
+            'NAME': 'Student 1', 'COUNTRY_CODE': 91, 'MOBILE_NO': '961',
+            'EMAIL': 'r1@example.com', 'EDUCATION': 'PhD', 'PASSWORD': 'secret123',
+        })])
+
+        self.assertEqual(self.stored(), +StudentRollupService.actual_counts())
+        self.assertEqual(StudentRollupService.rebuild(), {})
+
+        StudentRollup.objects.filter(DIMENSION='COLLEGE').update(COUNT=7)
+        out = StringIO()
+        call_command('rebuild_student_rollups', stdout=out)
+        self.assertIn('Fixed', out.getvalue())
+        self.assertEqual(self.stored(), +StudentRollupService.actual_counts())
+
+    def test_analytics_reads_only_rollups(self):
+        for i in range(3):
+            self.create(i, COLLEGE='IIT' if i else 'NIT', ADDRESS_STATE='Goa')
+        self.create(9, COLLEGE='IIT').soft_delete()
+
+        with self.assertNumQueries(6):
+            response = self.client.get('/api/analytics/students/?top=1&days=2')
+        body = response.json()
+        self.assertEqual(body['total'], 3)
+        self.assertEqual(body['COLLEGE'], {'values': [{'value': 'IIT', 'count': 2}], 'other': 1})
+        self.assertEqual(body['PROFILE_STATUS']['values'], [{'value': 'active', 'count': 3}])
+        self.assertEqual(body['EMAIL_VERIFIED']['values'], [{'value': 'false', 'count': 3}])
+        self.assertEqual([day['count'] for day in body['daily_signups']], [0, 3])
+
+        body = self.client.get('/api/analytics/students/?include_deleted=true').json()
+        self.assertEqual(body['total'], 4)
+        self.assertEqual(self.client.get('/api/analytics/students/?top=0').status_code, 400)
+
+
+@override_settings(STUDENT_API={
+    'CACHE_ENABLED': False, 'RATE_LIMIT_ENABLED': True, 'RATE_LIMIT_BACKEND': 'local',
+    'RATE_LIMITS': {'student_login': {'mobile_no': '2/min', 'ip': '100/min'}},
+})
+class RateLimitTests(StudentTableTestCase):
+    def setUp(self):
+        _local_buckets._buckets.clear()
+        self.addCleanup(_local_buckets._buckets.clear)
+
+    def login(self, mobile_no):
+        return self.client.post('/api/auth/login/', {'mobile_no': mobile_no, 'password': 'x'},
+                                content_type='application/json')
+
+    def test_throttled_before_any_query(self):
+        self.assertEqual(self.login('900').status_code, 401)
+        self.assertEqual(self.login('900').status_code, 401)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.login('900')
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(response.has_header('Retry-After'))
+        self.assertFalse(any('"STUDENT"' in q['sql'] for q in queries.captured_queries))
+        # Other mobile numbers have their own budget
+        self.assertEqual(self.login('901').status_code, 401)
+
+    @override_settings(STUDENT_API={'RATE_LIMIT_LOCAL_MAX_KEYS': 3})
+    def test_local_buckets_stay_bounded(self):
+        buckets = LocalTokenBucket()
+        for i in range(10):
+            self.assertEqual(buckets.hit(f'made-up:{i}', 5, 60), (True, 0))
+        self.assertEqual(len(buckets), 3)
+        # Idle buckets that refilled to capacity are dropped below the cap too
+        buckets = LocalTokenBucket()
+        buckets.hit('idle', 1000, 0.001)
+        time.sleep(0.01)
+        buckets.hit('busy', 5, 60)
+        self.assertEqual(list(buckets._buckets), ['busy'])
+
+
+@override_settings(STUDENT_API={'CACHE_ENABLED': False, 'OTP_TTL': 60})
+class OTPStoreTests(StudentTableTestCase):
+    def setUp(self):
+        cache.clear()
+        self.student = Student.objects.create(
+            NAME='Ravi', COUNTRY_CODE=91, MOBILE_NO='910', EMAIL='r@example.com',
+            EDUCATION='BSc', PASSWORD='x',
+        )
+
+    def test_each_store_verifies_an_otp_once(self):
+        for store in (DatabaseOTPStore(), InMemoryOTPStore(), CacheOTPStore()):
+            with self.subTest(store=type(store).__name__):
+                student = Student.objects.get(pk=self.student.pk)
+                self.assertEqual(store.consume(student, '123456'), MISSING)
+                store.put(student, '123456')
+                self.assertEqual(store.consume(student, '000000'), INVALID)
+                self.assertEqual(store.consume(student, '123456'), VERIFIED)
+                self.assertEqual(store.consume(student, '123456'), MISSING)
+
+    def test_verify_otp_endpoint_consumes_the_otp(self):
+        with override_settings(STUDENT_API={
+            'CACHE_ENABLED': False, 'RATE_LIMIT_ENABLED': False,
+            'OTP_STORE': 'student_api.services.otp_store.CacheOTPStore',
+        }):
+            otp = self.student.generate_otp()
+            body = {'mobile_no': '910', 'otp': otp}
+            first = self.client.post('/api/auth/verify-otp/', body, content_type='application/json')
+            second = self.client.post('/api/auth/verify-otp/', body, content_type='application/json')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 400)
+
+    def test_in_memory_store_expires_unverified_otps(self):
+        clock = FakeClock()
+        store = InMemoryOTPStore(clock=clock)
+        store.put(self.student, '123456')
+        clock.now = 61
+        self.assertEqual(store.consume(self.student, '123456'), EXPIRED)
+
+        for student_id in range(100):
+            store.put(Student(STUDENT_ID=student_id), '111111')
+        self.assertEqual(len(store), 100)
+        clock.now = 200
+        store.put(self.student, '222222')
+        self.assertEqual(len(store), 1)
+
+
+@override_settings(STUDENT_API={'CACHE_ENABLED': False, 'RATE_LIMIT_ENABLED': False})
+class StudentCounterTests(StudentTableTestCase):
+    def create(self, i):
+        return Student.objects.create(
+            NAME=f'Student {i}', COUNTRY_CODE=91, MOBILE_NO=f'92{i}', EMAIL=f'c{i}@example.com',
+            EDUCATION='BSc', PASSWORD='x',
+        )
+
+    def counts(self):
+        return {(c.PROFILE_STATUS, c.DELETED): c.COUNT for c in StudentCounter.objects.exclude(COUNT=0)}
+
+    def test_counters_follow_writes_and_back_list_totals(self):
+        first, second, third = self.create(1), self.create(2), self.create(3)
+        first.PROFILE_STATUS = 'suspended'
+        first.save()
+        second.soft_delete()
+        third.delete()
+        self.assertEqual(self.counts(), {('suspended', False): 1, ('inactive', True): 1})
+        self.assertEqual(StudentCounterService.reconcile(), {})
+
+        with CaptureQueriesContext(connection) as queries:
+            body = self.client.get('/api/students/?total=true').json()
+        self.assertEqual(body['total'], 2)
+        self.assertFalse(any('COUNT(' in q['sql'] and '"STUDENT"' in q['sql']
+                             for q in queries.captured_queries))
+
+    def test_stale_instances_do_not_double_count(self):
+        student = self.create(1)
+        # A double submit: two requests loaded the row before either saved
+        first, second = Student.objects.get(pk=student.pk), Student.objects.get(pk=student.pk)
+        first.soft_delete()
+        second.soft_delete()
+        stale = Student.objects.get(pk=student.pk)
+        Student.objects.get(pk=student.pk).delete()
+        stale.delete()
+        self.assertEqual(self.counts(), {})
+        self.assertEqual(StudentRollup.objects.exclude(COUNT=0).count(), 0)
+
+    def test_refresh_from_db_resets_the_dirty_snapshot(self):
+        student = self.create(1)
+        Student.objects.filter(pk=student.pk).update(PROFILE_STATUS='suspended')
+        student.refresh_from_db()
+        self.assertEqual(student.get_dirty_fields(), [])
+        student.PROFILE_STATUS = 'active'
+        student.save()
+        self.assertEqual(Student.objects.get(pk=student.pk).PROFILE_STATUS, 'active')
+
+
+@override_settings(STUDENT_API={'CACHE_ENABLED': False, 'RATE_LIMIT_ENABLED': False})
+class KeysetPaginationTests(StudentTableTestCase):
+    def setUp(self):
+        same_instant = timezone.now()
+        Student.objects.bulk_create([
+            Student(NAME=f'Student {i}', COUNTRY_CODE=91, MOBILE_NO=f'93{i}',
+                    EMAIL=f'k{i}@example.com', EDUCATION='BSc', PASSWORD='x',
+                    PROFILE_STATUS='suspended' if i == 2 else 'active')
+            for i in range(5)
+        ])
+        # CREATED_AT ties are broken by STUDENT_ID
+        Student.objects.update(CREATED_AT=same_instant)
+        self.ids = sorted(Student.objects.values_list('STUDENT_ID', flat=True))
+
+    def page(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        return [row['STUDENT_ID'] for row in body['students']], body['next'], body['prev']
+
+    def test_pages_forward_and_back_without_offset(self):
+        seen, pages, url = [], [], '/api/students/?limit=2&order=created'
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                ids, next_cursor, prev_cursor = self.page(url)
+            self.assertFalse(any('OFFSET' in q['sql'] for q in queries.captured_queries))
+            seen += ids
+            pages.append((ids, prev_cursor))
+            url = next_cursor and f'/api/students/?limit=2&order=created&cursor={next_cursor}'
+        self.assertEqual(seen, self.ids)
+
+        # The last page's prev cursor leads back to the page before it
+        ids, _, _ = self.page(f'/api/students/?limit=2&order=created&cursor={pages[-1][1]}')
+        self.assertEqual(ids, pages[-2][0])
+
+    def test_count_stays_the_total(self):
+        StudentCounterService.reconcile()  # bulk_create skipped the counters
+        body = self.client.get('/api/students/?limit=2&total=true').json()
+        self.assertEqual((body['count'], body['total'], body['returned']), (5, 5, 2))
+        body = self.client.get('/api/students/active/?limit=2').json()
+        self.assertNotIn('count', body)
+        self.assertEqual(body['returned'], 2)
+
+    def test_filtered_lists_and_bad_cursors(self):
+        ids, next_cursor, _ = self.page('/api/students/active/?limit=10&order=id')
+        self.assertEqual(ids, [i for i in self.ids if i != self.ids[2]])
+        self.assertIsNone(next_cursor)
+        for query in ('cursor=garbage', 'order=name', 'limit=0'):
+            self.assertEqual(self.client.get(f'/api/students/?{query}').status_code, 400, query)
+        # A cursor only works with the ordering it was issued for
+        _, cursor, _ = self.page('/api/students/?limit=1&order=id')
+        self.assertEqual(self.client.get(f'/api/students/?order=created&cursor={cursor}').status_code, 400)
+
+
+@override_settings(STUDENT_API={
+    'CACHE_ENABLED': False, 'RATE_LIMIT_ENABLED': False, 'STREAM_CHUNK_SIZE': 2,
+})
+class NDJSONStreamTests(StudentTableTestCase):
+    def setUp(self):
+        Student.objects.bulk_create(generate_students(5, seed=3))
+        self.ids = sorted(Student.objects.values_list('STUDENT_ID', flat=True))
+
+    def lines(self, response):
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+    def test_streams_every_row_in_keyset_chunks(self):
+        with CaptureQueriesContext(connection) as queries:
+            rows = self.lines(self.client.get('/api/students/?stream=1&fields=STUDENT_ID,NAME'))
+        self.assertEqual([row['STUDENT_ID'] for row in rows], self.ids)
+        self.assertEqual(set(rows[0]), {'STUDENT_ID', 'NAME'})
+        # Five rows in chunks of two, then an empty seek ends the stream; no OFFSET
+        selects = [q['sql'] for q in queries.captured_queries if '"NAME"' in q['sql']]
+        self.assertEqual(len(selects), 4)
+        self.assertFalse(any('OFFSET' in sql for sql in selects))
+
+    def test_accept_header_selects_the_stream(self):
+        rows = self.lines(self.client.get(
+            '/api/students/status/active/', HTTP_ACCEPT='application/x-ndjson'
+        ))
+        self.assertEqual(
+            [row['STUDENT_ID'] for row in rows],
+            sorted(Student.objects.filter(PROFILE_STATUS='active').values_list('STUDENT_ID', flat=True)),
+        )
+
+
+@override_settings(STUDENT_API={'CACHE_ENABLED': False, 'RATE_LIMIT_ENABLED': False})
+class TrigramSearchTests(StudentTableTestCase):
+    def setUp(self):
+        def make(name, email, college):
+            return Student.objects.create(
+                NAME=name, COUNTRY_CODE=91, MOBILE_NO=email[:8], EMAIL=email,
+                EDUCATION='BSc', COLLEGE=college, PASSWORD='x',
+            )
+        self.college = make('Asha Rao', 'asha@example.com', 'Kumar Institute')
+        self.email = make('Ravi Shah', 'kumar.ravi@example.com', 'IIT')
+        self.name = make('Neha Kumar', 'neha@example.com', 'NIT')
+        self.both = make('Arun Kumar', 'kumar.arun@example.com', 'BITS')
+        make('Meera Iyer', 'meera@example.com', 'IISc')
+
+    def search(self, **params):
+        response = self.client.get('/api/students/search/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_ranks_by_column_weight(self):
+        body = self.search(q='kumar')
+        # NAME outweighs EMAIL outweighs COLLEGE, and hits in several columns add up
+        self.assertEqual(
+            [row['STUDENT_ID'] for row in body['students']],
+            [self.both.STUDENT_ID, self.name.STUDENT_ID, self.email.STUDENT_ID, self.college.STUDENT_ID],
+        )
+
+    def test_short_and_unmatched_queries(self):
+        ids = {row['STUDENT_ID'] for row in self.search(q='ne')['students']}
+        self.assertIn(self.name.STUDENT_ID, ids)
+        self.assertEqual(self.search(q='zzzz')['students'], [])
+        self.assertEqual(self.client.get('/api/students/search/').status_code, 400)
+
+    @override_settings(STUDENT_API={'CACHE_ENABLED': False, 'RATE_LIMIT_ENABLED': False,
+                                    'SEARCH_SHORT_QUERY_CANDIDATES': 2})
+    def test_short_queries_rank_a_bounded_candidate_set(self):
+        with CaptureQueriesContext(connection) as queries:
+            body = self.search(q='a', total='true')
+        # Five students have an 'a' gram; only those behind two index rows are ranked
+        self.assertLessEqual(len(body['students']), 2)
+        self.assertLessEqual(body['total'], 2)
+        scans = [q['sql'] for q in queries.captured_queries
+                 if 'STUDENT_SEARCH_TOKEN' in q['sql'] and 'LIMIT 2' in q['sql']]
+        self.assertEqual(len(scans), 1)
+        # Trigram queries are not capped
+        self.assertEqual(len(self.search(q='kumar')['students']), 4)
+
+    def test_cursor_pages_through_ranked_results(self):
+        seen, cursor = [], None
+        while True:
+            params = {'q': 'kumar', 'limit': 1}
+            if cursor:
+                params['cursor'] = cursor
+            body = self.search(**params)
+            seen += [row['STUDENT_ID'] for row in body['students']]
+            cursor = body['next']
+            if not cursor:
+                break
+        self.assertEqual(seen, [row['STUDENT_ID'] for row in self.search(q='kumar')['students']])
+
+    def test_index_follows_renames_and_deletes(self):
+        self.name.NAME = 'Neha Patel'
+        self.name.save()
+        ids = [row['STUDENT_ID'] for row in self.search(q='kumar')['students']]
+        self.assertNotIn(self.name.STUDENT_ID, ids)
+        self.both.delete()
+        ids = [row['STUDENT_ID'] for row in self.search(q='kumar')['students']]
+        self.assertEqual(ids, [self.email.STUDENT_ID, self.college.STUDENT_ID])
+
+
+@override_settings(STUDENT_API={'CACHE_ENABLED': True, 'RATE_LIMIT_ENABLED': False})
+class StudentCacheTests(StudentTableTestCase):
+    def setUp(self):
+        cache.clear()
+        student_cache.local.clear()
+        self.addCleanup(student_cache.local.clear)
+        self.student = Student.objects.create(
+            NAME='Cached', COUNTRY_CODE=91, MOBILE_NO='940', EMAIL='c@example.com',
+            EDUCATION='BSc', PASSWORD='x',
+        )
+        self.url = f'/api/students/{self.student.STUDENT_ID}/'
+
+    def get(self):
+        return self.client.get(self.url).json()['student']
+
+    def test_second_read_skips_the_database(self):
+        self.get()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get()['NAME'], 'Cached')
+        # Another worker's empty local tier is filled from the shared tier
+        student_cache.local.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get()['NAME'], 'Cached')
+
+    def test_writes_invalidate_the_record(self):
+        self.get()
+        self.client.put(f'{self.url}update/', {'NAME': 'Renamed'}, content_type='application/json')
+        self.assertEqual(self.get()['NAME'], 'Renamed')
+
+        self.client.post('/api/students/bulk/change-status/',
+                         {'student_ids': [self.student.STUDENT_ID], 'status': 'inactive'},
+                         content_type='application/json')
+        self.assertEqual(self.get()['PROFILE_STATUS'], 'inactive')
+
+        self.client.delete(f'{self.url}delete/')
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_record_cached_before_commit_is_evicted_again(self):
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.NAME = 'Committed'
+            self.student.save()
+            # A concurrent reader re-caches the pre-commit row in the meantime
+            student_cache.set(self.student.STUDENT_ID, {'NAME': 'Stale'})
+        self.assertEqual(self.get()['NAME'], 'Committed')
+
+    def test_local_tier_is_bounded_and_expires(self):
+        clock = FakeClock()
+        lru = LRUCache(maxsize=2, ttl=10)
+        with mock.patch('student_api.services.cache_service.time.monotonic', clock):
+            for key in 'abc':
+                lru.set(key, key)
+            self.assertIsNone(lru.get('a'))
+            clock.now += 11
+            self.assertIsNone(lru.get('c'))
+        self.assertEqual(lru.stats()['evictions'], 1)
+        self.assertEqual(lru.stats()['expirations'], 1)
+
+
+@override_settings(STUDENT_API={
+    'CACHE_ENABLED': False, 'RATE_LIMIT_ENABLED': False,
+    'BULK_BATCH_SIZE': 2, 'BULK_MAX_ITEMS': 6,
+})
+class BulkEndpointTests(StudentTableTestCase):
+    def item(self, i, **overrides):
+        return {'NAME': f'Bulk {i}', 'COUNTRY_CODE': 91, 'MOBILE_NO': f'95{i}',
+                'EMAIL': f'b{i}@example.com', 'EDUCATION': 'BSc', 'PASSWORD': 'secret',
+                **overrides}
+
+    def post(self, path, payload):
+        return self.client.post(f'/api/students/bulk/{path}/', payload,
+                                content_type='application/json')
+
+    def assert_totals_consistent(self):
+        self.assertEqual(StudentCounterService.reconcile(), {})
+        self.assertEqual(StudentRollupService.rebuild(), {})
+
+    def test_create_reports_each_item(self):
+        Student.objects.create(**{**self.item(0), 'PASSWORD': 'x'})
+        response = self.post('create', {'students': [
+            self.item(1), self.item(0), self.item(2), self.item(3, EMAIL='b2@example.com'),
+            self.item(4, NAME=''),
+        ]})
+        body = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['success'] for r in body['results']], [True, False, True, False, False])
+        self.assertEqual((body['succeeded'], body['failed']), (2, 3))
+
+        student = Student.objects.get(STUDENT_ID=body['results'][0]['student_id'])
+        self.assertEqual(student.PROFILE_STATUS, 'active')
+        self.assertNotEqual(student.PASSWORD, 'secret')
+        self.assertTrue(student.check_password('secret'))
+        ids = [row['STUDENT_ID'] for row in
+               self.client.get('/api/students/search/', {'q': 'bulk 2'}).json()['students']]
+        self.assertEqual(ids, [body['results'][2]['student_id']])
+        self.assert_totals_consistent()
+
+    def test_emails_are_unique_regardless_of_case(self):
+        Student.objects.create(**{**self.item(0), 'PASSWORD': 'x'})
+        body = self.post('create', {'students': [
+            self.item(1, EMAIL='B0@Example.com'), self.item(2, EMAIL='New@example.com'),
+            self.item(3, EMAIL='new@EXAMPLE.com'),
+        ]}).json()
+        self.assertEqual([r['success'] for r in body['results']], [False, True, False])
+
+    def test_insert_race_is_reported_per_item(self):
+        Student.objects.create(**{**self.item(0), 'PASSWORD': 'x'})
+        real_chunks = bulk_service._chunks
+        calls = []
+
+        def chunks(items, size):
+            calls.append(items)
+            # The existence check runs before a concurrent insert of b0
+            return iter([]) if len(calls) == 1 else real_chunks(items, size)
+
+        with mock.patch.object(bulk_service, '_chunks', chunks):
+            body = self.post('create', {'students': [self.item(i) for i in range(3)]}).json()
+        self.assertEqual([r['success'] for r in body['results']], [False, True, True])
+        self.assertEqual(body['results'][0]['errors'], {'EMAIL': ['student with this EMAIL already exists.']})
+        self.assertEqual(Student.objects.count(), 3)
+        self.assert_totals_consistent()
+
+    def test_status_changes_lock_and_update_per_batch(self):
+        ids = [r['student_id'] for r in self.post(
+            'create', {'students': [self.item(i) for i in range(5)]}
+        ).json()['results']]
+        missing = max(ids) + 1
+
+        with CaptureQueriesContext(connection) as queries:
+            body = self.post('change-status', {'student_ids': ids + [missing], 'status': 'suspended'}).json()
+        self.assertEqual([r['success'] for r in body['results']], [True] * 5 + [False])
+        updates = [q['sql'] for q in queries.captured_queries
+                   if q['sql'].startswith('UPDATE "STUDENT"')]
+        self.assertEqual(len(updates), 3)  # five rows in batches of two
+
+        body = self.post('soft-delete', {'student_ids': ids[:2]}).json()
+        self.assertTrue(body['success'])
+        body = self.post('soft-delete', {'student_ids': ids[:3]}).json()
+        self.assertEqual([r['success'] for r in body['results']], [False, False, True])
+        body = self.post('restore', {'student_ids': [ids[0], ids[4]]}).json()
+        self.assertEqual([r['success'] for r in body['results']], [True, False])
+
+        self.assertEqual(
+            dict(Student.objects.filter(STUDENT_ID__in=ids).values_list('STUDENT_ID', 'PROFILE_STATUS')),
+            {ids[0]: 'active', ids[1]: 'inactive', ids[2]: 'inactive',
+             ids[3]: 'suspended', ids[4]: 'suspended'},
+        )
+        self.assert_totals_consistent()
+
+    def test_rejects_bad_payloads(self):
+        for path, payload in (
+            ('create', {'students': []}),
+            ('create', {'students': [self.item(i) for i in range(7)]}),
+            ('soft-delete', {'student_ids': ['one']}),
+            ('change-status', {'student_ids': [1], 'status': 'gone'}),
+        ):
+            self.assertEqual(self.post(path, payload).status_code, 400, payload)
+
+
+@override_settings(STUDENT_API={'CACHE_ENABLED': False, 'RATE_LIMIT_ENABLED': False})
+class DirtyFieldSaveTests(StudentTableTestCase):
+    def setUp(self):
+        self.student_id = Student.objects.create(
+            NAME='Dirty', COUNTRY_CODE=91, MOBILE_NO='960', EMAIL='d@example.com',
+            EDUCATION='BSc', COLLEGE='IIT', PASSWORD='x',
+        ).STUDENT_ID
+
+    def load(self, *fields):
+        students = Student.objects.only(*fields) if fields else Student.objects
+        return students.get(STUDENT_ID=self.student_id)
+
+    def test_save_writes_only_changed_columns(self):
+        student = self.load()
+        student.NAME = 'Renamed'
+        with CaptureQueriesContext(connection) as queries:
+            student.save()
+        writes = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(writes), 1)
+        self.assertIn('"NAME"', writes[0])
+        self.assertNotIn('"PASSWORD"', writes[0])
+        self.assertNotIn('"COLLEGE"', writes[0])
+        # Neither counter nor rollup columns changed, so no row lock either
+        self.assertFalse(any(q['sql'].startswith('SELECT') and 'FROM "STUDENT"' in q['sql']
+                             for q in queries.captured_queries))
+        self.assertFalse(any('STUDENT_COUNTER' in q['sql'] or 'STUDENT_ROLLUP' in q['sql']
+                             for q in queries.captured_queries))
+        # The snapshot moved with the save: nothing left to write
+        with self.assertNumQueries(0):
+            student.save()
+
+    def test_concurrent_saves_of_different_columns_both_stick(self):
+        first, second = self.load(), self.load()
+        first.NAME = 'First'
+        second.COLLEGE = 'NIT'
+        first.save()
+        second.save()
+        student = self.load()
+        self.assertEqual((student.NAME, student.COLLEGE), ('First', 'NIT'))
+
+    def test_deferred_instances_and_explicit_update_fields(self):
+        student = self.load('STUDENT_ID', 'EDUCATION')
+        student.EDUCATION = 'MSc'
+        student.save()
+        self.assertEqual(student.get_dirty_fields(), [])
+        self.assertEqual(self.load().EDUCATION, 'MSc')
+
+        student = self.load()
+        student.NAME, student.COLLEGE = 'Kept', 'Dropped'
+        student.save(update_fields=['NAME'])
+        stored = self.load()
+        self.assertEqual((stored.NAME, stored.COLLEGE), ('Kept', 'IIT'))
+
+
+@override_settings(STUDENT_API={'CACHE_ENABLED': False, 'RATE_LIMIT_ENABLED': False})
+class PasswordRehashTests(StudentTableTestCase):
+    def setUp(self):
+        self.student = Student.objects.create(
+            NAME='Ravi', COUNTRY_CODE=91, MOBILE_NO='900', EMAIL='r@example.com',
+            EDUCATION='BSc', PASSWORD='x',
+        )
+
+    def store(self, encoded):
+        Student.objects.filter(pk=self.student.pk).update(PASSWORD=encoded)
+
+    def stored(self):
+        return Student.objects.get(pk=self.student.pk).PASSWORD
+
+    def login(self, password='secret', url='/api/auth/login/'):
+        return self.client.post(url, {'mobile_no': '900', 'password': password},
+                                content_type='application/json').status_code
+
+    def test_legacy_password_is_rehashed_on_login(self):
+        legacy = SimplePasswordEncryption().encrypt_password('secret', '900')
+        self.store(legacy)
+        self.assertEqual(self.login('wrong'), 401)
+        self.assertEqual(self.stored(), legacy)
+
+        self.assertEqual(self.login(), 200)
+        self.assertTrue(self.stored().startswith('md5$'))
+        self.assertEqual(self.login(), 200)
+
+    def test_async_login_rehashes_too(self):
+        self.store(SimplePasswordEncryption().encrypt_password('secret', '900'))
+        self.assertEqual(self.login(url='/api/async/auth/login/'), 200)
+        self.assertTrue(self.stored().startswith('md5$'))
+
+    @override_settings(
+        PASSWORD_HASHERS=['student_api.utils.hashers.StudentPBKDF2PasswordHasher'],
+        STUDENT_API={'CACHE_ENABLED': False, 'RATE_LIMIT_ENABLED': False,
+                     'PASSWORD_HASH_ITERATIONS': 1000},
+    )
+    def test_outdated_work_factor_is_upgraded_once(self):
+        self.store(hash_passwords(['secret'], iterations=500)[0])
+        self.assertEqual(self.login(), 200)
+        upgraded = self.stored()
+        self.assertTrue(upgraded.startswith('pbkdf2_sha256$1000$'))
+
+        # A current hash is only checked, never rewritten
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.login(), 200)
+        self.assertFalse(any('"PASSWORD"' in q['sql'] and q['sql'].startswith('UPDATE')
+                             for q in queries.captured_queries))
+        self.assertEqual(self.stored(), upgraded)
@@ -0,0 +1,168 @@
+# student_api/throttling.py
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+from .conf import get_setting
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'5/min' -> (5, 60). The period is matched on its first letter like DRF rates"""
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+class LocalTokenBucket:
+    """
+    In-process token buckets: ``num`` tokens refilled evenly over ``period``.
+    Buckets are kept least recently used first: those that have refilled
+    to capacity are dropped (a new bucket starts full anyway), and beyond
+    RATE_LIMIT_LOCAL_MAX_KEYS the oldest go too, so a flood of made-up
+    identities cannot grow the process without bound.
+    """
+
+    def __init__(self):
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, num, period):
+        """Take one token; returns (allowed, seconds until the next token)"""
+        now = time.monotonic()
+        refill = num / period
+        with self._lock:
+            tokens, stamp, _ = self._buckets.pop(key, (num, now, now))
+            tokens = min(num, tokens + (now - stamp) * refill)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            # The bucket also records when it will be full again
+            self._buckets[key] = (tokens, now, now + (num - tokens) / refill)
+            self._prune(now)
+            if allowed:
+                return True, 0
+            return False, (1 - tokens) / refill
+
+    def _prune(self, now):
+        max_keys = get_setting('RATE_LIMIT_LOCAL_MAX_KEYS')
+        while self._buckets:
+            key, (_, _, full_at) = next(iter(self._buckets.items()))
+            if full_at > now and len(self._buckets) <= max_keys:
+                break
+            del self._buckets[key]
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class CacheSlidingWindow:
+    """
+    Sliding-window counter in a shared Django cache. Uses cache.incr, which
+    is atomic on Memcached and Redis, so all workers share one budget.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def hit(self, key, num, period):
+        cache = caches[self.alias]
+        now = time.time()
+        window = int(now // period)
+        current_key = f'rl:{key}:{window}'
+        cache.add(current_key, 0, period * 2)
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.set(current_key, 1, period * 2)
+            current = 1
+        previous = cache.get(f'rl:{key}:{window - 1}', 0)
+        elapsed = (now % period) / period
+        if previous * (1 - elapsed) + current <= num:
+            return True, 0
+        return False, period * (1 - elapsed)
+
+
+class RateLimitStats:
+    """Allowed/throttled counts per (endpoint, identity kind)"""
+
+    def __init__(self):
+        self._counts = defaultdict(lambda: {'allowed': 0, 'throttled': 0})
+        self._lock = threading.Lock()
+
+    def record(self, scope, kind, allowed):
+        with self._lock:
+            self._counts[f'{scope}:{kind}']['allowed' if allowed else 'throttled'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {key: dict(value) for key, value in self._counts.items()}
+
+
+_local_buckets = LocalTokenBucket()
+rate_limit_stats = RateLimitStats()
+
+
+def get_limiter():
+    if get_setting('RATE_LIMIT_BACKEND') == 'cache':
+        return CacheSlidingWindow(get_setting('RATE_LIMIT_CACHE_ALIAS'))
+    return _local_buckets
+
+
+def check_rate_limits(scope, get_identity):
+    """
+    Apply STUDENT_API['RATE_LIMITS'][scope], resolving each identity kind
+    with ``get_identity(kind)``. Returns None when allowed, otherwise the
+    seconds until the caller may retry.
+    """
+    if not get_setting('RATE_LIMIT_ENABLED'):
+        return None
+    rules = get_setting('RATE_LIMITS').get(scope)
+    if not rules:
+        return None
+
+    limiter = get_limiter()
+    for kind, rate in rules.items():
+        ident = get_identity(kind)
+        if ident is None:
+            continue
+        num, period = parse_rate(rate)
+        allowed, wait = limiter.hit(f'{scope}:{kind}:{ident}', num, period)
+        rate_limit_stats.record(scope, kind, allowed)
+        if not allowed:
+            return wait
+    return None
+
+
+class IdentityRateThrottle(BaseThrottle):
+    """
+    Per-identity limits for the auth endpoints, configured per URL name in
+    STUDENT_API['RATE_LIMITS'], e.g.
+    {'student_login': {'mobile_no': '5/min', 'ip': '30/min'}}.
+    Identities: mobile_no and student_id from the request body, ip from
+    REMOTE_ADDR (honouring DRF's NUM_PROXIES). Runs in DRF's initial(),
+    before the view touches the database.
+    """
+
+    def allow_request(self, request, view):
+        scope = request.resolver_match.url_name if request.resolver_match else None
+        self._wait = check_rate_limits(scope, lambda kind: self.get_identity(request, kind))
+        return self._wait is None
+
+    def get_identity(self, request, kind):
+        if kind == 'ip':
+            return self.get_ident(request)
+        data = request.data if hasattr(request.data, 'get') else {}
+        value = data.get(kind)
+        if value is None and request.parser_context:
+            value = request.parser_context.get('kwargs', {}).get(kind)
+        if value is None or value == '':
+            return None
+        return str(value)[:64]
+
+    def wait(self):
+        return self._wait
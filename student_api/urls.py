@@ -1,6 +1,6 @@
 # student_api/urls.py
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     # Student endpoints
@@ -16,6 +16,14 @@ urlpatterns = [
     path('students/<int:student_id>/change-status/', views.change_student_status, name='change_student_status'),
     path('students/<int:student_id>/verify-email/', views.verify_email, name='verify_email'),
     path('students/search/', views.search_students, name='search_students'),
+    path('students/changes/', views.student_changes, name='student_changes'),
+    path('analytics/students/', views.student_analytics, name='student_analytics'),
+
+    # BULK ENDPOINTS
+    path('students/bulk/create/', views.bulk_create_students, name='bulk_create_students'),
+    path('students/bulk/change-status/', views.bulk_change_student_status, name='bulk_change_student_status'),
+    path('students/bulk/soft-delete/', views.bulk_soft_delete_students, name='bulk_soft_delete_students'),
+    path('students/bulk/restore/', views.bulk_restore_students, name='bulk_restore_students'),
     
     # NEW AUTHENTICATION ENDPOINTS
     path('auth/login/', views.student_login, name='student_login'),
@@ -24,4 +32,16 @@ urlpatterns = [
     path('auth/forgot-password/', views.forgot_password, name='forgot_password'),
     path('auth/reset-password/', views.reset_password, name='reset_password'),
     path('auth/change-password/', views.change_password, name='change_password'),
+
+    # ASYNC ENDPOINTS (same responses; serve under ASGI)
+    path('async/students/', async_views.get_all_students, name='async_get_all_students'),
+    path('async/students/active/', async_views.get_active_students, name='async_get_active_students'),
+    path('async/students/status/<str:profile_status>/', async_views.get_students_by_status, name='async_get_students_by_status'),
+    path('async/students/<int:student_id>/', async_views.get_student, name='async_get_student'),
+    path('async/auth/login/', async_views.student_login, name='async_student_login'),
+    path('async/auth/send-otp/', async_views.send_otp, name='async_send_otp'),
+    path('async/auth/verify-otp/', async_views.verify_otp, name='async_verify_otp'),
+
+    # INTERNAL
+    path('internal/stats/', views.internal_stats, name='internal_stats'),
 ]
\ No newline at end of file
@@ -0,0 +1,44 @@
+# student_api/utils/conditional.py
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    """Weak ETag over ``parts``: equal parts mean an equivalent representation"""
+    digest = hashlib.blake2b('|'.join(map(str, parts)).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+class Validators:
+    """
+    ETag and Last-Modified for a response, known before the body is built,
+    so that a client with a current copy gets a 304 without any serialization.
+    """
+    __slots__ = ('etag', 'last_modified')
+
+    def __init__(self, etag, last_modified=None):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def timestamp(self):
+        return int(self.last_modified.timestamp()) if self.last_modified else None
+
+    def not_modified(self, request):
+        """The 304 (or 412) response when the request's preconditions say so, else None"""
+        response = get_conditional_response(
+            request, etag=self.etag, last_modified=self.timestamp
+        )
+        return None if response is None else self.apply(response)
+
+    def apply(self, response):
+        """Attach the validators to a successful or 304 response"""
+        if self.etag and response.status_code in (200, 304):
+            response.headers['ETag'] = self.etag
+            if self.last_modified:
+                response.headers['Last-Modified'] = http_date(self.timestamp)
+            # Let browsers keep the body, but always revalidate it
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,70 @@
+# student_api/utils/hashers.py
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+from ..conf import get_setting
+from .encryption import SimplePasswordEncryption
+
+
+class StudentPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 whose work factor comes from
+    STUDENT_API['PASSWORD_HASH_ITERATIONS'] (see calibrate_password_hasher).
+    Keeps the pbkdf2_sha256 name, so stored values stay readable by Django's
+    own hasher; hashes made with another count are upgraded on login.
+    """
+
+    @property
+    def iterations(self):
+        return get_setting('PASSWORD_HASH_ITERATIONS') or PBKDF2PasswordHasher.iterations
+
+
+def is_legacy_password(encoded):
+    """Pre-hasher values are bare base64 XOR ciphertext with no 'algorithm$' prefix"""
+    return bool(encoded) and '$' not in encoded
+
+
+def check_legacy_password(raw_password, encoded, mobile_no):
+    encryptor = SimplePasswordEncryption()
+    return encryptor.decrypt_password(encoded, mobile_no) == raw_password
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_hash_executor():
+    """Bounded thread pool for hashing; hashlib releases the GIL while it works"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_setting('PASSWORD_HASH_WORKERS'),
+                    thread_name_prefix='password-hash',
+                )
+    return _executor
+
+
+async def run_in_hash_pool(func, *args):
+    """Await a CPU-bound hashing call without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hash_executor(), functools.partial(func, *args))
+
+
+def hash_passwords(raw_passwords, iterations=None):
+    """
+    make_password() for a batch; runs in the import command's process pool.
+    ``iterations`` overrides the PBKDF2 work factor (such hashes are
+    upgraded to the configured one on the student's next login); hashers
+    without one ignore it.
+    """
+    from django.contrib.auth.hashers import get_hasher, make_password
+    hasher = get_hasher()
+    if iterations is None or not hasattr(hasher, 'iterations'):
+        return [make_password(raw) for raw in raw_passwords]
+    return [hasher.encode(raw, hasher.salt(), iterations) for raw in raw_passwords]
@@ -0,0 +1,183 @@
+# student_api/utils/pagination.py
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+# Sort keys available to the list endpoints. Every ordering ends with the
+# primary key so that the key tuple is unique and seeks never skip rows.
+ORDERINGS = {
+    'created': ('CREATED_AT', 'STUDENT_ID'),
+    'id': ('STUDENT_ID',),
+}
+DEFAULT_ORDERING = 'created'
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded for the requested ordering"""
+
+
+def encode_cursor(ordering, values, direction):
+    """Pack the sort-key values of a boundary row into an opaque token"""
+    payload = {
+        'o': ordering,
+        'd': direction,
+        'v': [v.isoformat() if hasattr(v, 'isoformat') else v for v in values],
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def load_cursor(cursor, ordering, size):
+    """Unpack a cursor token into (direction, raw key values)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction, values = payload['d'], payload['v']
+        if payload['o'] != ordering or direction not in ('next', 'prev'):
+            raise InvalidCursor("Cursor does not match the requested ordering")
+    except InvalidCursor:
+        raise
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Malformed cursor")
+    return direction, values
+
+
+def decode_cursor(cursor, ordering, model):
+    """Unpack a cursor token into (direction, key values) for ``model``"""
+    keys = ORDERINGS[ordering]
+    direction, values = load_cursor(cursor, ordering, len(keys))
+    try:
+        values = [
+            model._meta.get_field(key).to_python(value)
+            for key, value in zip(keys, values)
+        ]
+    except ValidationError:
+        raise InvalidCursor("Malformed cursor")
+    return direction, values
+
+
+def seek_filter(keys, values, forward=True):
+    """
+    Build the WHERE clause that seeks past (or before) a key tuple.
+
+    The leading-column range condition is emitted separately so the
+    database can turn it into an index range scan instead of evaluating
+    the OR expansion row by row.
+    """
+    op = 'gt' if forward else 'lt'
+    first_key, first_value = keys[0], values[0]
+    expanded = Q(**{f'{first_key}__{op}': first_value})
+    for i in range(1, len(keys)):
+        equal = {k: v for k, v in zip(keys[:i], values[:i])}
+        equal[f'{keys[i]}__{op}'] = values[i]
+        expanded |= Q(**equal)
+    if len(keys) == 1:
+        return expanded
+    leading = Q(**{f'{first_key}__{op}e': first_value})
+    return leading & expanded
+
+
+def iterate_keyset(queryset, ordering=DEFAULT_ORDERING, chunk_size=2000):
+    """
+    Yield every row of ``queryset`` while holding at most one chunk in memory.
+
+    Each chunk is its own seek query, so memory stays flat even on drivers
+    such as mysqlclient that buffer a whole result set client-side.
+    """
+    keys = ORDERINGS[ordering]
+    queryset = queryset.order_by(*keys)
+    chunk = queryset
+    while True:
+        last = None
+        for last in chunk[:chunk_size].iterator(chunk_size=chunk_size):
+            yield last
+        if last is None:
+            return
+        values = [getattr(last, key) for key in keys]
+        chunk = queryset.filter(seek_filter(keys, values))
+
+
+async def aiterate_keyset(queryset, ordering=DEFAULT_ORDERING, chunk_size=2000):
+    """iterate_keyset() as an async generator, for async streaming responses"""
+    keys = ORDERINGS[ordering]
+    queryset = queryset.order_by(*keys)
+    chunk = queryset
+    while True:
+        last = None
+        async for last in chunk[:chunk_size]:
+            yield last
+        if last is None:
+            return
+        values = [getattr(last, key) for key in keys]
+        chunk = queryset.filter(seek_filter(keys, values))
+
+
+class KeysetPage:
+    def __init__(self, rows, next_cursor, prev_cursor):
+        self.rows = rows
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination that seeks by index instead of using OFFSET.
+
+    Rows are ordered by the key tuple of ``ordering``; a page is fetched
+    with ``limit + 1`` rows so the presence of another page is known
+    without a COUNT(*) query.
+    """
+
+    def __init__(self, ordering=DEFAULT_ORDERING, limit=50):
+        if ordering not in ORDERINGS:
+            raise InvalidCursor(f"Ordering must be one of: {list(ORDERINGS)}")
+        self.ordering = ordering
+        self.keys = ORDERINGS[ordering]
+        self.limit = limit
+
+    def paginate(self, queryset, cursor=None):
+        values, forward = self._seek(queryset, cursor)
+        rows = list(self.page_queryset(queryset, values, forward))
+        return self._page(rows, values, forward)
+
+    async def apaginate(self, queryset, cursor=None):
+        """paginate() for async views, fetching the page with async iteration"""
+        values, forward = self._seek(queryset, cursor)
+        rows = [row async for row in self.page_queryset(queryset, values, forward)]
+        return self._page(rows, values, forward)
+
+    def _seek(self, queryset, cursor):
+        direction, values = 'next', None
+        if cursor:
+            direction, values = decode_cursor(cursor, self.ordering, queryset.model)
+        return values, direction == 'next'
+
+    def _page(self, rows, values, forward):
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        if not forward:
+            rows.reverse()
+
+        next_cursor = prev_cursor = None
+        if rows:
+            if has_more or not forward:
+                next_cursor = self._cursor(rows[-1], 'next')
+            if (has_more and not forward) or (forward and values is not None):
+                prev_cursor = self._cursor(rows[0], 'prev')
+        return KeysetPage(rows, next_cursor, prev_cursor)
+
+    def page_queryset(self, queryset, values=None, forward=True):
+        """The unevaluated seek query for one page (``limit + 1`` rows)"""
+        if values is not None:
+            queryset = queryset.filter(seek_filter(self.keys, values, forward))
+        order_by = self.keys if forward else [f'-{key}' for key in self.keys]
+        return queryset.order_by(*order_by)[:self.limit + 1]
+
+    def _cursor(self, row, direction):
+        values = [getattr(row, key) for key in self.keys]
+        return encode_cursor(self.ordering, values, direction)
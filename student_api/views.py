@@ -1,17 +1,173 @@
 # student_api/views.py
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, renderer_classes, throttle_classes
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from django.db import DEFAULT_DB_ALIAS
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
-from django.utils import timezone
+from .conf import get_setting
+from .db.pool import pool_stats
+from .metrics import registry as metrics_registry
 from .models import Student
+from .renderers import NDJSONRenderer, json_line
+from .services.bulk_service import StudentBulkService, VALID_STATUSES
+from .services.cache_service import student_cache
+from .services.change_feed_service import ResyncRequired, StudentChangeFeedService
+from .services.counter_service import StudentCounterService
+from .services.freshness_service import StudentFreshnessService
+from .services.rollup_service import StudentRollupService
+from .services.search_service import StudentSearchService
+from .services.token_service import StudentTokenService
+from .throttling import IdentityRateThrottle, rate_limit_stats
+from .utils.pagination import (
+    KeysetPaginator, InvalidCursor, DEFAULT_ORDERING, iterate_keyset
+)
 from .serializers import (
     StudentSerializer, StudentCreateSerializer, StudentUpdateSerializer,
+    StudentBulkCreateSerializer, InvalidFields, resolve_fields, student_rows,
     StudentLoginSerializer, OTPRequestSerializer, OTPVerifySerializer,
     ForgotPasswordSerializer, ResetPasswordSerializer, ChangePasswordSerializer
 )
 
+TRUE_VALUES = ('1', 'true', 'yes')
+
+def _bounded_int(request, name, default, maximum):
+    """Parse a positive ?name= capped at ``maximum``; None when it is not a positive int"""
+    try:
+        value = int(request.GET.get(name, default))
+    except ValueError:
+        return None
+    if value < 1:
+        return None
+    return min(value, maximum)
+
+def _page_limit(request):
+    """Parse ?limit= (clamped to MAX_PAGE_SIZE); None when it is not a positive int"""
+    return _bounded_int(request, 'limit', get_setting('PAGE_SIZE'), get_setting('MAX_PAGE_SIZE'))
+
+def _wants_total(request):
+    return request.GET.get('total', '').lower() in TRUE_VALUES
+
+def _student_fields(request):
+    """?fields= / ?preset= as a list of field names (None for all); returns (fields, error_response)"""
+    try:
+        return resolve_fields(request.GET.get('fields'), request.GET.get('preset')), None
+    except InvalidFields as e:
+        return None, Response({
+            "success": False,
+            "error": str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+def pick_fields(record, fields):
+    """Narrow a serialized student record to ``fields`` (None keeps all)"""
+    if fields is None:
+        return record
+    return {name: value for name, value in record.items() if name in fields}
+
+def _page_body(page, limit, total=None, fields=None, **extra):
+    """Shared envelope for every paginated student list"""
+    body = {"success": True}
+    if total is not None:
+        # "count" has always meant the number of matching students
+        body["count"] = body["total"] = total
+    body["returned"] = len(page.rows)
+    body.update(extra)
+    body.update({
+        "students": student_rows.serialize(page.rows, fields),
+        "limit": limit,
+        "next": page.next_cursor,
+        "prev": page.prev_cursor,
+    })
+    return body
+
+def _page_response(page, limit, total=None, fields=None, **extra):
+    return Response(_page_body(page, limit, total, fields, **extra))
+
+def _paginated_students(request, students, fields=None, counter_filter=None, **extra):
+    """
+    Build a list response for one keyset page of ``students``, selecting
+    only the columns for ``fields`` (plus the keyset keys).
+    Query params: limit, cursor, order (created|id), total (true to add the total)
+    When ``counter_filter`` is given the total comes from STUDENT_COUNTER
+    instead of a COUNT(*) over the filtered set.
+    """
+    limit = _page_limit(request)
+    if limit is None:
+        return Response({
+            "success": False,
+            "error": "limit must be a positive integer"
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        paginator = KeysetPaginator(request.GET.get('order', DEFAULT_ORDERING), limit)
+        rows = student_rows.values(students, fields, extra=paginator.keys)
+        page = paginator.paginate(rows, request.GET.get('cursor'))
+    except InvalidCursor as e:
+        return Response({
+            "success": False,
+            "error": str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    total = None
+    if _wants_total(request):
+        if counter_filter is not None:
+            total = StudentCounterService.total(**counter_filter)
+        else:
+            total = students.count()
+    return _page_response(page, limit, total, fields, **extra)
+
+def _wants_stream(request):
+    """Client asked for ?stream=1 or Accept: application/x-ndjson"""
+    if request.GET.get('stream', '').lower() in TRUE_VALUES:
+        return True
+    return request.accepted_renderer.format == NDJSONRenderer.format
+
+def _streamed_students(students, fields=None):
+    """
+    Stream every row of ``students`` (narrowed to ``fields``) as NDJSON in STUDENT_ID order.
+    Rows are fetched in keyset chunks and serialized one at a time, so
+    peak memory does not grow with the table.
+    """
+    def rows():
+        chunk_size = get_setting('STREAM_CHUNK_SIZE')
+        rows = student_rows.values(students, fields, extra=('STUDENT_ID',))
+        for row in iterate_keyset(rows, 'id', chunk_size):
+            yield json_line(student_rows.to_representation(row, fields))
+
+    return StreamingHttpResponse(rows(), content_type=NDJSONRenderer.media_type)
+
+def _list_variant(request, fields, stream):
+    """
+    The query parameters that shape a list body besides the rows' data,
+    so each representation gets its own ETag
+    """
+    if stream:
+        return NDJSONRenderer.format, fields
+    return ('json', fields, _page_limit(request), request.GET.get('cursor', ''),
+            request.GET.get('order', DEFAULT_ORDERING), _wants_total(request))
+
+def _student_list(request, students, counter_filter, **extra):
+    """
+    Shared body of the list views: an NDJSON stream or one keyset page of
+    ``students``, or a 304 when the client's copy is still current.
+    """
+    fields, error = _student_fields(request)
+    if error:
+        return error
+    stream = _wants_stream(request)
+    validators = StudentFreshnessService.list_validators(
+        counter_filter, _list_variant(request, fields, stream)
+    )
+    not_modified = validators.not_modified(request)
+    if not_modified is not None:
+        return not_modified
+    if stream:
+        return validators.apply(_streamed_students(students, fields))
+    return validators.apply(
+        _paginated_students(request, students, fields, counter_filter, **extra)
+    )
+
 # Create Student - UPDATED WITH ENCRYPTION
 @api_view(['POST'])
 def create_student(request):
@@ -32,10 +188,11 @@ def create_student(request):
             data['DELETED'] = False
             data['PROFILE_STATUS'] = 'active'
             
-            student = Student.objects.create(**data)
+            student = Student(**data)
             
-            # Set encrypted password
-            student.set_password(raw_password)
+            # Set encrypted password before the INSERT (one write, no UPDATE)
+            student.set_password(raw_password, save=False)
+            student.save()
             
             return Response({
                 "success": True,
@@ -56,49 +213,71 @@ def create_student(request):
 
 # Get ALL Students (including inactive/suspended - EVERYTHING)
 @api_view(['GET'])
+@renderer_classes([JSONRenderer, NDJSONRenderer])
 def get_all_students(request):
     """
     Get ALL students regardless of status or deletion flag
     """
-    students = Student.objects.all()  # Get EVERYTHING from database
-    serializer = StudentSerializer(students, many=True)
-    
-    return Response({
-        "success": True,
-        "count": students.count(),
-        "message": "Showing ALL students from database",
-        "students": serializer.data
-    })
+    students = Student.objects.all()  # EVERYTHING, one keyset page at a time
+    return _student_list(
+        request, students, counter_filter={},
+        message="Showing ALL students from database"
+    )
 
 # Get Active Students Only
 @api_view(['GET'])
+@renderer_classes([JSONRenderer, NDJSONRenderer])
 def get_active_students(request):
     """
     Get only active students (PROFILE_STATUS = 'active')
     """
     students = Student.objects.filter(PROFILE_STATUS='active')
-    serializer = StudentSerializer(students, many=True)
-    
-    return Response({
-        "success": True,
-        "count": students.count(),
-        "message": "Showing active students only",
-        "students": serializer.data
-    })
+    return _student_list(
+        request, students, counter_filter={'PROFILE_STATUS': 'active'},
+        message="Showing active students only"
+    )
 
 # Get Single Student
 @api_view(['GET'])
 def get_student(request, student_id):
     """
     Get student by ID (will show even if PROFILE_STATUS is inactive)
+    ?fields= / ?preset= narrow the record; If-None-Match / If-Modified-Since
+    against UPDATED_AT answer 304 without serializing it
     """
-    student = get_object_or_404(Student, STUDENT_ID=student_id)
-    serializer = StudentSerializer(student)
-    
-    return Response({
-        "success": True,
-        "student": serializer.data
-    })
+    fields, error = _student_fields(request)
+    if error:
+        return error
+
+    if student_cache.enabled:
+        def load():
+            # Cache fills read the primary: a lagging replica's copy would be
+            # served to every client, pinned writers included
+            student = get_object_or_404(
+                Student.objects.using(DEFAULT_DB_ALIAS), STUDENT_ID=student_id
+            )
+            return dict(StudentSerializer(student).data)
+
+        # The cache holds whole records, so sparse reads are served from it too
+        record = student_cache.get_or_load(student_id, load)
+        updated_at = record['UPDATED_AT']
+
+        def build():
+            return pick_fields(record, fields)
+    else:
+        # Select only the requested columns (plus the validator's)
+        students = Student.objects.only(*fields, 'UPDATED_AT') if fields else Student.objects
+        student = get_object_or_404(students, STUDENT_ID=student_id)
+        updated_at = student.UPDATED_AT
+
+        def build():
+            return StudentSerializer(student, fields=fields).data
+
+    validators = StudentFreshnessService.record_validators(updated_at, fields)
+    not_modified = validators.not_modified(request)
+    if not_modified is not None:
+        return not_modified
+    return validators.apply(Response({"success": True, "student": build()}))
 
 # Update Student
 @api_view(['PUT'])
@@ -232,38 +411,128 @@ def verify_email(request, student_id):
 @api_view(['GET'])
 def search_students(request):
     """
-    Search students by name, email, or college
+    Search students by name, email, or college, best matches first
     """
     try:
-        query = request.GET.get('q', '')
+        query = request.GET.get('q', '').strip()
         if not query:
             return Response({
                 "success": False,
                 "error": "Search query parameter 'q' is required"
             }, status=status.HTTP_400_BAD_REQUEST)
-        
-        students = Student.objects.filter(
-            Q(NAME__icontains=query) |
-            Q(EMAIL__icontains=query) |
-            Q(COLLEGE__icontains=query)
+
+        limit = _page_limit(request)
+        if limit is None:
+            return Response({
+                "success": False,
+                "error": "limit must be a positive integer"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        fields, error = _student_fields(request)
+        if error:
+            return error
+
+        # Ranked lookup through the trigram index instead of LIKE '%q%' scans
+        page = StudentSearchService.search(
+            query, limit, request.GET.get('cursor'), with_total=_wants_total(request),
+            fields=fields
+        )
+        return _page_response(page, limit, page.total, fields, query=query)
+    except InvalidCursor as e:
+        return Response({
+            "success": False,
+            "error": str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return Response({
+            "success": False,
+            "error": f"Error searching students: {str(e)}"
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# Student Change Feed
+@api_view(['GET'])
+def student_changes(request):
+    """
+    Students changed and hard deleted since ?cursor= (from the previous
+    page) or ?updated_since= (ISO 8601), oldest first. Always returns a
+    next_cursor to poll with; has_more means another page is ready now.
+    """
+    try:
+        limit = _page_limit(request)
+        if limit is None:
+            return Response({
+                "success": False,
+                "error": "limit must be a positive integer"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        fields, error = _student_fields(request)
+        if error:
+            return error
+
+        page = StudentChangeFeedService.page(
+            request.GET.get('cursor') or request.GET.get('updated_since'), limit, fields
         )
-        
-        serializer = StudentSerializer(students, many=True)
-        
         return Response({
             "success": True,
-            "count": students.count(),
-            "query": query,
-            "students": serializer.data
+            "students": student_rows.serialize(page.rows, fields),
+            "deleted": [
+                {"STUDENT_ID": row.STUDENT_ID, "DELETED_AT": row.DELETED_AT}
+                for row in page.deleted
+            ],
+            "limit": limit,
+            "next_cursor": page.next_cursor,
+            "has_more": page.has_more,
         })
+    except InvalidCursor as e:
+        return Response({
+            "success": False,
+            "error": str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except ResyncRequired as e:
+        return Response({
+            "success": False,
+            "error": str(e)
+        }, status=status.HTTP_410_GONE)
     except Exception as e:
         return Response({
             "success": False,
-            "error": f"Error searching students: {str(e)}"
+            "error": f"Error fetching student changes: {str(e)}"
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# Student Analytics
+@api_view(['GET'])
+def student_analytics(request):
+    """
+    Student counts by PROFILE_STATUS, ADDRESS_STATE, COLLEGE, EDUCATION and
+    EMAIL_VERIFIED, and daily signups, from the rollup tables.
+    Query params: top (values per dimension), days (of signups),
+    include_deleted (true to count soft-deleted students too)
+    """
+    try:
+        top = _bounded_int(request, 'top', get_setting('ANALYTICS_TOP_VALUES'),
+                           get_setting('ANALYTICS_MAX_TOP_VALUES'))
+        days = _bounded_int(request, 'days', get_setting('ANALYTICS_SIGNUP_DAYS'),
+                            get_setting('ANALYTICS_MAX_SIGNUP_DAYS'))
+        if top is None or days is None:
+            return Response({
+                "success": False,
+                "error": "top and days must be positive integers"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        include_deleted = request.GET.get('include_deleted', '').lower() in TRUE_VALUES
+        return Response({
+            "success": True,
+            **StudentRollupService.summary(top, days, include_deleted),
+        })
+    except Exception as e:
+        return Response({
+            "success": False,
+            "error": f"Error fetching student analytics: {str(e)}"
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 # Get Students by Status
 @api_view(['GET'])
+@renderer_classes([JSONRenderer, NDJSONRenderer])
 def get_students_by_status(request, status):
     """
     Get students by specific PROFILE_STATUS
@@ -277,14 +546,9 @@ def get_students_by_status(request, status):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         students = Student.objects.filter(PROFILE_STATUS=status)
-        serializer = StudentSerializer(students, many=True)
-        
-        return Response({
-            "success": True,
-            "count": students.count(),
-            "status": status,
-            "students": serializer.data
-        })
+        return _student_list(
+            request, students, counter_filter={'PROFILE_STATUS': status}, status=status
+        )
     except Exception as e:
         return Response({
             "success": False,
@@ -294,6 +558,7 @@ def get_students_by_status(request, status):
 # NEW AUTHENTICATION VIEWS ADDED BELOW
 
 @api_view(['POST'])
+@throttle_classes([IdentityRateThrottle])
 def student_login(request):
     """Student login with mobile and password"""
     serializer = StudentLoginSerializer(data=request.data)
@@ -310,10 +575,13 @@ def student_login(request):
         student = Student.objects.get(MOBILE_NO=mobile_no, DELETED=False)
         
         if student.check_password(password):
+            if not student.UNIQUE_TOKEN:
+                student.rotate_token()
             return Response({
                 "success": True,
                 "message": "Login successful",
-                "student": StudentSerializer(student).data
+                "student": StudentSerializer(student).data,
+                **StudentTokenService.token_response(student),
             })
         else:
             return Response({
@@ -328,6 +596,7 @@ def student_login(request):
         }, status=status.HTTP_401_UNAUTHORIZED)
 
 @api_view(['POST'])
+@throttle_classes([IdentityRateThrottle])
 def send_otp(request):
     """Send OTP to student's mobile"""
     serializer = OTPRequestSerializer(data=request.data)
@@ -360,6 +629,7 @@ def send_otp(request):
         }, status=status.HTTP_404_NOT_FOUND)
 
 @api_view(['POST'])
+@throttle_classes([IdentityRateThrottle])
 def verify_otp(request):
     """Verify OTP"""
     serializer = OTPVerifySerializer(data=request.data)
@@ -397,6 +667,7 @@ def verify_otp(request):
         }, status=status.HTTP_404_NOT_FOUND)
 
 @api_view(['POST'])
+@throttle_classes([IdentityRateThrottle])
 def forgot_password(request):
     """Initiate password reset - send OTP"""
     serializer = OTPRequestSerializer(data=request.data)  # Reuse OTP request serializer
@@ -410,9 +681,8 @@ def forgot_password(request):
     
     try:
         student = Student.objects.get(MOBILE_NO=mobile_no, DELETED=False)
-        otp = student.generate_otp()
-        student.FORGOT_PASSWORD_SENT_AT = timezone.now()
-        student.save()
+        # OTP and reset timestamp are stored together (one UPDATE on the DB store)
+        otp = student.generate_otp(forgot_password=True)
         
         # In real implementation, integrate with SMS service here
         print(f"Password reset OTP for {mobile_no}: {otp}")  # Remove this in production
@@ -481,6 +751,13 @@ def change_password(request):
     student_id = serializer.validated_data['student_id']
     current_password = serializer.validated_data['current_password']
     new_password = serializer.validated_data['new_password']
+
+    # A bearer token, when sent, must belong to the student being changed
+    if request.auth is not None and request.auth['student_id'] != student_id:
+        return Response({
+            "success": False,
+            "error": "Token does not belong to this student"
+        }, status=status.HTTP_403_FORBIDDEN)
     
     try:
         student = Student.objects.get(STUDENT_ID=student_id, DELETED=False)
@@ -551,4 +828,160 @@ def restore_student(request, student_id):
         return Response({
             "success": False,
             "error": f"Error restoring student: {str(e)}"
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# BULK ENDPOINTS
+
+def _bulk_items(request, key):
+    """Validate the list payload of a bulk request; returns (items, error_response)"""
+    items = request.data.get(key) if hasattr(request.data, 'get') else None
+    if not isinstance(items, list) or not items:
+        return None, Response({
+            "success": False,
+            "error": f"'{key}' must be a non-empty list"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    max_items = get_setting('BULK_MAX_ITEMS')
+    if len(items) > max_items:
+        return None, Response({
+            "success": False,
+            "error": f"At most {max_items} items per request"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    return items, None
+
+def _bulk_student_ids(request):
+    """De-duplicated list of integer student IDs from request.data['student_ids']"""
+    items, error = _bulk_items(request, 'student_ids')
+    if error:
+        return None, error
+    try:
+        student_ids = list(dict.fromkeys(int(student_id) for student_id in items))
+    except (TypeError, ValueError):
+        return None, Response({
+            "success": False,
+            "error": "'student_ids' must contain integers"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    return student_ids, None
+
+def _bulk_response(results, message):
+    succeeded = sum(1 for result in results if result["success"])
+    return Response({
+        "success": succeeded == len(results),
+        "message": message,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results
+    })
+
+@api_view(['POST'])
+def bulk_create_students(request):
+    """
+    Create many students in one transaction
+    Example: {"students": [{...same fields as create...}, ...]}
+    """
+    items, error = _bulk_items(request, 'students')
+    if error:
+        return error
+
+    results, valid = {}, []
+    for index, item in enumerate(items):
+        serializer = StudentBulkCreateSerializer(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            results[index] = {"success": False, "errors": serializer.errors}
+
+    try:
+        results.update(StudentBulkService.create(valid, get_setting('BULK_BATCH_SIZE')))
+    except Exception as e:
+        return Response({
+            "success": False,
+            "error": f"Error creating students: {str(e)}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    ordered = [dict(index=index, **results[index]) for index in range(len(items))]
+    return _bulk_response(ordered, "Bulk create finished")
+
+@api_view(['POST'])
+def bulk_change_student_status(request):
+    """
+    Change PROFILE_STATUS for many students
+    Example: {"student_ids": [1, 2, 3], "status": "inactive"}
+    """
+    student_ids, error = _bulk_student_ids(request)
+    if error:
+        return error
+    new_status = request.data.get('status')
+    if new_status not in VALID_STATUSES:
+        return Response({
+            "success": False,
+            "error": f"Status must be one of: {VALID_STATUSES}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        results = StudentBulkService.change_status(
+            student_ids, new_status, get_setting('BULK_BATCH_SIZE')
+        )
+    except Exception as e:
+        return Response({
+            "success": False,
+            "error": f"Error changing status: {str(e)}"
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    ordered = [dict(student_id=sid, **results[sid]) for sid in student_ids]
+    return _bulk_response(ordered, f"Bulk status change to '{new_status}' finished")
+
+@api_view(['POST'])
+def bulk_soft_delete_students(request):
+    """Soft delete many students. Example: {"student_ids": [1, 2, 3]}"""
+    student_ids, error = _bulk_student_ids(request)
+    if error:
+        return error
+    try:
+        results = StudentBulkService.soft_delete(student_ids, get_setting('BULK_BATCH_SIZE'))
+    except Exception as e:
+        return Response({
+            "success": False,
+            "error": f"Error soft deleting students: {str(e)}"
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    ordered = [dict(student_id=sid, **results[sid]) for sid in student_ids]
+    return _bulk_response(ordered, "Bulk soft delete finished")
+
+@api_view(['POST'])
+def bulk_restore_students(request):
+    """Restore many soft deleted students. Example: {"student_ids": [1, 2, 3]}"""
+    student_ids, error = _bulk_student_ids(request)
+    if error:
+        return error
+    try:
+        results = StudentBulkService.restore(student_ids, get_setting('BULK_BATCH_SIZE'))
+    except Exception as e:
+        return Response({
+            "success": False,
+            "error": f"Error restoring students: {str(e)}"
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    ordered = [dict(student_id=sid, **results[sid]) for sid in student_ids]
+    return _bulk_response(ordered, "Bulk restore finished")
+
+# Runtime counters for tuning (disabled unless STATS_ENDPOINT_ENABLED)
+@api_view(['GET'])
+def internal_stats(request):
+    """Cache, rate limiter and connection pool statistics"""
+    if not get_setting('STATS_ENDPOINT_ENABLED'):
+        raise Http404
+    return Response({
+        "success": True,
+        "cache": student_cache.stats(),
+        "rate_limits": rate_limit_stats.snapshot(),
+        "db_pool": pool_stats(),
+    })
+
+# Prometheus scrape target (disabled unless METRICS_ENDPOINT_ENABLED)
+def metrics(request):
+    """Per-route request histograms of this process in the Prometheus text format"""
+    if not get_setting('METRICS_ENDPOINT_ENABLED'):
+        raise Http404
+    return HttpResponse(
+        metrics_registry.exposition(), content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -44,11 +44,36 @@ INSTALLED_APPS = [
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
-    ]
+    ],
+    # Bearer access tokens from student_login, verified without a DB query
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'student_api.authentication.StudentTokenAuthentication',
+    ],
+    'EXCEPTION_HANDLER': 'student_api.exceptions.api_exception_handler',
+}
+
+# Student API tuning - see student_api/conf.py for every key and its default
+STUDENT_API = {
+    'CACHE_ENABLED': True,
+    'CACHE_LOCAL_TTL': 30,
+    'CACHE_SHARED_TTL': 300,
+    # Switch to 'student_api.services.otp_store.CacheOTPStore' (with a shared
+    # cache such as Redis/Memcached in CACHES) to keep OTPs off the STUDENT row
+    'OTP_STORE': 'student_api.services.otp_store.DatabaseOTPStore',
+    'OTP_TTL': 300,
+    # Set from `python manage.py calibrate_password_hasher` on the target host
+    'PASSWORD_HASH_ITERATIONS': None,
+    # Aliases in DATABASES that GET requests read from, e.g. ['replica1'];
+    # clients stay on the primary for REPLICA_PIN_SECONDS after a write
+    'READ_REPLICAS': [],
+    'REPLICA_PIN_SECONDS': 5,
 }
 
 MIDDLEWARE = [
+    'student_api.middleware.RequestMetricsMiddleware',
+    'student_api.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'student_api.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -89,15 +114,46 @@ WSGI_APPLICATION = 'student_project.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        # django.db.backends.mysql plus a per-process connection pool
+        'ENGINE': 'student_api.db.backends.mysql_pool',
         'NAME': 'student_management',
         'USER': 'root',
         'PASSWORD': '1234',
         'HOST': 'localhost',
         'PORT': '3306',
-    }
+        # Per worker process: keep workers * MAX_SIZE under MySQL's max_connections
+        'POOL': {
+            'MIN_SIZE': 2,
+            'MAX_SIZE': 20,
+            'TIMEOUT': 5,          # seconds to wait for a free connection
+            'RECYCLE': 3600,       # below MySQL's wait_timeout
+            'IDLE_TIMEOUT': 300,
+            'PRE_PING': True,
+        },
+    },
+    # Read replicas: same settings with their own HOST, listed in
+    # STUDENT_API['READ_REPLICAS']
+    # 'replica1': {
+    #     'ENGINE': 'student_api.db.backends.mysql_pool',
+    #     'NAME': 'student_management',
+    #     'USER': 'readonly',
+    #     'PASSWORD': '...',
+    #     'HOST': 'replica1.internal',
+    #     'PORT': '3306',
+    #     'POOL': {'MIN_SIZE': 2, 'MAX_SIZE': 20, 'TIMEOUT': 5},
+    # },
 }
 
+DATABASE_ROUTERS = ['student_api.db.routers.ReplicaRouter']
+
+
+# Password hashing - the first entry hashes new passwords; the others can
+# still verify stored values (which are upgraded on the next login)
+PASSWORD_HASHERS = [
+    'student_api.utils.hashers.StudentPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
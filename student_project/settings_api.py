@@ -0,0 +1,42 @@
+"""
+API-only profile for the JSON workers: no admin, sessions, messages,
+static files or templates, and only the middleware the student endpoints
+use. Run workers with it for faster cold starts and less per-request work:
+
+    DJANGO_SETTINGS_MODULE=student_project.settings_api gunicorn student_project.wsgi
+
+Keep serving /admin/ from a separate deployment on student_project.settings.
+`python manage.py bench_boot` compares the two profiles.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'rest_framework',
+    'student_api',
+]
+
+# No session, CSRF, auth, messages or clickjacking middleware: the student
+# endpoints authenticate with their own tokens and OTPs, never a session
+MIDDLEWARE = [
+    'student_api.middleware.RequestMetricsMiddleware',
+    'student_api.middleware.ProfilingMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'student_api.middleware.ReplicaRoutingMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'student_project.urls_api'
+
+TEMPLATES = []
+
+# With django.contrib.auth out of INSTALLED_APPS, DRF must not build an
+# AnonymousUser on every request (bearer tokens need no auth models)
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_PERMISSION_CLASSES': [],
+    'UNAUTHENTICATED_USER': None,
+}
+
+# Validators live in django.contrib.auth, which is not installed
+AUTH_PASSWORD_VALIDATORS = []
@@ -0,0 +1,42 @@
+"""
+Settings for running the test suite on SQLite:
+
+    python manage.py test --settings=student_project.settings_test
+"""
+
+import tempfile
+from pathlib import Path
+
+from .settings import *  # noqa: F401,F403
+
+# SQLite files go outside the checkout so test runs leave nothing to commit
+TEST_DB_DIR = Path(tempfile.gettempdir()) / 'student_api_tests'
+TEST_DB_DIR.mkdir(exist_ok=True)
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': TEST_DB_DIR / 'test.sqlite3',
+    },
+    # Exercises the pooled backend (student_api.db.backends.*_pool); a file
+    # test database, since Django never closes in-memory SQLite connections
+    'pooled': {
+        'ENGINE': 'student_api.db.backends.sqlite_pool',
+        'NAME': TEST_DB_DIR / 'pooled.sqlite3',
+        'TEST': {'NAME': TEST_DB_DIR / 'test_pooled.sqlite3'},
+        'POOL': {'MIN_SIZE': 1, 'MAX_SIZE': 2, 'TIMEOUT': 0.2},
+    },
+    # Stand-ins for read replicas (ReplicaRoutingTests enables them)
+    'replica1': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': TEST_DB_DIR / 'replica1.sqlite3',
+    },
+    'replica2': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': TEST_DB_DIR / 'replica2.sqlite3',
+    },
+}
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
@@ -17,7 +17,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from student_api import views as student_api_views
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('student_api.urls')),
+    path('metrics', student_api_views.metrics, name='metrics'),
 ]
@@ -0,0 +1,12 @@
+"""
+URL configuration for the API-only profile (student_project.settings_api):
+the student API and the metrics endpoint, without the admin site.
+"""
+from django.urls import path, include
+
+from student_api import views as student_api_views
+
+urlpatterns = [
+    path('api/', include('student_api.urls')),
+    path('metrics', student_api_views.metrics, name='metrics'),
+]